@@ -24,6 +24,8 @@
 from arcade.sound import *
 from arcade.sprite import *
 from arcade.sprite_list import *
+from arcade.texture_atlas import *
+from arcade.broadphase import *
 from arcade.version import *
 from arcade.window_commands import *
 from arcade.joysticks import *
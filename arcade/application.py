@@ -8,6 +8,7 @@
 from arcade.window_commands import set_viewport
 from arcade.window_commands import get_viewport
 from arcade.window_commands import set_window
+from arcade.draw_commands import flush_draw_commands
 
 import pyglet
 import pyglet.gl as gl
@@ -104,6 +105,13 @@ def on_draw(self):
         """ Override this function to add your custom drawing code. """
         pass
 
+    def flip(self):
+        """
+        Show what has been drawn, after drawing any batched shapes.
+        """
+        flush_draw_commands()
+        super().flip()
+
     def on_resize(self, width, height):
         """ Override this function to add custom code to be called any time the window
         is resized. """
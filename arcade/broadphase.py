@@ -0,0 +1,602 @@
+"""
+Broadphase indexes, used by sprite lists to find the sprites close to a box
+without checking every sprite in the list.
+
+All of them share the ``Broadphase`` interface, so a sprite list can use
+whichever one suits its sprites:
+
+* ``SpatialHash``: a grid of fixed-size cells. Fast when the sprites are
+  about the size of a cell, and slow when some are much bigger.
+* ``LooseQuadtree``: sprites are stored at the depth that matches their
+  size, so huge and tiny sprites can share a list.
+* ``SweepAndPrune``: sprites sorted by their left edge. Cheap to update
+  when everything moves every frame.
+
+Queries can return objects that don't actually touch the box, but never
+leave out one that does.
+"""
+
+from abc import ABC
+from abc import abstractmethod
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import math
+import numpy as np
+
+from arcade.sprite import Sprite
+
+Bounds = Tuple[float, float, float, float]
+
+
+def _get_bounds(box_object: Sprite) -> Bounds:
+    """ Return the (left, bottom, right, top) of an object's points. """
+    return box_object.get_bounds()
+
+
+def _overlaps(a: Bounds, b: Bounds) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class Broadphase(ABC):
+    """
+    Index of objects by their bounding box.
+
+    Subclasses implement ``_insert``, ``remove_object``, ``clear`` and
+    ``get_objects_for_bounds``.
+    """
+
+    def insert_object_for_box(self, new_object: Sprite):
+        """
+        Insert a sprite. If the sprite is already in the index, it is moved
+        to its new location.
+        """
+        self._insert(new_object, _get_bounds(new_object))
+
+    @abstractmethod
+    def _insert(self, new_object: Sprite, bounds: Bounds):
+        """ Insert or move an object, given its (left, bottom, right, top). """
+        raise NotImplementedError
+
+    def update_object_for_box(self, moved_object: Sprite):
+        """ Bring a sprite up to date after it moved or changed shape. """
+        self.insert_object_for_box(moved_object)
+
+    @abstractmethod
+    def remove_object(self, sprite_to_delete: Sprite):
+        """ Remove a Sprite. Does nothing if the sprite isn't in the index. """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        """ Remove everything. """
+        raise NotImplementedError
+
+    def rebuild(self, objects: Iterable[Sprite], bounds: Iterable[Bounds]=None):
+        """
+        Replace everything with the given objects, at their current location.
+        Their (left, bottom, right, top) bounds can be passed in if they are
+        already known.
+        """
+        self.clear()
+        objects = list(objects)
+        if bounds is None:
+            bounds = map(_get_bounds, objects)
+        for item, item_bounds in zip(objects, bounds):
+            self._insert(item, tuple(item_bounds))
+
+    @abstractmethod
+    def get_objects_for_bounds(self, left: float, bottom: float, right: float, top: float) -> List[Sprite]:
+        """ Returns the Sprites that might touch a box, each one once. """
+        raise NotImplementedError
+
+    def get_objects_for_box(self, check_object: Sprite) -> List[Sprite]:
+        """ Returns the Sprites that might touch a sprite, each one once. """
+        return self.get_objects_for_bounds(*_get_bounds(check_object))
+
+
+class SpatialHash(Broadphase):
+    """
+    Structure for fast collision checking.
+
+    Each cell of the grid holds a set of the objects touching it, and the
+    range of cells each object covers is remembered. Moving an object only
+    touches the grid if it ends up in different cells, and cells are dropped
+    once they are empty.
+
+    See: https://www.gamedev.net/articles/programming/general-and-gameplay-programming/spatial-hashing-r2697/
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.contents: Dict[Tuple[int, int], Set[Sprite]] = {}
+        # (min_x, min_y, max_x, max_y) cells covered by each object
+        self.object_cells: Dict[Sprite, Tuple[int, int, int, int]] = {}
+
+    def _hash(self, point):
+        return int(point[0] / self.cell_size), int(point[1] / self.cell_size)
+
+    def _get_cells(self, box_object: Sprite) -> Tuple[int, int, int, int]:
+        """ Return the range of cells covered by an object's points. """
+        return self._get_cells_for_bounds(_get_bounds(box_object))
+
+    def _get_cells_for_bounds(self, bounds: Bounds) -> Tuple[int, int, int, int]:
+        return self._hash(bounds[:2]) + self._hash(bounds[2:])
+
+    def _add_to_cells(self, new_object: Sprite, cells: Tuple[int, int, int, int]):
+        contents = self.contents
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                bucket = contents.get((i, j))
+                if bucket is None:
+                    contents[(i, j)] = {new_object}
+                else:
+                    bucket.add(new_object)
+
+    def _remove_from_cells(self, old_object: Sprite, cells: Tuple[int, int, int, int]):
+        contents = self.contents
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                bucket = contents.get((i, j))
+                if bucket is not None:
+                    bucket.discard(old_object)
+                    if not bucket:
+                        del contents[(i, j)]
+
+    def _insert(self, new_object: Sprite, bounds: Bounds):
+        cells = self._get_cells_for_bounds(bounds)
+        old_cells = self.object_cells.get(new_object)
+        if old_cells == cells:
+            return
+        if old_cells is not None:
+            self._remove_from_cells(new_object, old_cells)
+        self.object_cells[new_object] = cells
+        self._add_to_cells(new_object, cells)
+
+    def remove_object(self, sprite_to_delete: Sprite):
+        """
+        Remove a Sprite. Does nothing if the sprite isn't in the hash.
+        """
+        cells = self.object_cells.pop(sprite_to_delete, None)
+        if cells is not None:
+            self._remove_from_cells(sprite_to_delete, cells)
+
+    def clear(self):
+        """ Remove everything. """
+        self.contents.clear()
+        self.object_cells.clear()
+
+    def get_objects_for_box(self, check_object: Sprite) -> List[Sprite]:
+        """
+        Returns the Sprites in the cells the given sprite covers, each
+        one once.
+        """
+        return self._get_objects_for_cells(self._get_cells(check_object))
+
+    def get_objects_for_bounds(self, left: float, bottom: float, right: float, top: float) -> List[Sprite]:
+        """
+        Returns the Sprites in the cells a box covers, each one once.
+        """
+        return self._get_objects_for_cells(self._get_cells_for_bounds((left, bottom, right, top)))
+
+    def get_objects_for_point(self, x: float, y: float) -> List[Sprite]:
+        """
+        Returns the Sprites in the cell a point is in.
+        """
+        return list(self.contents.get(self._hash((x, y)), ()))
+
+    def _get_objects_for_cells(self, cells: Tuple[int, int, int, int]) -> List[Sprite]:
+        contents = self.contents
+
+        close_by_sprites = set()
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                bucket = contents.get((i, j))
+                if bucket is not None:
+                    close_by_sprites.update(bucket)
+
+        return list(close_by_sprites)
+
+
+class _QuadtreeNode:
+    """ One square of a ``LooseQuadtree``, with the objects stored at it. """
+    __slots__ = ('center_x', 'center_y', 'half_size', 'parent', 'quadrant', 'children', 'objects')
+
+    def __init__(self, center_x: float, center_y: float, half_size: float,
+                 parent: Optional['_QuadtreeNode']=None, quadrant: int=0):
+        self.center_x = center_x
+        self.center_y = center_y
+        self.half_size = half_size
+        self.parent = parent
+        self.quadrant = quadrant
+        self.children: Optional[List[Optional[_QuadtreeNode]]] = None
+        self.objects: Dict[Sprite, Bounds] = {}
+
+    def get_child(self, quadrant: int) -> '_QuadtreeNode':
+        """ Return a child node, creating it if needed. """
+        if self.children is None:
+            self.children = [None] * 4
+        child = self.children[quadrant]
+        if child is None:
+            half_size = self.half_size / 2
+            center_x = self.center_x + (half_size if quadrant & 1 else -half_size)
+            center_y = self.center_y + (half_size if quadrant & 2 else -half_size)
+            child = _QuadtreeNode(center_x, center_y, half_size, self, quadrant)
+            self.children[quadrant] = child
+        return child
+
+
+class LooseQuadtree(Broadphase):
+    """
+    Quadtree where each node's area is loosened to twice its size, so every
+    object fits in a single node picked by its size and center. Objects
+    never need splitting between nodes, and a moving object only changes
+    node when it crosses into a new square or changes size a lot.
+
+    The tree starts around (0, 0) and doubles in size when an object lands
+    outside of it.
+    """
+
+    def __init__(self, size: float=4096, max_depth: int=12):
+        """
+        Args:
+            :size: Starting width of the area covered by the tree.
+            :max_depth: Number of times nodes can be split.
+        """
+        self.max_depth = max_depth
+        self.root = _QuadtreeNode(0, 0, size / 2)
+        self.object_nodes: Dict[Sprite, _QuadtreeNode] = {}
+
+    def _find_node(self, bounds: Bounds) -> _QuadtreeNode:
+        """ Find the smallest node the object fits in, creating it if needed. """
+        left, bottom, right, top = bounds
+        x = (left + right) / 2
+        y = (bottom + top) / 2
+        extent = max(right - left, top - bottom) / 2
+
+        node = self.root
+        for _ in range(self.max_depth):
+            if extent > node.half_size / 2:
+                break
+            quadrant = (x >= node.center_x) + 2 * (y >= node.center_y)
+            node = node.get_child(quadrant)
+        return node
+
+    def _grow_to_fit(self, bounds: Bounds):
+        """ Double the size of the tree until it holds the object. """
+        left, bottom, right, top = bounds
+        x = (left + right) / 2
+        y = (bottom + top) / 2
+        extent = max(right - left, top - bottom) / 2
+
+        half_size = self.root.half_size
+        if extent <= half_size and abs(x) < half_size and abs(y) < half_size:
+            return
+        while extent > half_size or abs(x) >= half_size or abs(y) >= half_size:
+            half_size *= 2
+
+        # Put everything back in, in a bigger tree
+        objects = [(item, node.objects[item]) for item, node in self.object_nodes.items()]
+        self.root = _QuadtreeNode(0, 0, half_size)
+        self.object_nodes.clear()
+        for item, item_bounds in objects:
+            node = self._find_node(item_bounds)
+            node.objects[item] = item_bounds
+            self.object_nodes[item] = node
+
+    @staticmethod
+    def _prune(node: _QuadtreeNode):
+        """ Drop empty leaf nodes, working up the tree. """
+        while node.parent is not None and not node.objects and node.children is None:
+            parent = node.parent
+            parent.children[node.quadrant] = None
+            if not any(parent.children):
+                parent.children = None
+            node = parent
+
+    def _insert(self, new_object: Sprite, bounds: Bounds):
+        old_node = self.object_nodes.get(new_object)
+        if old_node is not None and old_node.objects[new_object] == bounds:
+            return
+
+        self._grow_to_fit(bounds)
+        old_node = self.object_nodes.get(new_object)
+        node = self._find_node(bounds)
+        node.objects[new_object] = bounds
+        if old_node is not node:
+            if old_node is not None:
+                del old_node.objects[new_object]
+                self._prune(old_node)
+            self.object_nodes[new_object] = node
+
+    def remove_object(self, sprite_to_delete: Sprite):
+        """ Remove a Sprite. Does nothing if the sprite isn't in the tree. """
+        node = self.object_nodes.pop(sprite_to_delete, None)
+        if node is not None:
+            del node.objects[sprite_to_delete]
+            self._prune(node)
+
+    def clear(self):
+        """ Remove everything. """
+        self.root = _QuadtreeNode(0, 0, self.root.half_size)
+        self.object_nodes.clear()
+
+    def get_objects_for_bounds(self, left: float, bottom: float, right: float, top: float) -> List[Sprite]:
+        """ Returns the Sprites whose bounding box touches a box. """
+        bounds = (left, bottom, right, top)
+        found = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            # Objects reach up to twice the node's size from its center
+            loose_size = node.half_size * 2
+            if (node.center_x - loose_size > right or node.center_x + loose_size < left or
+                    node.center_y - loose_size > top or node.center_y + loose_size < bottom):
+                continue
+            for item, item_bounds in node.objects.items():
+                if _overlaps(bounds, item_bounds):
+                    found.append(item)
+            if node.children is not None:
+                nodes.extend(child for child in node.children if child is not None)
+        return found
+
+
+class SweepAndPrune(Broadphase):
+    """
+    Objects kept sorted by the left edge of their bounding box. Queries use
+    a binary search to find the objects that can overlap on the x axis, and
+    check the rest of the box for those in one vectorized step.
+
+    Moving objects only records their new bounds. The order is fixed up on
+    the next query by sorting the previous order again, which is close to
+    linear time when objects moved a little since the last frame.
+    """
+
+    def __init__(self):
+        self.object_bounds: Dict[Sprite, Bounds] = {}
+        self._order: List[Sprite] = []
+        self._removed = False
+        self._sorted = True
+        self._sorted_bounds = None
+        self._widest = 0.0
+
+    def _insert(self, new_object: Sprite, bounds: Bounds):
+        old_bounds = self.object_bounds.get(new_object)
+        if old_bounds == bounds:
+            return
+        if old_bounds is None:
+            self._order.append(new_object)
+        self.object_bounds[new_object] = bounds
+        self._sorted = False
+
+    def remove_object(self, sprite_to_delete: Sprite):
+        """ Remove a Sprite. Does nothing if the sprite isn't in the index. """
+        if self.object_bounds.pop(sprite_to_delete, None) is not None:
+            self._removed = True
+            self._sorted = False
+
+    def clear(self):
+        """ Remove everything. """
+        self.object_bounds.clear()
+        self._order.clear()
+        self._removed = False
+        self._sorted = False
+
+    def rebuild(self, objects: Iterable[Sprite], bounds: Iterable[Bounds]=None):
+        """
+        Replace everything with the given objects. The previous order is
+        kept as the starting point for sorting.
+        """
+        objects = list(objects)
+        if bounds is None:
+            bounds = map(_get_bounds, objects)
+        old_bounds = self.object_bounds
+        self.object_bounds = dict(zip(objects, map(tuple, bounds)))
+        self._order.extend(item for item in self.object_bounds if item not in old_bounds)
+        self._removed = True
+        self._sorted = False
+
+    def _sort(self):
+        """ Bring the order and the bounds array up to date. """
+        object_bounds = self.object_bounds
+        if self._removed:
+            # A removed object that was added back before this sort is in
+            # the order twice, so keep only its first place
+            self._order = [item for item in dict.fromkeys(self._order) if item in object_bounds]
+            self._removed = False
+        self._order.sort(key=lambda item: object_bounds[item][0])
+
+        if self._order:
+            bounds = np.array([object_bounds[item] for item in self._order])
+            self._widest = (bounds[:, 2] - bounds[:, 0]).max()
+        else:
+            bounds = np.empty((0, 4))
+            self._widest = 0.0
+        self._sorted_bounds = bounds
+        self._sorted = True
+
+    def get_objects_for_bounds(self, left: float, bottom: float, right: float, top: float) -> List[Sprite]:
+        """ Returns the Sprites whose bounding box touches a box. """
+        if not self._sorted:
+            self._sort()
+        bounds = self._sorted_bounds
+        lefts = bounds[:, 0]
+
+        # Nothing starting further left than the widest object can reach us
+        first = np.searchsorted(lefts, left - self._widest, side='left')
+        last = np.searchsorted(lefts, right, side='right')
+        window = bounds[first:last]
+        hit = (window[:, 2] >= left) & (window[:, 1] <= top) & (window[:, 3] >= bottom)
+
+        order = self._order
+        return [order[i] for i in (np.flatnonzero(hit) + first).tolist()]
+
+
+class StaticGrid:
+    """
+    Read-only grid over a fixed set of (left, bottom, right, top) boxes,
+    used by frozen sprite lists. Everything is kept in flat numpy arrays,
+    compressed sparse row style: the keys of the cells that have boxes in
+    them, sorted, and the boxes of each cell one cell after another. Queries
+    return box indexes without touching any Python objects per box.
+    """
+
+    def __init__(self, bounds: np.ndarray, cell_size: float=128):
+        """
+        Args:
+            :bounds: (n, 4) array of the boxes to index.
+            :cell_size: Size of each grid cell.
+        """
+        self.cell_size = cell_size
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.count = len(bounds)
+        self.columns = self.rows = 0
+        # (start, end) of each cell's boxes by key, made on the first point query
+        self._cell_ranges = None
+        if self.count == 0:
+            self.origin = np.zeros(2)
+            self.cell_keys = np.zeros(0, dtype=np.int64)
+            self.cell_starts = np.zeros(1, dtype=np.int64)
+            self.items = np.zeros(0, dtype=np.int64)
+            return
+
+        self.origin = bounds[:, :2].min(axis=0)
+        cells = self._get_cells(bounds)
+        self.columns = int(cells[:, 2].max()) + 1
+        self.rows = int(cells[:, 3].max()) + 1
+
+        items, keys = self._get_cell_keys(cells)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        self.items = items[order]
+        self.cell_keys, starts = np.unique(keys, return_index=True)
+        self.cell_starts = np.append(starts, len(keys))
+
+    def _get_cells(self, bounds: np.ndarray) -> np.ndarray:
+        """ (min column, min row, max column, max row) covered by each box, clipped to the grid. """
+        cells = np.floor((bounds - np.tile(self.origin, 2)) / self.cell_size)
+        if self.columns:
+            cells[:, 0::2] = cells[:, 0::2].clip(0, self.columns - 1)
+            cells[:, 1::2] = cells[:, 1::2].clip(0, self.rows - 1)
+        return cells.astype(np.int64)
+
+    def _get_cell_keys(self, cells: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Every (box, cell key) pair for the given cell ranges, as two arrays
+        of box positions and keys.
+        """
+        widths = cells[:, 2] - cells[:, 0] + 1
+        counts = widths * (cells[:, 3] - cells[:, 1] + 1)
+        boxes = np.repeat(np.arange(len(cells)), counts)
+        # Position of each pair among those of its box
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        column = cells[boxes, 0] + local % widths[boxes]
+        row = cells[boxes, 1] + local // widths[boxes]
+        return boxes, row * self.columns + column
+
+    def get_pairs_for_bounds(self, bounds: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Find the indexed boxes that share a cell with each of the given
+        (n, 4) boxes. Returns matching arrays of query positions and box
+        indexes, with each pair once.
+        """
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        empty = np.zeros(0, dtype=np.int64)
+        if self.count == 0 or len(bounds) == 0:
+            return empty, empty
+
+        # Drop queries that miss the grid altogether
+        origin = np.tile(self.origin, 2)
+        corner = self.origin + self.cell_size * np.array((self.columns, self.rows))
+        inside = ((bounds[:, 2] >= origin[0]) & (bounds[:, 3] >= origin[1]) &
+                  (bounds[:, 0] < corner[0]) & (bounds[:, 1] < corner[1]))
+        queries = np.flatnonzero(inside)
+        if len(queries) == 0:
+            return empty, empty
+
+        query_positions, keys = self._get_cell_keys(self._get_cells(bounds[queries]))
+        query_positions, items = self._get_pairs_for_keys(queries[query_positions], keys)
+
+        # A box spanning several cells is found once per cell
+        pairs = np.unique(query_positions * self.count + items)
+        return pairs // self.count, pairs % self.count
+
+    def get_pairs_for_points(self, points: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Find the indexed boxes in the cell each of the given (n, 2) points
+        is in. Returns matching arrays of query positions and box indexes.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        empty = np.zeros(0, dtype=np.int64)
+        if self.count == 0 or len(points) == 0:
+            return empty, empty
+
+        cells = np.floor((points - self.origin) / self.cell_size)
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self.columns) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self.rows))
+        queries = np.flatnonzero(inside)
+        cells = cells[queries].astype(np.int64)
+        return self._get_pairs_for_keys(queries, cells[:, 1] * self.columns + cells[:, 0])
+
+    def get_indexes_for_point(self, x: float, y: float) -> List[int]:
+        """ Returns the indexes of the boxes in the cell a point is in. """
+        # Worked out in plain Python, for walking along rays cell by cell
+        origin_x, origin_y = self.origin.tolist()
+        column = math.floor((x - origin_x) / self.cell_size)
+        row = math.floor((y - origin_y) / self.cell_size)
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return []
+
+        if self._cell_ranges is None:
+            starts = self.cell_starts.tolist()
+            self._cell_ranges = dict(zip(self.cell_keys.tolist(), zip(starts[:-1], starts[1:])))
+        cell_range = self._cell_ranges.get(row * self.columns + column)
+        if cell_range is None:
+            return []
+        return self.items[cell_range[0]:cell_range[1]].tolist()
+
+    def _get_pairs_for_keys(self, query_positions: np.ndarray, keys: np.ndarray) -> (np.ndarray, np.ndarray):
+        """ Expand each (query position, cell key) pair into the boxes in that cell. """
+        cell = np.searchsorted(self.cell_keys, keys).clip(0, len(self.cell_keys) - 1)
+        found = self.cell_keys[cell] == keys
+        query_positions = query_positions[found]
+        cell = cell[found]
+
+        starts = self.cell_starts[cell]
+        counts = self.cell_starts[cell + 1] - starts
+        query_positions = np.repeat(query_positions, counts)
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return query_positions, self.items[np.arange(counts.sum()) + offsets]
+
+    def get_indexes_for_bounds(self, left: float, bottom: float, right: float, top: float) -> np.ndarray:
+        """ Returns the sorted indexes of the boxes that share a cell with a box. """
+        # Worked out in plain Python, as one small box is too little work
+        # for the numpy version to pay off
+        origin_x, origin_y = self.origin.tolist()
+        cell_size = self.cell_size
+        min_column = max(int((left - origin_x) // cell_size), 0)
+        max_column = min(int((right - origin_x) // cell_size), self.columns - 1)
+        min_row = max(int((bottom - origin_y) // cell_size), 0)
+        max_row = min(int((top - origin_y) // cell_size), self.rows - 1)
+        if min_column > max_column or min_row > max_row:
+            return np.zeros(0, dtype=np.int64)
+
+        columns = self.columns
+        keys = [row * columns + column
+                for row in range(min_row, max_row + 1)
+                for column in range(min_column, max_column + 1)]
+        cell_keys = self.cell_keys
+        cells = cell_keys.searchsorted(keys).tolist()
+        found_keys = cell_keys.take(cells, mode='clip').tolist()
+        starts = self.cell_starts
+        parts = [self.items[starts[cell]:starts[cell + 1]]
+                 for key, cell, found in zip(keys, cells, found_keys) if key == found]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts))
@@ -6,10 +6,10 @@
 the graphics card for much faster render times.
 """
 
-import math
 import itertools
 from collections import defaultdict
 import ctypes
+import weakref
 import pyglet.gl as gl
 import numpy as np
 
@@ -18,10 +18,23 @@
 from typing import Generic
 
 from arcade.arcade_types import Color
-from arcade.draw_commands import rotate_point
 from arcade.arcade_types import PointList
 from arcade.draw_commands import get_four_byte_color
 from arcade.draw_commands import get_projection
+from arcade.draw_commands import flush_draw_commands
+from arcade.draw_commands import line_vertex_shader
+from arcade.draw_commands import line_fragment_shader
+from arcade.draw_commands import _line_vertex_type
+from arcade.draw_commands import sdf_vertex_shader
+from arcade.draw_commands import sdf_fragment_shader
+from arcade.draw_commands import _sdf_instance_type
+from arcade.draw_commands import _sdf_instance_format
+from arcade.draw_commands import _sdf_instance_attributes
+from arcade.draw_commands import _SDF_ELLIPSE
+from arcade.draw_commands import _SDF_ROUNDED_RECTANGLE
+from arcade.draw_commands import _UNIT_RECTANGLE
+from arcade.draw_commands import _get_unit_circle
+from arcade.draw_commands import _transform_points
 from arcade import shader
 
 
@@ -52,17 +65,79 @@ def __init__(self, vbo_vertex_id: gl.GLuint, size: float, draw_mode: int, vbo_co
 
 
 class Shape:
-    def __init__(self):
-        self.vao = None
-        self.vbo = None
-        self.program = None
-        self.mode = None
-        self.line_width = 1
+    """
+    A shape made by one of the ``create_*`` functions.
 
-    def draw(self):
-        # program['Projection'].write(get_projection().tobytes())
+    The vertices are kept in ``data`` until the shape is drawn on its own,
+    which is when the vertex buffer and vertex array are created. Shapes that
+    are only drawn as part of a ``ShapeElementList`` never need their own.
 
-        with self.vao:
+    Attributes:
+        :data: Numpy array with the ``vertex`` and ``color`` of each vertex.
+        :mode: OpenGL mode used to draw the vertices.
+        :line_width: Width of the lines, for line modes.
+    """
+    def __init__(self, data: np.ndarray=None, mode: int=None, line_width: float=1):
+        self.data = data
+        self.mode = mode
+        self.line_width = line_width
+        # Number of vertices, or indices, to draw. All of them if None.
+        self.vertex_count = None
+        self._vao = None
+        self._vbo = None
+        self._program = None
+
+    def _create_buffers(self):
+        """ Put the vertices on the graphics card, if not done already. """
+        if self._vao is not None or self.data is None:
+            return
+
+        self._program = shader.get_program(line_vertex_shader, line_fragment_shader)
+        weakref.finalize(self, shader.release_program, self._program)
+
+        self._vbo = shader.buffer(self.data.tobytes())
+        vao_content = [
+            shader.BufferDescription(
+                self._vbo,
+                '2f 4B',
+                ('in_vert', 'in_color'),
+                normalized=['in_color']
+            )
+        ]
+        self._vao = shader.vertex_array(self._program, vao_content)
+
+    def _get_vao(self) -> shader.VertexArray:
+        self._create_buffers()
+        return self._vao
+
+    def _set_vao(self, vao: shader.VertexArray):
+        self._vao = vao
+
+    vao = property(_get_vao, _set_vao)
+
+    def _get_vbo(self) -> shader.Buffer:
+        self._create_buffers()
+        return self._vbo
+
+    def _set_vbo(self, vbo: shader.Buffer):
+        self._vbo = vbo
+
+    vbo = property(_get_vbo, _set_vbo)
+
+    def _get_program(self) -> shader.Program:
+        self._create_buffers()
+        return self._program
+
+    def _set_program(self, program: shader.Program):
+        self._program = program
+
+    program = property(_get_program, _set_program)
+
+    def draw(self):
+        flush_draw_commands()
+        vao = self.vao
+        with vao:
+            self.program['Projection'] = get_projection().flatten()
             gl.glLineWidth(self.line_width)
 
             gl.glEnable(gl.GL_BLEND)
@@ -73,7 +148,7 @@ def draw(self):
             gl.glEnable(gl.GL_PRIMITIVE_RESTART)
             gl.glPrimitiveRestartIndex(2 ** 32 - 1)
 
-            self.vao.render(mode=self.mode)
+            vao.render(mode=self.mode, vertices=self.vertex_count)
 
 
 def create_line(start_x: float, start_y: float, end_x: float, end_y: float,
@@ -94,55 +169,11 @@ def create_line(start_x: float, start_y: float, end_x: float, end_y: float,
 
     """
 
-    program = shader.program(
-        vertex_shader='''
-            #version 330
-            uniform mat4 Projection;
-            in vec2 in_vert;
-            in vec4 in_color;
-            out vec4 v_color;
-            void main() {
-               gl_Position = Projection * vec4(in_vert, 0.0, 1.0);
-               v_color = in_color;
-            }
-        ''',
-        fragment_shader='''
-            #version 330
-            in vec4 v_color;
-            out vec4 f_color;
-            void main() {
-                f_color = v_color;
-            }
-        ''',
-    )
-
-    buffer_type = np.dtype([('vertex', '2f4'), ('color', '4B')])
-    data = np.zeros(2, dtype=buffer_type)
+    data = np.zeros(2, dtype=_line_vertex_type)
     data['vertex'] = (start_x, start_y), (end_x, end_y)
     data['color'] = get_four_byte_color(color)
 
-    vbo = shader.buffer(data.tobytes())
-    vao_content = [
-        shader.BufferDescription(
-            vbo,
-            '2f 4B',
-            ('in_vert', 'in_color'),
-            normalized=['in_color']
-        )
-    ]
-
-    vao = shader.vertex_array(program, vao_content)
-    with vao:
-        program['Projection'] = get_projection().flatten()
-
-    shape = Shape()
-    shape.vao = vao
-    shape.vbo = vbo
-    shape.program = program
-    shape.mode = gl.GL_LINE_STRIP
-    shape.line_width = line_width
-
-    return shape
+    return Shape(data, gl.GL_LINE_STRIP, line_width)
 
 
 def create_line_generic_with_colors(point_list: PointList,
@@ -153,55 +184,11 @@ def create_line_generic_with_colors(point_list: PointList,
     This function is used by ``create_line_strip`` and ``create_line_loop``,
     just changing the OpenGL type for the line drawing.
     """
-    program = shader.program(
-        vertex_shader='''
-            #version 330
-            uniform mat4 Projection;
-            in vec2 in_vert;
-            in vec4 in_color;
-            out vec4 v_color;
-            void main() {
-               gl_Position = Projection * vec4(in_vert, 0.0, 1.0);
-               v_color = in_color;
-            }
-        ''',
-        fragment_shader='''
-            #version 330
-            in vec4 v_color;
-            out vec4 f_color;
-            void main() {
-                f_color = v_color;
-            }
-        ''',
-    )
-
-    buffer_type = np.dtype([('vertex', '2f4'), ('color', '4B')])
-    data = np.zeros(len(point_list), dtype=buffer_type)
+    data = np.zeros(len(point_list), dtype=_line_vertex_type)
     data['vertex'] = point_list
     data['color'] = [get_four_byte_color(color) for color in color_list]
 
-    vbo = shader.buffer(data.tobytes())
-    vao_content = [
-        shader.BufferDescription(
-            vbo,
-            '2f 4B',
-            ('in_vert', 'in_color'),
-            normalized=['in_color']
-        )
-    ]
-
-    vao = shader.vertex_array(program, vao_content)
-    with vao:
-        program['Projection'] = get_projection().flatten()
-
-    shape = Shape()
-    shape.vao = vao
-    shape.vbo = vbo
-    shape.program = program
-    shape.mode = shape_mode
-    shape.line_width = line_width
-
-    return shape
+    return Shape(data, shape_mode, line_width)
 
 
 def create_line_generic(point_list: PointList,
@@ -345,36 +332,27 @@ def create_rectangle_outline(center_x: float, center_y: float, width: float,
                             color, border_width, tilt_angle, filled=False)
 
 
+def _get_rectangle_points(center_x: float, center_y: float, width: float,
+                          height: float, tilt_angle: float=0) -> np.ndarray:
+    """
+    Return the four corners of a rectangle as a (4, 2) numpy array, starting
+    at the bottom left and going clockwise.
+    """
+    return _transform_points(_UNIT_RECTANGLE[[0, 3, 2, 1]], center_x, center_y,
+                             width, height, tilt_angle)
+
+
 def get_rectangle_points(center_x: float, center_y: float, width: float,
                          height: float, tilt_angle: float=0) -> PointList:
     """
     Utility function that will return all four coordinate points of a
     rectangle given the x, y center, width, height, and rotation.
     """
-    x1 = -width / 2 + center_x
-    y1 = -height / 2 + center_y
-
-    x2 = -width / 2 + center_x
-    y2 = height / 2 + center_y
-
-    x3 = width / 2 + center_x
-    y3 = height / 2 + center_y
-
-    x4 = width / 2 + center_x
-    y4 = -height / 2 + center_y
-
+    points = _get_rectangle_points(center_x, center_y, width, height, tilt_angle)
     if tilt_angle:
-        x1, y1 = rotate_point(x1, y1, center_x, center_y, tilt_angle)
-        x2, y2 = rotate_point(x2, y2, center_x, center_y, tilt_angle)
-        x3, y3 = rotate_point(x3, y3, center_x, center_y, tilt_angle)
-        x4, y4 = rotate_point(x4, y4, center_x, center_y, tilt_angle)
-
-    data = [(x1, y1),
-            (x2, y2),
-            (x3, y3),
-            (x4, y4)]
-
-    return data
+        # Rotated points are rounded, as rotate_point does
+        points = points.round(2)
+    return [tuple(point) for point in points.tolist()]
 
 
 def create_rectangle(center_x: float, center_y: float, width: float,
@@ -394,57 +372,320 @@ def create_rectangle(center_x: float, center_y: float, width: float,
     >>> arcade.finish_render()
     >>> arcade.quick_run(0.25)
     """
-    data = get_rectangle_points(center_x, center_y, width, height, tilt_angle)
+    data = _get_rectangle_points(center_x, center_y, width, height, tilt_angle)
 
     if filled:
         shape_mode = gl.GL_TRIANGLE_STRIP
-        data[-2:] = reversed(data[-2:])
+        data = data[[0, 1, 3, 2]]
     else:
         shape_mode = gl.GL_LINE_STRIP
-        data.append(data[0])
+        data = data[[0, 1, 2, 3, 0]]
     shape = create_line_generic(data, color, shape_mode, border_width)
     return shape
 
-# Seems that ShapeElementList would be a better tool for this
+_instanced_vertex_shader = '''
+    #version 330
+    uniform mat4 Projection;
+    in vec2 in_vert;
+    in vec2 in_center;
+    in vec2 in_size;
+    in float in_angle;
+    in vec4 in_color;
+    out vec4 v_color;
+    void main() {
+        float angle = radians(in_angle);
+        mat2 rotate = mat2(
+            cos(angle), sin(angle),
+            -sin(angle), cos(angle)
+        );
+        gl_Position = Projection * vec4(in_center + rotate * (in_vert * in_size), 0.0, 1.0);
+        v_color = in_color;
+    }
+'''
+
+_instance_type = np.dtype([('center', '2f4'), ('size', '2f4'), ('angle', 'f4'), ('color', '4B')])
+
+
+def _get_four_byte_colors(colors, count: int) -> np.ndarray:
+    """ Turn one color, or a list of RGB or RGBA colors, into a (count, 4) array. """
+    colors = np.asarray(colors, dtype=np.uint8)
+    if colors.ndim == 1:
+        colors = np.broadcast_to(colors, (count, len(colors)))
+    if colors.shape[1] == 3:
+        colors = np.concatenate((colors, np.full((count, 1), 255, dtype=np.uint8)), axis=1)
+    return colors
+
+
+class InstancedShapes:
+    """
+    Many copies of one mesh, each with its own center, size, angle and
+    color, drawn with a single instanced draw call. Create them with
+    ``create_rectangle_batch``, ``create_ellipse_batch`` or
+    ``create_line_batch``.
 
-# def create_filled_rectangles(point_list, color: Color) -> Shape:
-#     """
-#     This function creates multiple rectangle/quads using a vertex buffer object.
-#     Creating the rectangles, and then later drawing it with ``render``
-#     is faster than calling ``draw_rectangle``.
+    Single shapes can be changed with ``update``, which only sends the
+    changed shapes to the graphics card on the next draw. After changing
+    ``instance_data`` directly, call ``refresh``.
 
-#     >>> import arcade
-#     >>> arcade.open_window(800,600,"Drawing Example")
-#     >>> point_list = [0, 0, 100, 0, 100, 100, 0, 100]
-#     >>> my_rect = arcade.create_filled_rectangles(point_list, (0, 255, 0))
-#     >>> arcade.render(my_rect)
-#     >>> arcade.finish_render()
-#     >>> arcade.quick_run(0.25)
-#     """
+    Attributes:
+        :instance_data: Numpy structured array with a ``center``, ``size``, \
+        ``angle`` and ``color`` for each shape.
+        :mode: OpenGL mode used to draw the mesh.
+    """
+    instance_type = _instance_type
+    instance_format = '2f 2f 1f 4B'
+    instance_attributes = ('in_center', 'in_size', 'in_angle', 'in_color')
+    vertex_shader = _instanced_vertex_shader
+    fragment_shader = line_fragment_shader
+
+    def __init__(self, mesh: np.ndarray, mode: int, centers, sizes, colors, angles=None):
+        count = len(centers)
+        self.instance_data = np.zeros(count, dtype=self.instance_type)
+        self.instance_data['center'] = centers
+        self.instance_data['size'] = sizes
+        if angles is not None:
+            self.instance_data['angle'] = angles
+        self.instance_data['color'] = _get_four_byte_colors(colors, count)
+
+        self.mesh = np.asarray(mesh, dtype=np.float32)
+        self.mode = mode
+
+        # Created the first time we are drawn
+        self.program = None
+        self.vao = None
+        self.vbo = None
+        self.instance_buffer = None
+
+        self._dirty = set()
+        self._all_dirty = False
+
+    def __len__(self) -> int:
+        return len(self.instance_data)
+
+    def update(self, index: int, center=None, size=None, angle: float=None, color: Color=None):
+        """ Change one shape. Anything left as None stays the same. """
+        instance = self.instance_data[index]
+        if center is not None:
+            instance['center'] = center
+        if size is not None:
+            instance['size'] = size
+        if angle is not None:
+            instance['angle'] = angle
+        if color is not None:
+            instance['color'] = get_four_byte_color(color)
+        self._dirty.add(index)
+
+    def refresh(self):
+        """ Send all the shapes to the graphics card again on the next draw. """
+        self._all_dirty = True
+
+    def _create_buffers(self):
+        self.program = shader.get_program(self.vertex_shader, self.fragment_shader)
+        weakref.finalize(self, shader.release_program, self.program)
+
+        self.vbo = shader.buffer(self.mesh.tobytes())
+        self.instance_buffer = shader.buffer(self.instance_data.tobytes(), usage='dynamic')
+        vao_content = [
+            shader.BufferDescription(
+                self.vbo,
+                '2f',
+                ('in_vert',)
+            ),
+            shader.BufferDescription(
+                self.instance_buffer,
+                self.instance_format,
+                self.instance_attributes,
+                normalized=['in_color'],
+                instanced=True
+            )
+        ]
+        self.vao = shader.vertex_array(self.program, vao_content)
+        self._dirty.clear()
+        self._all_dirty = False
+
+    def _upload_changes(self):
+        """ Send the shapes changed since the last draw to the graphics card. """
+        if self._all_dirty:
+            self.instance_buffer.write(self.instance_data.tobytes())
+        elif self._dirty:
+            item_size = self.instance_type.itemsize
+            indexes = np.array(sorted(self._dirty))
+            breaks = np.flatnonzero(np.diff(indexes) > 1) + 1
+            for run in np.split(indexes, breaks):
+                start, end = int(run[0]), int(run[-1]) + 1
+                self.instance_buffer.write(self.instance_data[start:end].tobytes(),
+                                           offset=start * item_size)
+        self._dirty.clear()
+        self._all_dirty = False
 
-#     data = point_list
+    def draw(self):
+        """ Draw all the shapes. """
+        if len(self.instance_data) == 0:
+            return
 
-#     # print(data)
-#     vbo_id = gl.GLuint()
+        flush_draw_commands()
+        if self.vao is None:
+            self._create_buffers()
+        else:
+            self._upload_changes()
 
-#     gl.glGenBuffers(1, ctypes.pointer(vbo_id))
+        with self.vao:
+            self.program['Projection'] = get_projection().flatten()
 
-#     # Create a buffer with the data
-#     # This line of code is a bit strange.
-#     # (gl.GLfloat * len(data)) creates an array of GLfloats, one for each number
-#     # (*data) initalizes the list with the floats. *data turns the list into a
-#     # tuple.
-#     data2 = (gl.GLfloat * len(data))(*data)
+            gl.glEnable(gl.GL_BLEND)
+            gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
 
-#     gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo_id)
-#     gl.glBufferData(gl.GL_ARRAY_BUFFER, ctypes.sizeof(data2), data2,
-#                     gl.GL_STATIC_DRAW)
+            self.vao.render(self.mode, instances=len(self.instance_data))
 
-#     shape_mode = gl.GL_QUADS
-#     shape = VertexBuffer(vbo_id, len(data) // 2, shape_mode)
 
-#     shape.color = color
-#     return shape
+class SDFShapes(InstancedShapes):
+    """
+    Many ellipses or rounded rectangles, each drawn as a single rectangle
+    with its shape cut out by the fragment shader, using the distance to its
+    edge. The edges stay smooth at any size, and outlines are supported.
+    Create them with ``create_ellipse_batch(..., sdf=True)``,
+    ``create_ellipse_outline_batch`` or ``create_rounded_rectangle_batch``.
+
+    Besides the fields of ``InstancedShapes``, ``instance_data`` has a
+    ``border_width`` and ``corner_radius`` for each shape. Shapes with a
+    border width of 0 are filled. Sizes are the distance from the center to
+    the edge along each axis.
+    """
+    instance_type = _sdf_instance_type
+    instance_format = _sdf_instance_format
+    instance_attributes = _sdf_instance_attributes
+    vertex_shader = sdf_vertex_shader
+    fragment_shader = sdf_fragment_shader
+
+    def __init__(self, kind: int, centers, sizes, colors, angles=None,
+                 border_widths=0, corner_radii=0):
+        mesh = np.array(((-1, -1), (1, -1), (-1, 1), (1, 1)))
+        super().__init__(mesh, gl.GL_TRIANGLE_STRIP, centers, sizes, colors, angles)
+        self.instance_data['border_width'] = border_widths
+        self.instance_data['corner_radius'] = corner_radii
+        self.instance_data['kind'] = kind
+
+    def update(self, index: int, center=None, size=None, angle: float=None, color: Color=None,
+               border_width: float=None, corner_radius: float=None):
+        """ Change one shape. Anything left as None stays the same. """
+        super().update(index, center, size, angle, color)
+        instance = self.instance_data[index]
+        if border_width is not None:
+            instance['border_width'] = border_width
+        if corner_radius is not None:
+            instance['corner_radius'] = corner_radius
+
+
+def create_rectangle_batch(centers, sizes, colors, angles=None) -> InstancedShapes:
+    """
+    Create many filled rectangles, drawn together with one draw call.
+
+    Args:
+        :centers: (n, 2) array of rectangle centers.
+        :sizes: (n, 2) array of rectangle widths and heights.
+        :colors: One color for all the rectangles, or an (n, 3) or (n, 4) \
+        array of colors.
+        :angles: Optional array of n angles in degrees.
+
+    >>> import arcade
+    >>> import numpy as np
+    >>> arcade.open_window(800,600,"Drawing Example")
+    >>> centers = np.random.rand(1000, 2) * (800, 600)
+    >>> rects = arcade.create_rectangle_batch(centers, (4, 4), arcade.color.RED)
+    >>> arcade.start_render()
+    >>> rects.draw()
+    >>> arcade.finish_render()
+    >>> arcade.quick_run(0.25)
+    """
+    centers = np.asarray(centers)
+    mesh = _UNIT_RECTANGLE[[0, 1, 3, 2]]
+    return InstancedShapes(mesh, gl.GL_TRIANGLE_STRIP, centers, sizes, colors, angles)
+
+
+def create_ellipse_batch(centers, sizes, colors, angles=None, num_segments: int=32,
+                         sdf: bool=False) -> InstancedShapes:
+    """
+    Create many filled ellipses, drawn together with one draw call. Like
+    ``create_ellipse_filled``, the sizes are the distances from the center
+    to the edge along each axis.
+
+    Args:
+        :centers: (n, 2) array of ellipse centers.
+        :sizes: (n, 2) array of ellipse widths and heights.
+        :colors: One color for all the ellipses, or an (n, 3) or (n, 4) \
+        array of colors.
+        :angles: Optional array of n tilt angles in degrees.
+        :num_segments: Number of triangles used for each ellipse.
+        :sdf: Draw each ellipse as one rectangle with the ellipse cut out by \
+        the fragment shader, instead of with triangles. See ``SDFShapes``.
+    """
+    centers = np.asarray(centers)
+    if sdf:
+        return SDFShapes(_SDF_ELLIPSE, centers, sizes, colors, angles)
+    circle = _get_unit_circle(num_segments)
+    mesh = np.concatenate((np.zeros((1, 2)), circle, circle[:1]))
+    return InstancedShapes(mesh, gl.GL_TRIANGLE_FAN, centers, sizes, colors, angles)
+
+
+def create_ellipse_outline_batch(centers, sizes, colors, border_width: float=1,
+                                 angles=None) -> SDFShapes:
+    """
+    Create many ellipse outlines, drawn together with one draw call. The
+    outlines are SDF shapes, see ``SDFShapes``.
+
+    Args:
+        :centers: (n, 2) array of ellipse centers.
+        :sizes: (n, 2) array of ellipse widths and heights.
+        :colors: One color for all the ellipses, or an (n, 3) or (n, 4) \
+        array of colors.
+        :border_width: Width of the outlines, or an array of n widths.
+        :angles: Optional array of n tilt angles in degrees.
+    """
+    return SDFShapes(_SDF_ELLIPSE, np.asarray(centers), sizes, colors, angles, border_width)
+
+
+def create_rounded_rectangle_batch(centers, sizes, corner_radius, colors,
+                                   angles=None, border_width: float=0) -> SDFShapes:
+    """
+    Create many rectangles with rounded corners, drawn together with one
+    draw call. These are SDF shapes, see ``SDFShapes``.
+
+    Args:
+        :centers: (n, 2) array of rectangle centers.
+        :sizes: (n, 2) array of rectangle widths and heights.
+        :corner_radius: Radius of the corners, or an array of n radii.
+        :colors: One color for all the rectangles, or an (n, 3) or (n, 4) \
+        array of colors.
+        :angles: Optional array of n angles in degrees.
+        :border_width: Width of the outlines, or an array of n widths. \
+        Rectangles with a border width of 0 are filled.
+    """
+    half_sizes = np.asarray(sizes, dtype=np.float64) / 2
+    return SDFShapes(_SDF_ROUNDED_RECTANGLE, np.asarray(centers), half_sizes, colors,
+                     angles, border_width, corner_radius)
+
+
+def create_line_batch(start_points, end_points, colors, line_width: float=1) -> InstancedShapes:
+    """
+    Create many separate lines, drawn together with one draw call. Each
+    line is drawn as a thin rectangle, so any line width works. In the
+    returned shapes, the center of a line is its start point, and its size
+    is its length and width.
+
+    Args:
+        :start_points: (n, 2) array of line starting points.
+        :end_points: (n, 2) array of line ending points.
+        :colors: One color for all the lines, or an (n, 3) or (n, 4) \
+        array of colors.
+        :line_width: Width of the lines.
+    """
+    start_points = np.asarray(start_points, dtype=np.float64)
+    deltas = np.asarray(end_points, dtype=np.float64) - start_points
+    lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    sizes = np.stack((lengths, np.full(len(lengths), line_width)), axis=1)
+    angles = np.degrees(np.arctan2(deltas[:, 1], deltas[:, 0]))
+    mesh = np.array(((0, -0.5), (1, -0.5), (0, 0.5), (1, 0.5)))
+    return InstancedShapes(mesh, gl.GL_TRIANGLE_STRIP, start_points, sizes, colors, angles)
 
 
 def create_rectangle_filled_with_colors(point_list, color_list) -> Shape:
@@ -496,9 +737,10 @@ def create_triangles_filled_with_colors(point_list, color_list) -> Shape:
 
 def create_ellipse_filled(center_x: float, center_y: float,
                           width: float, height: float, color: Color,
-                          tilt_angle: float=0, num_segments=128) -> Shape:
+                          tilt_angle: float=0, num_segments=128, sdf: bool=False) -> Shape:
     """
     Create a filled ellipse. Or circle if you use the same width and height.
+    With ``sdf`` set, this is an ``SDFShapes`` holding the one ellipse.
 
     >>> import arcade
     >>> arcade.open_window(800,600,"Drawing Example")
@@ -510,15 +752,16 @@ def create_ellipse_filled(center_x: float, center_y: float,
 
     border_width = 1
     return create_ellipse(center_x, center_y, width, height, color,
-                          border_width, tilt_angle, num_segments, filled=True)
+                          border_width, tilt_angle, num_segments, filled=True, sdf=sdf)
 
 
 def create_ellipse_outline(center_x: float, center_y: float,
                            width: float, height: float, color: Color,
                            border_width: float=1,
-                           tilt_angle: float=0, num_segments=128) -> Shape:
+                           tilt_angle: float=0, num_segments=128, sdf: bool=False) -> Shape:
     """
-    Create an outline of an ellipse.
+    Create an outline of an ellipse. With ``sdf`` set, this is an
+    ``SDFShapes`` holding the one outline.
 
     >>> import arcade
     >>> arcade.open_window(800,600,"Drawing Example")
@@ -529,20 +772,25 @@ def create_ellipse_outline(center_x: float, center_y: float,
     """
 
     return create_ellipse(center_x, center_y, width, height, color,
-                          border_width, tilt_angle, num_segments, filled=False)
+                          border_width, tilt_angle, num_segments, filled=False, sdf=sdf)
 
 
 def create_ellipse(center_x: float, center_y: float,
                    width: float, height: float, color: Color,
                    border_width: float=1,
                    tilt_angle: float=0, num_segments=32,
-                   filled=True) -> Shape:
+                   filled=True, sdf: bool=False) -> Shape:
 
     """
     This creates an ellipse vertex buffer object (VBO). It can later be
     drawn with ``render_ellipse_filled``. This method of drawing an ellipse
     is much faster than calling ``draw_ellipse_filled`` each frame.
 
+    With ``sdf`` set, the ellipse is instead an ``SDFShapes`` holding one
+    rectangle, with the ellipse cut out by the fragment shader, and
+    ``num_segments`` is not used. Draw it with ``render`` or its ``draw``
+    method. It can't be added to a ``ShapeElementList``.
+
     Note: This can't be unit tested on Appveyor because its support for OpenGL is
     poor.
 
@@ -555,29 +803,25 @@ def create_ellipse(center_x: float, center_y: float,
     >>> arcade.quick_run(0.25)
 
     """
-    # Create an array with the vertex point_list
-    point_list = []
-
-    for segment in range(num_segments):
-        theta = 2.0 * 3.1415926 * segment / num_segments
-
-        x = width * math.cos(theta) + center_x
-        y = height * math.sin(theta) + center_y
-
-        if tilt_angle:
-            x, y = rotate_point(x, y, center_x, center_y, tilt_angle)
+    if sdf:
+        return SDFShapes(_SDF_ELLIPSE, np.array(((center_x, center_y),)), ((width, height),), color,
+                         (tilt_angle,), 0 if filled else border_width)
 
-        point_list.append((x, y))
+    point_list = _transform_points(_get_unit_circle(num_segments), center_x, center_y,
+                                   width, height, tilt_angle)
 
     if filled:
-        half = len(point_list) // 2
-        interleaved = itertools.chain.from_iterable(
-            itertools.zip_longest(point_list[:half], reversed(point_list[half:]))
-        )
-        point_list = [p for p in interleaved if p is not None]
+        # Zig-zag between the two halves of the ellipse for a triangle strip
+        half = num_segments // 2
+        order = np.empty(num_segments, dtype=int)
+        order[0:2 * half:2] = np.arange(half)
+        order[1:2 * half:2] = np.arange(num_segments - 1, num_segments - half - 1, -1)
+        if num_segments % 2:
+            order[-1] = half
+        point_list = point_list[order]
         shape_mode = gl.GL_TRIANGLE_STRIP
     else:
-        point_list.append(point_list[0])
+        point_list = np.concatenate((point_list, point_list[:1]))
         shape_mode = gl.GL_LINE_STRIP
 
     return create_line_generic(point_list, color, shape_mode, border_width)
@@ -600,22 +844,10 @@ def create_ellipse_filled_with_colors(center_x: float, center_y: float,
     >>> arcade.finish_render()
     >>> arcade.quick_run(0.25)
     """
-    # Create an array with the vertex data
-    # Create an array with the vertex point_list
-    point_list = []
-
-    point_list.append((center_x, center_y))
-    for segment in range(num_segments):
-        theta = 2.0 * 3.1415926 * segment / num_segments
-
-        x = width * math.cos(theta) + center_x
-        y = height * math.sin(theta) + center_y
-
-        if tilt_angle:
-            x, y = rotate_point(x, y, center_x, center_y, tilt_angle)
-
-        point_list.append((x, y))
-    point_list.append(point_list[1])
+    # The center, then around the edge and back to the start, for a triangle fan
+    edge_points = _transform_points(_get_unit_circle(num_segments), center_x, center_y,
+                                    width, height, tilt_angle)
+    point_list = np.concatenate(([(center_x, center_y)], edge_points, edge_points[:1]))
 
     color_list = [inside_color] + [outside_color] * (num_segments + 1)
     return create_line_generic_with_colors(point_list, color_list, gl.GL_TRIANGLE_FAN)
@@ -625,6 +857,10 @@ def render(shape: VertexBuffer):
     """
     Render an shape previously created with a ``create`` function.
     """
+    if isinstance(shape, InstancedShapes):
+        shape.draw()
+        return
+
     # Set color
     if shape.color is None:
         raise ValueError("Error: Color parameter not set.")
@@ -650,6 +886,38 @@ def render(shape: VertexBuffer):
 
 T = TypeVar('T', bound=Shape)
 
+# Size of one vertex in the buffered shapes: 2 floats for the position and
+# 4 bytes for the color.
+_VERTEX_SIZE = 12
+# Index telling OpenGL to start a new line strip or triangle strip
+_RESTART_INDEX = 2 ** 32 - 1
+
+
+def _copy_buffer(source: shader.Buffer, destination: shader.Buffer,
+                 source_offset: int, destination_offset: int, size: int):
+    """ Copy bytes from one buffer to another on the graphics card. """
+    gl.glBindBuffer(gl.GL_COPY_READ_BUFFER, source.buffer_id)
+    gl.glBindBuffer(gl.GL_COPY_WRITE_BUFFER, destination.buffer_id)
+    gl.glCopyBufferSubData(
+        gl.GL_COPY_READ_BUFFER,
+        gl.GL_COPY_WRITE_BUFFER,
+        gl.GLintptr(source_offset),
+        gl.GLintptr(destination_offset),
+        size)
+
+
+def _strip_indices(first_vertices: np.ndarray, vertex_counts: np.ndarray) -> np.ndarray:
+    """
+    Return the indices that draw each shape, given the index of its first
+    vertex and its number of vertices, with a restart index between shapes.
+    """
+    lengths = vertex_counts + 1
+    starts = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum(), dtype=np.int64)
+    indices = positions - np.repeat(starts - first_vertices, lengths)
+    indices[starts + vertex_counts] = _RESTART_INDEX
+    return indices[:-1].astype(np.uint32)
+
 
 class ShapeElementList(Generic[T]):
     """
@@ -689,7 +957,7 @@ def __init__(self):
         self._center_x = 0
         self._center_y = 0
         self._angle = 0
-        self.program = shader.program(
+        self.program = shader.get_program(
             vertex_shader='''
                 #version 330
                 uniform mat4 Projection;
@@ -719,18 +987,36 @@ def __init__(self):
                 }
             ''',
         )
-        # Could do much better using just one vbo and glDrawElementsBaseVertex
+        weakref.finalize(self, shader.release_program, self.program)
+
+        # The vertices of all the shapes are copied one after the other into
+        # a single buffer. Removed shapes leave holes, which are closed up
+        # once they waste more than half the buffer.
+        self._vertex_buffer = None
+        self._vertex_end = 0
+        self._free_bytes = 0
+        self._vertex_offsets = {}
+
+        # One batch, drawn with one draw call, per (mode, line width)
         self.batches = defaultdict(_Batch)
-        self.dirties = set()
 
     def append(self, item: T):
         """
         Add a new shape to the list.
         """
+        if isinstance(item, InstancedShapes):
+            raise TypeError("Batches and SDF shapes are drawn with their own draw(), "
+                            "and can't be added to a ShapeElementList.")
+        size = item.data.nbytes
+        self._reserve_vertex_bytes(size)
+        offset = self._vertex_end
+        self._vertex_buffer.write(item.data.tobytes(), offset=offset)
+        self._vertex_end += size
+        self._vertex_offsets[item] = offset
+
         self.shape_list.append(item)
         group = (item.mode, item.line_width)
-        self.batches[group].items.append(item)
-        self.dirties.add(group)
+        self.batches[group].append(item, offset // _VERTEX_SIZE, size // _VERTEX_SIZE)
 
     def remove(self, item: T):
         """
@@ -738,60 +1024,57 @@ def remove(self, item: T):
         """
         self.shape_list.remove(item)
         group = (item.mode, item.line_width)
-        self.batches[group].items.remove(item)
-        self.dirties.add(group)
-
-    def _refresh_shape(self, group):
-        # Create a buffer large enough to hold all the shapes buffers
-        batch = self.batches[group]
-        total_vbo_bytes = sum(s.vbo.size for s in batch.items)
-        vbo = shader.Buffer.create_with_size(total_vbo_bytes)
-        offset = 0
-        gl.glBindBuffer(gl.GL_COPY_WRITE_BUFFER, vbo.buffer_id)
-        # Copy all the shapes buffer in our own vbo
-        for shape in batch.items:
-            gl.glBindBuffer(gl.GL_COPY_READ_BUFFER, shape.vbo.buffer_id)
-            gl.glCopyBufferSubData(
-                gl.GL_COPY_READ_BUFFER,
-                gl.GL_COPY_WRITE_BUFFER,
-                gl.GLintptr(0),
-                gl.GLintptr(offset),
-                shape.vbo.size)
-            offset += shape.vbo.size
-
-        # Create an index buffer objet. It should count starting from 0. We need to
-        # use a reset_idx to indicate that a new shape will start.
-        reset_idx = 2 ** 32 - 1
-        indices = []
-        counter = itertools.count()
-        for shape in batch.items:
-            indices.extend(itertools.islice(counter, shape.vao.num_vertices))
-            indices.append(reset_idx)
-        del indices[-1]
-        indices = np.array(indices)
-        ibo = shader.Buffer(indices.astype('i4').tobytes())
-
-        vao_content = [
-            shader.BufferDescription(
-                vbo,
-                '2f 4B',
-                ('in_vert', 'in_color'),
-                normalized=['in_color']
-            )
-        ]
-        vao = shader.vertex_array(self.program, vao_content, ibo)
-        with self.program:
-            self.program['Projection'] = get_projection().flatten()
-            self.program['Position'] = [self.center_x, self.center_y]
-            self.program['Angle'] = self.angle
-
-        batch.shape.vao = vao
-        batch.shape.vbo = vbo
-        batch.shape.ibo = ibo
-        batch.shape.program = self.program
-        mode, line_width = group
-        batch.shape.mode = mode
-        batch.shape.line_width = line_width
+        self.batches[group].remove(item)
+        del self._vertex_offsets[item]
+        self._free_bytes += item.data.nbytes
+
+    def _reserve_vertex_bytes(self, size: int):
+        """ Make room at the end of the vertex buffer, doubling its size if needed. """
+        if self._vertex_buffer is None:
+            capacity = 1024
+            while capacity < size:
+                capacity *= 2
+            self._vertex_buffer = shader.Buffer.create_with_size(capacity)
+            return
+
+        capacity = self._vertex_buffer.size
+        if self._vertex_end + size <= capacity:
+            return
+
+        while capacity < self._vertex_end + size:
+            capacity *= 2
+        vertex_buffer = shader.Buffer.create_with_size(capacity)
+        _copy_buffer(self._vertex_buffer, vertex_buffer, 0, 0, self._vertex_end)
+        self._vertex_buffer = vertex_buffer
+        for batch in self.batches.values():
+            batch.shape.vao = None
+
+    def _compact(self):
+        """ Close up the holes left in the vertex buffer by removed shapes. """
+        shapes = sorted(self._vertex_offsets, key=self._vertex_offsets.get)
+        offsets = np.array([self._vertex_offsets[shape] for shape in shapes], dtype=np.int64)
+        sizes = np.array([shape.data.nbytes for shape in shapes], dtype=np.int64)
+        new_offsets = np.cumsum(sizes) - sizes
+
+        capacity = self._vertex_buffer.size
+        while capacity > 1024 and capacity // 2 >= new_offsets[-1] + sizes[-1]:
+            capacity //= 2
+        vertex_buffer = shader.Buffer.create_with_size(capacity)
+
+        # Shapes that were already next to each other are copied together
+        run_starts = np.flatnonzero(np.diff(offsets - new_offsets, prepend=-1))
+        run_ends = np.append(run_starts[1:], len(shapes)) - 1
+        for first, last in zip(run_starts.tolist(), run_ends.tolist()):
+            size = int(offsets[last] + sizes[last] - offsets[first])
+            _copy_buffer(self._vertex_buffer, vertex_buffer, int(offsets[first]), int(new_offsets[first]), size)
+
+        self._vertex_buffer = vertex_buffer
+        self._vertex_end = int(new_offsets[-1] + sizes[-1])
+        self._free_bytes = 0
+        self._vertex_offsets = dict(zip(shapes, new_offsets.tolist()))
+        for batch in self.batches.values():
+            batch.shape.vao = None
+            batch.dirty = True
 
     def move(self, change_x: float, change_y: float):
         """
@@ -817,11 +1100,23 @@ def draw(self):
         """
         Draw everything in the list.
         """
-        for group in self.dirties:
-            self._refresh_shape(group)
-        self.dirties.clear()
+        if not self.shape_list:
+            return
+
+        if self._free_bytes * 2 > self._vertex_end:
+            self._compact()
+
+        for group, batch in self.batches.items():
+            batch.update(group, self._vertex_buffer, self._vertex_offsets, self.program)
+
+        # The program is shared with other lists, so set our uniforms each time
+        with self.program:
+            self.program['Position'] = [self._center_x, self._center_y]
+            self.program['Angle'] = self._angle
+
         for batch in self.batches.values():
-            batch.shape.draw()
+            if batch.items:
+                batch.shape.draw()
 
     def _get_center_x(self) -> float:
         """Get the center x coordinate of the ShapeElementList."""
@@ -830,8 +1125,6 @@ def _get_center_x(self) -> float:
     def _set_center_x(self, value: float):
         """Set the center x coordinate of the ShapeElementList."""
         self._center_x = value
-        with self.program:
-            self.program['Position'] = [self._center_x, self._center_y]
 
     center_x = property(_get_center_x, _set_center_x)
 
@@ -842,8 +1135,6 @@ def _get_center_y(self) -> float:
     def _set_center_y(self, value: float):
         """Set the center y coordinate of the ShapeElementList."""
         self._center_y = value
-        with self.program:
-            self.program['Position'] = [self._center_x, self._center_y]
 
     center_y = property(_get_center_y, _set_center_y)
 
@@ -854,13 +1145,83 @@ def _get_angle(self) -> float:
     def _set_angle(self, value: float):
         """Set the angle of the ShapeElementList in degrees."""
         self._angle = value
-        with self.program:
-            self.program['Angle'] = self._angle
 
     angle = property(_get_angle, _set_angle)
 
 
 class _Batch(Generic[T]):
+    """
+    The shapes of a ShapeElementList that share a mode and line width, and
+    the index buffer that draws them from the list's vertex buffer.
+    """
     def __init__(self):
         self.shape = Shape()
-        self.items = []
\ No newline at end of file
+        self.items = []
+        self.indices = np.zeros(0, dtype=np.uint32)
+        self.index_count = 0
+        self.ibo = None
+        # Set when the indices have to be worked out again from scratch
+        self.dirty = False
+
+    def append(self, item: T, first_vertex: int, vertex_count: int):
+        """ Add a shape, adding its indices to the end if there is room. """
+        self.items.append(item)
+        if self.dirty:
+            return
+
+        new_indices = np.arange(first_vertex, first_vertex + vertex_count, dtype=np.uint32)
+        if self.index_count:
+            new_indices = np.concatenate(([_RESTART_INDEX], new_indices)).astype(np.uint32)
+
+        end = self.index_count + len(new_indices)
+        if self.ibo is None or end > len(self.indices):
+            self.dirty = True
+            return
+
+        self.indices[self.index_count:end] = new_indices
+        self.ibo.write(new_indices.tobytes(), offset=self.index_count * 4)
+        self.index_count = end
+        self.shape.vertex_count = end
+
+    def remove(self, item: T):
+        self.items.remove(item)
+        self.dirty = True
+
+    def update(self, group, vertex_buffer: shader.Buffer, vertex_offsets, program: shader.Program):
+        """ Rebuild the indices and vertex array if they are out of date. """
+        if not self.items:
+            return
+
+        if self.dirty:
+            first_vertices = np.array([vertex_offsets[item] for item in self.items], dtype=np.int64)
+            first_vertices //= _VERTEX_SIZE
+            vertex_counts = np.array([len(item.data) for item in self.items], dtype=np.int64)
+            indices = _strip_indices(first_vertices, vertex_counts)
+
+            # Leave room to append more shapes without a new buffer
+            capacity = 64
+            while capacity < len(indices):
+                capacity *= 2
+            self.indices = np.zeros(capacity, dtype=np.uint32)
+            self.indices[:len(indices)] = indices
+            self.index_count = len(indices)
+            self.ibo = shader.buffer(self.indices.tobytes())
+            self.shape.vao = None
+            self.dirty = False
+
+        if self.shape.vao is None:
+            vao_content = [
+                shader.BufferDescription(
+                    vertex_buffer,
+                    '2f 4B',
+                    ('in_vert', 'in_color'),
+                    normalized=['in_color']
+                )
+            ]
+            self.shape.vao = shader.vertex_array(program, vao_content, self.ibo)
+            self.shape.vbo = vertex_buffer
+            self.shape.ibo = self.ibo
+            self.shape.program = program
+            self.shape.mode, self.shape.line_width = group
+
+        self.shape.vertex_count = self.index_count
@@ -10,6 +10,8 @@
 
 import ctypes
 import math
+import weakref
+from contextlib import contextmanager
 import PIL.Image
 import PIL.ImageOps
 import numpy as np
@@ -47,6 +49,408 @@
 '''
 
 
+# Size in bytes of the buffer immediate mode shapes are streamed through
+_STREAM_BUFFER_SIZE = 2 ** 20
+
+_line_vertex_type = np.dtype([('vertex', '2f4'), ('color', '4B')])
+
+# Ellipses and rounded rectangles can also be drawn as a single quad, with the
+# shape cut out in the fragment shader from its signed distance to the edge.
+# ``in_size`` is the distance from the center to the edge on each axis, and
+# outlines are centered on the edge.
+sdf_vertex_shader = '''
+    #version 330
+    uniform mat4 Projection;
+    in vec2 in_vert;
+    in vec2 in_center;
+    in vec2 in_size;
+    in float in_angle;
+    in float in_border_width;
+    in float in_corner_radius;
+    in float in_kind;
+    in vec4 in_color;
+    out vec2 v_position;
+    flat out vec2 v_size;
+    flat out float v_border_width;
+    flat out float v_corner_radius;
+    flat out float v_kind;
+    flat out vec4 v_color;
+    void main() {
+        // Leave room for the outline and a pixel of anti-aliasing
+        v_position = in_vert * (in_size + in_border_width * 0.5 + 1.0);
+        float angle = radians(in_angle);
+        mat2 rotate = mat2(
+            cos(angle), sin(angle),
+            -sin(angle), cos(angle)
+        );
+        gl_Position = Projection * vec4(in_center + rotate * v_position, 0.0, 1.0);
+        v_size = max(in_size, vec2(0.0001));
+        v_border_width = in_border_width;
+        v_corner_radius = in_corner_radius;
+        v_kind = in_kind;
+        v_color = in_color;
+    }
+'''
+
+sdf_fragment_shader = '''
+    #version 330
+    in vec2 v_position;
+    flat in vec2 v_size;
+    flat in float v_border_width;
+    flat in float v_corner_radius;
+    flat in float v_kind;
+    flat in vec4 v_color;
+    out vec4 f_color;
+
+    float ellipse_distance(vec2 p, vec2 radii) {
+        // Close to the real distance near the edge, which is all we need
+        float k0 = length(p / radii);
+        float k1 = length(p / (radii * radii));
+        if (k1 == 0.0) {
+            return -min(radii.x, radii.y);
+        }
+        return k0 * (k0 - 1.0) / k1;
+    }
+
+    float rounded_rectangle_distance(vec2 p, vec2 half_size, float radius) {
+        radius = clamp(radius, 0.0, min(half_size.x, half_size.y));
+        vec2 q = abs(p) - half_size + radius;
+        return length(max(q, 0.0)) + min(max(q.x, q.y), 0.0) - radius;
+    }
+
+    void main() {
+        float edge_distance;
+        if (v_kind < 0.5) {
+            edge_distance = ellipse_distance(v_position, v_size);
+        } else {
+            edge_distance = rounded_rectangle_distance(v_position, v_size, v_corner_radius);
+        }
+        if (v_border_width > 0.0) {
+            edge_distance = abs(edge_distance) - v_border_width * 0.5;
+        }
+        float alpha = clamp(0.5 - edge_distance / max(fwidth(edge_distance), 0.0001), 0.0, 1.0);
+        if (alpha == 0.0) {
+            discard;
+        }
+        f_color = vec4(v_color.rgb, v_color.a * alpha);
+    }
+'''
+
+_sdf_instance_type = np.dtype([('center', '2f4'), ('size', '2f4'), ('angle', 'f4'),
+                               ('border_width', 'f4'), ('corner_radius', 'f4'),
+                               ('kind', 'f4'), ('color', '4B')])
+_sdf_instance_format = '2f 2f 1f 1f 1f 1f 4B'
+_sdf_instance_attributes = ('in_center', 'in_size', 'in_angle', 'in_border_width',
+                            'in_corner_radius', 'in_kind', 'in_color')
+
+# Values for the ``kind`` of an SDF shape
+_SDF_ELLIPSE = 0
+_SDF_ROUNDED_RECTANGLE = 1
+
+# Batch key for SDF shapes, next to the (mode, line width) keys
+_SDF_BATCH = 'sdf'
+
+# Use the SDF shapes for the circle and ellipse draw commands
+_use_sdf_shapes = False
+
+
+def _triangle_indexes(count: int, mode: int) -> np.ndarray:
+    """ Vertex indexes that turn a fan or strip into separate triangles. """
+    i = np.arange(1, count - 1)
+    if mode == gl.GL_TRIANGLE_STRIP:
+        return np.stack((i - 1, i, i + 1), axis=1).ravel()
+    return np.stack((np.zeros_like(i), i, i + 1), axis=1).ravel()
+
+
+def _line_indexes(count: int, mode: int) -> np.ndarray:
+    """ Vertex indexes that turn a strip or loop into separate lines. """
+    if count < 2:
+        return np.zeros(0, dtype=np.int64)
+    indexes = np.repeat(np.arange(count), 2)[1:-1]
+    if mode == gl.GL_LINE_LOOP:
+        indexes = np.append(indexes, (count - 1, 0))
+    return indexes
+
+
+class _LineRenderer:
+    """
+    Program, vertex array and vertex buffer shared by all the immediate
+    mode draw commands.
+
+    Each shape is written after the previous one in the buffer. When the
+    buffer is full it is orphaned, so the driver hands us fresh memory
+    without waiting for the shapes still being drawn, and we start over at
+    the beginning.
+
+    SDF ellipses and rectangles are instances of one quad. Instances can't
+    start part way into a buffer without GL 4.2, so their buffer is
+    orphaned and written from the beginning for each draw.
+
+    While batching, shapes are turned into separate triangles, lines or
+    points and collected per (mode, line width), to be drawn together by
+    ``flush``. SDF shapes are collected in a batch of their own.
+    """
+
+    def __init__(self):
+        self.program = shader.get_program(line_vertex_shader, line_fragment_shader)
+        weakref.finalize(self, shader.release_program, self.program)
+        self.context = gl.current_context
+        self._create_buffer(_STREAM_BUFFER_SIZE)
+
+        self.sdf_program = None
+
+        self.batching = False
+        self.batches = {}
+        self.batch_projection = None
+
+    def _create_buffer(self, size: int):
+        self.vbo = shader.Buffer.create_with_size(size, usage='stream')
+        self.vao = shader.vertex_array(self.program, [
+            shader.BufferDescription(
+                self.vbo,
+                '2f 4B',
+                ('in_vert', 'in_color'),
+                normalized=['in_color']
+            )
+        ])
+        self.offset = 0
+
+    def draw(self, data: np.ndarray, mode: int, line_width: float):
+        """ Draw a shape, or add it to the batch. Empty shapes are skipped. """
+        if len(data) == 0:
+            return
+        if not self.batching:
+            self._render(data, mode, line_width)
+            return
+
+        if mode in (gl.GL_TRIANGLE_FAN, gl.GL_TRIANGLE_STRIP, gl.GL_POLYGON):
+            data = data[_triangle_indexes(len(data), mode)]
+            mode = gl.GL_TRIANGLES
+        elif mode in (gl.GL_LINE_STRIP, gl.GL_LINE_LOOP):
+            data = data[_line_indexes(len(data), mode)]
+            mode = gl.GL_LINES
+        elif mode not in (gl.GL_TRIANGLES, gl.GL_LINES, gl.GL_POINTS):
+            self.flush()
+            self._render(data, mode, line_width)
+            return
+
+        # Too few points for a single triangle or line
+        if len(data) == 0:
+            return
+        if mode == gl.GL_TRIANGLES:
+            line_width = 1
+        self._add_to_batch((mode, line_width), data)
+
+    def draw_sdf(self, instances: np.ndarray):
+        """ Draw SDF shapes, or add them to the batch. """
+        if not self.batching:
+            self._render_sdf(instances)
+        else:
+            self._add_to_batch(_SDF_BATCH, instances)
+
+    def _add_to_batch(self, key, data: np.ndarray):
+        # The shapes in the batch are drawn with the projection they were
+        # added with, so a viewport change has to draw them first.
+        projection = get_projection()
+        if projection is not self.batch_projection:
+            self.flush()
+            self.batch_projection = projection
+        self.batches.setdefault(key, []).append(data)
+
+    def flush(self):
+        """
+        Draw all the batched shapes, in the order their batches started,
+        with the projection they were added with.
+        """
+        batches = self.batches
+        self.batches = {}
+        for key, shapes in batches.items():
+            if key == _SDF_BATCH:
+                self._render_sdf(np.concatenate(shapes), self.batch_projection)
+            else:
+                self._render(np.concatenate(shapes), *key, projection=self.batch_projection)
+
+    def _render(self, data: np.ndarray, mode: int, line_width: float, projection: np.ndarray=None):
+        """
+        Stream the vertices into the buffer, and draw them with the given
+        projection, or the current one.
+        """
+        size = data.nbytes
+        if size > self.vbo.size:
+            new_size = self.vbo.size
+            while new_size < size:
+                new_size *= 2
+            self._create_buffer(new_size)
+        elif self.offset + size > self.vbo.size:
+            self.vbo.orphan()
+            self.offset = 0
+
+        self.vbo.write(data.tobytes(), offset=self.offset)
+        first = self.offset // _line_vertex_type.itemsize
+        self.offset += size
+
+        with self.vao:
+            if projection is None:
+                projection = get_projection()
+            self.program['Projection'] = projection.flatten()
+
+            gl.glLineWidth(line_width)
+            gl.glPointSize(line_width)
+
+            gl.glEnable(gl.GL_BLEND)
+            gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+            gl.glEnable(gl.GL_LINE_SMOOTH)
+            gl.glHint(gl.GL_LINE_SMOOTH_HINT, gl.GL_NICEST)
+            gl.glHint(gl.GL_POLYGON_SMOOTH_HINT, gl.GL_NICEST)
+
+            self.vao.render(mode=mode, first=first, vertices=len(data))
+
+    def _create_sdf_buffer(self, size: int):
+        if self.sdf_program is None:
+            self.sdf_program = shader.get_program(sdf_vertex_shader, sdf_fragment_shader)
+            weakref.finalize(self, shader.release_program, self.sdf_program)
+            quad = np.array(((-1, -1), (1, -1), (-1, 1), (1, 1)), dtype=np.float32)
+            self.sdf_quad = shader.buffer(quad.tobytes())
+        self.sdf_vbo = shader.Buffer.create_with_size(size, usage='stream')
+        self.sdf_vao = shader.vertex_array(self.sdf_program, [
+            shader.BufferDescription(
+                self.sdf_quad,
+                '2f',
+                ('in_vert',)
+            ),
+            shader.BufferDescription(
+                self.sdf_vbo,
+                _sdf_instance_format,
+                _sdf_instance_attributes,
+                normalized=['in_color'],
+                instanced=True
+            )
+        ])
+
+    def _render_sdf(self, instances: np.ndarray, projection: np.ndarray=None):
+        """
+        Write the SDF shapes to their buffer, and draw them with the given
+        projection, or the current one.
+        """
+        size = instances.nbytes
+        if self.sdf_program is None or size > self.sdf_vbo.size:
+            new_size = _STREAM_BUFFER_SIZE // 16
+            while new_size < size:
+                new_size *= 2
+            self._create_sdf_buffer(new_size)
+        else:
+            self.sdf_vbo.orphan()
+        self.sdf_vbo.write(instances.tobytes())
+
+        with self.sdf_vao:
+            if projection is None:
+                projection = get_projection()
+            self.sdf_program['Projection'] = projection.flatten()
+
+            gl.glEnable(gl.GL_BLEND)
+            gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+            self.sdf_vao.render(gl.GL_TRIANGLE_STRIP, instances=len(instances))
+
+
+_line_renderer = None
+
+
+def _get_line_renderer() -> _LineRenderer:
+    """ Return the line renderer for the current OpenGL context. """
+    global _line_renderer
+    if _line_renderer is None or _line_renderer.context is not gl.current_context:
+        _line_renderer = _LineRenderer()
+    return _line_renderer
+
+
+def set_draw_command_batching(enabled: bool):
+    """
+    Turn batching of the draw_* commands on or off.
+
+    While batching is on, the shapes drawn are collected and drawn with a
+    few draw calls, one for each kind of primitive and line width. Shapes
+    are drawn in the order their kind was first used, so shapes of different
+    kinds that overlap may be drawn in a different order. Drawing sprites,
+    textures or buffered shapes, or finishing the frame, first draws the
+    shapes collected so far. Turning batching off draws them too.
+    """
+    if not enabled:
+        # Nothing to turn off if no shape has been drawn yet
+        flush_draw_commands()
+        if _line_renderer is not None:
+            _line_renderer.batching = False
+        return
+    _get_line_renderer().batching = True
+
+
+def flush_draw_commands():
+    """
+    Draw any shapes collected while batching draw commands. Does nothing if
+    nothing was collected.
+    """
+    if _line_renderer is not None and _line_renderer.batches:
+        _line_renderer.flush()
+
+
+def set_sdf_shapes(enabled: bool):
+    """
+    Choose how circles and ellipses are drawn by the draw_* commands.
+
+    Normally they are made from many triangles, or many line segments for
+    outlines. With SDF (signed distance field) shapes turned on, each one
+    is a single rectangle, and the fragment shader works out which pixels
+    are inside the shape. The edges are smooth at any size, and many small
+    circles draw much faster. ``num_segments`` is not used for SDF shapes.
+
+    The ``sdf`` argument of each draw command overrides this for one call.
+    """
+    global _use_sdf_shapes
+    _use_sdf_shapes = enabled
+
+
+def _draw_sdf_shape(kind: int, center_x: float, center_y: float,
+                    width: float, height: float, color: Color,
+                    border_width: float=0, tilt_angle: float=0,
+                    corner_radius: float=0):
+    """ Draw one SDF shape. A border width of 0 fills the shape. """
+    data = np.empty(1, dtype=_sdf_instance_type)
+    data['center'] = center_x, center_y
+    data['size'] = width, height
+    data['angle'] = tilt_angle
+    data['border_width'] = border_width
+    data['corner_radius'] = corner_radius
+    data['kind'] = kind
+    data['color'] = get_four_byte_color(color)
+
+    _get_line_renderer().draw_sdf(data)
+
+
+@contextmanager
+def batch_draw_commands():
+    """
+    Batch the draw_* commands used inside a ``with`` block, and draw them
+    when the block ends. See ``set_draw_command_batching``.
+
+    >>> import arcade
+    >>> arcade.open_window(800,600,"Drawing Example")
+    >>> arcade.start_render()
+    >>> with arcade.batch_draw_commands():
+    ...     for x in range(0, 800, 10):
+    ...         arcade.draw_line(x, 0, x, 600, arcade.color.BLACK)
+    >>> arcade.finish_render()
+    >>> arcade.quick_run(0.25)
+    """
+    renderer = _get_line_renderer()
+    was_batching = renderer.batching
+    renderer.batching = True
+    try:
+        yield
+    finally:
+        renderer.flush()
+        renderer.batching = was_batching
+
+
 def get_four_byte_color(color: Color) -> Color:
     """
     Given a RGB list, it will return RGBA.
@@ -114,6 +518,53 @@ def rotate_point(x: float, y: float, cx: float, cy: float,
     return x, y
 
 
+# Corners of a 1 x 1 rectangle around the origin, counter-clockwise from
+# the bottom left
+_UNIT_RECTANGLE = np.array(((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)))
+_UNIT_RECTANGLE.flags.writeable = False
+
+_unit_circles = {}
+
+
+def _get_unit_circle(num_segments: int) -> np.ndarray:
+    """
+    Return ``num_segments`` points evenly spaced around a circle of radius
+    one, as a read-only (num_segments, 2) array. The tables are cached, so
+    each segment count is only calculated once.
+    """
+    table = _unit_circles.get(num_segments)
+    if table is None:
+        theta = np.arange(num_segments) * (2.0 * math.pi / num_segments)
+        table = np.stack((np.cos(theta), np.sin(theta)), axis=1)
+        table.flags.writeable = False
+        _unit_circles[num_segments] = table
+    return table
+
+
+def _transform_points(points: np.ndarray, center_x: float, center_y: float,
+                      width: float=1, height: float=1, tilt_angle: float=0) -> np.ndarray:
+    """
+    Scale an (n, 2) array of points by width and height, rotate them around
+    the origin by tilt_angle degrees, and move them to the center, all with
+    one matrix multiply.
+    """
+    angle = math.radians(tilt_angle)
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    matrix = np.array(((width * cos, width * sin),
+                       (-height * sin, height * cos)))
+    return points @ matrix + (center_x, center_y)
+
+
+def _get_arc_points(width: float, height: float, start_angle: float, end_angle: float,
+                    num_segments: int) -> np.ndarray:
+    """ Return the unit circle points from start_angle to end_angle, scaled. """
+    start_segment = int(start_angle / 360 * num_segments)
+    end_segment = int(end_angle / 360 * num_segments)
+    indexes = np.arange(start_segment, end_segment + 1) % num_segments
+    return _get_unit_circle(num_segments)[indexes] * (width, height)
+
+
 class Texture:
     """
     Class that represents a texture.
@@ -348,29 +799,9 @@ def draw_arc_filled(center_x: float, center_y: float,
     Raises:
         None
     """
-    unrotated_point_list = [[0, 0]]
-
-    start_segment = int(start_angle / 360 * num_segments)
-    end_segment = int(end_angle / 360 * num_segments)
-
-    for segment in range(start_segment, end_segment + 1):
-        theta = 2.0 * 3.1415926 * segment / num_segments
-
-        x = width * math.cos(theta)
-        y = height * math.sin(theta)
-
-        unrotated_point_list.append((x, y))
-
-    if tilt_angle == 0:
-        uncentered_point_list = unrotated_point_list
-    else:
-        uncentered_point_list = []
-        for point in unrotated_point_list:
-            uncentered_point_list.append(rotate_point(point[0], point[1], 0, 0, tilt_angle))
-
-    point_list = []
-    for point in uncentered_point_list:
-        point_list.append((point[0] + center_x, point[1] + center_y))
+    arc_points = _get_arc_points(width, height, start_angle, end_angle, num_segments)
+    unrotated_points = np.concatenate((np.zeros((1, 2)), arc_points))
+    point_list = _transform_points(unrotated_points, center_x, center_y, tilt_angle=tilt_angle)
 
     _generic_draw_line_strip(point_list, color, 1, gl.GL_TRIANGLE_FAN)
 
@@ -399,38 +830,13 @@ def draw_arc_outline(center_x: float, center_y: float, width: float,
     Raises:
         None
     """
-    unrotated_point_list = []
-
-    start_segment = int(start_angle / 360 * num_segments)
-    end_segment = int(end_angle / 360 * num_segments)
-
-    inside_width = width - border_width / 2
-    outside_width = width + border_width / 2
-    inside_height = height - border_width / 2
-    outside_height = height + border_width / 2
-
-    for segment in range(start_segment, end_segment + 1):
-        theta = 2.0 * math.pi * segment / num_segments
-
-        x1 = inside_width * math.cos(theta)
-        y1 = inside_height * math.sin(theta)
-
-        x2 = outside_width * math.cos(theta)
-        y2 = outside_height * math.sin(theta)
-
-        unrotated_point_list.append((x1, y1))
-        unrotated_point_list.append((x2, y2))
-
-    if tilt_angle == 0:
-        uncentered_point_list = unrotated_point_list
-    else:
-        uncentered_point_list = []
-        for point in unrotated_point_list:
-            uncentered_point_list.append(rotate_point(point[0], point[1], 0, 0, tilt_angle))
-
-    point_list = []
-    for point in uncentered_point_list:
-        point_list.append((point[0] + center_x, point[1] + center_y))
+    # Alternate between the inside and outside edge for a triangle strip
+    inside_points = _get_arc_points(width - border_width / 2, height - border_width / 2,
+                                    start_angle, end_angle, num_segments)
+    outside_points = _get_arc_points(width + border_width / 2, height + border_width / 2,
+                                     start_angle, end_angle, num_segments)
+    unrotated_points = np.stack((inside_points, outside_points), axis=1).reshape(-1, 2)
+    point_list = _transform_points(unrotated_points, center_x, center_y, tilt_angle=tilt_angle)
 
     _generic_draw_line_strip(point_list, color, 1, gl.GL_TRIANGLE_STRIP)
 
@@ -527,7 +933,7 @@ def draw_parabola_outline(start_x: float, start_y: float, end_x: float,
 # --- BEGIN CIRCLE FUNCTIONS # # #
 
 def draw_circle_filled(center_x: float, center_y: float, radius: float,
-                       color: Color):
+                       color: Color, sdf: bool=None):
     """
     Draw a filled-in circle.
 
@@ -539,6 +945,8 @@ def draw_circle_filled(center_x: float, center_y: float, radius: float,
          RGBA format.
         :num_segments (int): float of triangle segments that make up this
          circle. Higher is better quality, but slower render time.
+        :sdf: Draw the circle as an SDF shape. By default this follows \
+        ``set_sdf_shapes``.
     Returns:
         None
     Raises:
@@ -546,11 +954,11 @@ def draw_circle_filled(center_x: float, center_y: float, radius: float,
     """
     width = radius
     height = radius
-    draw_ellipse_filled(center_x, center_y, width, height, color)
+    draw_ellipse_filled(center_x, center_y, width, height, color, sdf=sdf)
 
 
 def draw_circle_outline(center_x: float, center_y: float, radius: float,
-                        color: Color, border_width: float=1):
+                        color: Color, border_width: float=1, sdf: bool=None):
     """
     Draw the outline of a circle.
 
@@ -563,6 +971,8 @@ def draw_circle_outline(center_x: float, center_y: float, radius: float,
         :border_width: Width of the circle outline in pixels.
         :num_segments: float of triangle segments that make up this
          circle. Higher is better quality, but slower render time.
+        :sdf: Draw the outline as an SDF shape. By default this follows \
+        ``set_sdf_shapes``.
     Returns:
         None
     Raises:
@@ -571,7 +981,7 @@ def draw_circle_outline(center_x: float, center_y: float, radius: float,
     width = radius
     height = radius
     draw_ellipse_outline(center_x, center_y, width, height,
-                         color, border_width)
+                         color, border_width, sdf=sdf)
 
 
 # --- END CIRCLE FUNCTIONS # # #
@@ -581,7 +991,7 @@ def draw_circle_outline(center_x: float, center_y: float, radius: float,
 
 def draw_ellipse_filled(center_x: float, center_y: float,
                         width: float, height: float, color: Color,
-                        tilt_angle: float=0, num_segments=128):
+                        tilt_angle: float=0, num_segments=128, sdf: bool=None):
     """
     Draw a filled in ellipse.
 
@@ -595,32 +1005,22 @@ def draw_ellipse_filled(center_x: float, center_y: float,
         :angle: Angle in degrees to tilt the ellipse.
         :num_segments: float of triangle segments that make up this
          circle. Higher is better quality, but slower render time.
+        :sdf: Draw the ellipse as an SDF shape. By default this follows \
+        ``set_sdf_shapes``.
     Returns:
         None
     Raises:
         None
     """
+    if sdf is None:
+        sdf = _use_sdf_shapes
+    if sdf:
+        _draw_sdf_shape(_SDF_ELLIPSE, center_x, center_y, width, height, color,
+                        tilt_angle=tilt_angle)
+        return
 
-    unrotated_point_list = []
-
-    for segment in range(num_segments):
-        theta = 2.0 * 3.1415926 * segment / num_segments
-
-        x = width * math.cos(theta)
-        y = height * math.sin(theta)
-
-        unrotated_point_list.append((x, y))
-
-    if tilt_angle == 0:
-        uncentered_point_list = unrotated_point_list
-    else:
-        uncentered_point_list = []
-        for point in unrotated_point_list:
-            uncentered_point_list.append(rotate_point(point[0], point[1], 0, 0, tilt_angle))
-
-    point_list = []
-    for point in uncentered_point_list:
-        point_list.append((point[0] + center_x, point[1] + center_y))
+    point_list = _transform_points(_get_unit_circle(num_segments), center_x, center_y,
+                                   width, height, tilt_angle)
 
     _generic_draw_line_strip(point_list, color, 1, gl.GL_TRIANGLE_FAN)
 
@@ -628,7 +1028,7 @@ def draw_ellipse_filled(center_x: float, center_y: float,
 def draw_ellipse_outline(center_x: float, center_y: float, width: float,
                          height: float, color: Color,
                          border_width: float=1, tilt_angle: float=0,
-                         num_segments=128):
+                         num_segments=128, sdf: bool=None):
     """
     Draw the outline of an ellipse.
 
@@ -641,32 +1041,22 @@ def draw_ellipse_outline(center_x: float, center_y: float, width: float,
          RGBA format.
         :border_width: Width of the circle outline in pixels.
         :tilt_angle: Angle in degrees to tilt the ellipse.
+        :sdf: Draw the outline as an SDF shape. By default this follows \
+        ``set_sdf_shapes``.
     Returns:
         None
     Raises:
         None
     """
+    if sdf is None:
+        sdf = _use_sdf_shapes
+    if sdf:
+        _draw_sdf_shape(_SDF_ELLIPSE, center_x, center_y, width, height, color,
+                        border_width, tilt_angle)
+        return
 
-    unrotated_point_list = []
-
-    for segment in range(num_segments):
-        theta = 2.0 * 3.1415926 * segment / num_segments
-
-        x = width * math.cos(theta)
-        y = height * math.sin(theta)
-
-        unrotated_point_list.append((x, y))
-
-    if tilt_angle == 0:
-        uncentered_point_list = unrotated_point_list
-    else:
-        uncentered_point_list = []
-        for point in unrotated_point_list:
-            uncentered_point_list.append(rotate_point(point[0], point[1], 0, 0, tilt_angle))
-
-    point_list = []
-    for point in uncentered_point_list:
-        point_list.append((point[0] + center_x, point[1] + center_y))
+    point_list = _transform_points(_get_unit_circle(num_segments), center_x, center_y,
+                                   width, height, tilt_angle)
 
     _generic_draw_line_strip(point_list, color, border_width, gl.GL_LINE_LOOP)
 
@@ -694,42 +1084,11 @@ def _generic_draw_line_strip(point_list: PointList,
     Raises:
         None
     """
-    program = shader.program(
-        vertex_shader=line_vertex_shader,
-        fragment_shader=line_fragment_shader,
-    )
-    buffer_type = np.dtype([('vertex', '2f4'), ('color', '4B')])
-    data = np.zeros(len(point_list), dtype=buffer_type)
-
+    data = np.empty(len(point_list), dtype=_line_vertex_type)
     data['vertex'] = point_list
+    data['color'] = get_four_byte_color(color)
 
-    color = get_four_byte_color(color)
-    data['color'] = color
-
-    vbo = shader.buffer(data.tobytes())
-    vbo_desc = shader.BufferDescription(
-        vbo,
-        '2f 4B',
-        ('in_vert', 'in_color'),
-        normalized=['in_color']
-    )
-
-    vao_content = [vbo_desc]
-
-    vao = shader.vertex_array(program, vao_content)
-    with vao:
-        program['Projection'] = get_projection().flatten()
-
-        gl.glLineWidth(line_width)
-        gl.glPointSize(line_width)
-
-        gl.glEnable(gl.GL_BLEND)
-        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
-        gl.glEnable(gl.GL_LINE_SMOOTH)
-        gl.glHint(gl.GL_LINE_SMOOTH_HINT, gl.GL_NICEST)
-        gl.glHint(gl.GL_POLYGON_SMOOTH_HINT, gl.GL_NICEST)
-
-        vao.render(mode=mode)
+    _get_line_renderer().draw(data, mode, line_width)
 
 
 def draw_line_strip(point_list: PointList,
@@ -1027,18 +1386,9 @@ def draw_rectangle_outline(center_x: float, center_y: float, width: float,
         None
     """
 
-    p1 = -width // 2 + center_x, -height // 2 + center_y
-    p2 = width // 2 + center_x, -height // 2 + center_y
-    p3 = width // 2 + center_x, height // 2 + center_y
-    p4 = -width // 2 + center_x, height // 2 + center_y
-
-    if tilt_angle != 0:
-        p1 = rotate_point(p1[0], p1[1], center_x, center_y, tilt_angle)
-        p2 = rotate_point(p2[0], p2[1], center_x, center_y, tilt_angle)
-        p3 = rotate_point(p3[0], p3[1], center_x, center_y, tilt_angle)
-        p4 = rotate_point(p4[0], p4[1], center_x, center_y, tilt_angle)
+    point_list = _transform_points(_UNIT_RECTANGLE, center_x, center_y, width, height, tilt_angle)
 
-    _generic_draw_line_strip((p1, p2, p3, p4), color, border_width, gl.GL_LINE_LOOP)
+    _generic_draw_line_strip(point_list, color, border_width, gl.GL_LINE_LOOP)
 
 
 def draw_lrtb_rectangle_filled(left: float, right: float, top: float,
@@ -1114,18 +1464,53 @@ def draw_rectangle_filled(center_x: float, center_y: float, width: float,
         :angle: rotation of the rectangle. Defaults to zero.
 
     """
-    p1 = -width // 2 + center_x, -height // 2 + center_y
-    p2 = width // 2 + center_x, -height // 2 + center_y
-    p3 = width // 2 + center_x, height // 2 + center_y
-    p4 = -width // 2 + center_x, height // 2 + center_y
+    point_list = _transform_points(_UNIT_RECTANGLE[[0, 1, 3, 2]], center_x, center_y,
+                                   width, height, tilt_angle)
+
+    _generic_draw_line_strip(point_list, color, 1, gl.GL_TRIANGLE_STRIP)
 
-    if tilt_angle != 0:
-        p1 = rotate_point(p1[0], p1[1], center_x, center_y, tilt_angle)
-        p2 = rotate_point(p2[0], p2[1], center_x, center_y, tilt_angle)
-        p3 = rotate_point(p3[0], p3[1], center_x, center_y, tilt_angle)
-        p4 = rotate_point(p4[0], p4[1], center_x, center_y, tilt_angle)
 
-    _generic_draw_line_strip((p1, p2, p4, p3), color, 1, gl.GL_TRIANGLE_STRIP)
+def draw_rounded_rectangle_filled(center_x: float, center_y: float, width: float,
+                                  height: float, corner_radius: float, color: Color,
+                                  tilt_angle: float=0):
+    """
+    Draw a filled-in rectangle with rounded corners. This always uses an
+    SDF shape, see ``set_sdf_shapes``.
+
+    Args:
+        :center_x: x coordinate of rectangle center.
+        :center_y: y coordinate of rectangle center.
+        :width: width of the rectangle.
+        :height: height of the rectangle.
+        :corner_radius: radius of the rounded corners.
+        :color: color, specified in a list of 3 or 4 bytes in RGB or
+         RGBA format.
+        :tilt_angle: rotation of the rectangle. Defaults to zero.
+    """
+    _draw_sdf_shape(_SDF_ROUNDED_RECTANGLE, center_x, center_y, width / 2, height / 2,
+                    color, tilt_angle=tilt_angle, corner_radius=corner_radius)
+
+
+def draw_rounded_rectangle_outline(center_x: float, center_y: float, width: float,
+                                   height: float, corner_radius: float, color: Color,
+                                   border_width: float=1, tilt_angle: float=0):
+    """
+    Draw the outline of a rectangle with rounded corners. This always uses
+    an SDF shape, see ``set_sdf_shapes``.
+
+    Args:
+        :center_x: x coordinate of rectangle center.
+        :center_y: y coordinate of rectangle center.
+        :width: width of the rectangle.
+        :height: height of the rectangle.
+        :corner_radius: radius of the rounded corners.
+        :color: color, specified in a list of 3 or 4 bytes in RGB or
+         RGBA format.
+        :border_width: width of the lines, in pixels.
+        :tilt_angle: rotation of the rectangle. Defaults to zero.
+    """
+    _draw_sdf_shape(_SDF_ROUNDED_RECTANGLE, center_x, center_y, width / 2, height / 2,
+                    color, border_width, tilt_angle, corner_radius)
 
 
 def draw_texture_rectangle(center_x: float, center_y: float, width: float,
@@ -1187,6 +1572,7 @@ def get_pixel(x: int, y: int):
     """
     Given an x, y, will return RGB color value of that point.
     """
+    flush_draw_commands()
     a = (gl.GLubyte * 3)(0)
     gl.glReadPixels(x, y, 1, 1, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, a)
     red = a[0]
@@ -1203,6 +1589,7 @@ def get_image(x=0, y=0, width=None, height=None):
     image = get_image()
     image.save('screenshot.png', 'PNG')
     """
+    flush_draw_commands()
 
     # Get the dimensions
     window = get_window()
@@ -0,0 +1,117 @@
+"""
+Broadphase Stress Test
+
+Compare how fast the different sprite list broadphases (spatial hash, loose
+quadtree and sort-and-sweep) handle the same collision work. Nothing is
+drawn, the timings are printed.
+
+The first test is the collision stress test: a player moving over many coins
+that don't move. The second has small and huge enemies that all move every
+frame, hit by many bullets.
+
+Artwork from http://kenney.nl
+
+If Python and Arcade are installed, this example can be run from the command line with:
+python -m arcade.examples.stress_test_broadphase
+"""
+
+import random
+import arcade
+import os
+import timeit
+
+# --- Constants ---
+SPRITE_SCALING_COIN = 0.09
+COIN_COUNT = 10000
+
+ENEMY_COUNT = 2000
+BOSS_COUNT = 20
+BULLET_COUNT = 2000
+
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 700
+
+# The moving enemies spread over a bigger area than the screen
+WORLD_SIZE = 3000
+
+FRAMES = 60
+
+
+def make_broadphases():
+    """ The broadphases to compare, by name. """
+    return {
+        "Spatial hash": lambda: arcade.SpatialHash(cell_size=128),
+        "Loose quadtree": lambda: arcade.LooseQuadtree(),
+        "Sort and sweep": lambda: arcade.SweepAndPrune(),
+    }
+
+
+def static_coins(broadphase):
+    """ A player sprite moving around over coins that don't move. """
+    random.seed(1)
+    coin_list = arcade.SpriteList(is_static=True, broadphase=broadphase)
+    for i in range(COIN_COUNT):
+        coin = arcade.Sprite("images/coin_01.png", SPRITE_SCALING_COIN)
+        coin.center_x = random.randrange(SCREEN_WIDTH)
+        coin.center_y = random.randrange(SCREEN_HEIGHT)
+        coin_list.append(coin)
+
+    player_sprite = arcade.Sprite("images/character.png", 1)
+
+    start_time = timeit.default_timer()
+    coins_hit = 0
+    for frame in range(FRAMES * 10):
+        player_sprite.center_x = random.randrange(SCREEN_WIDTH)
+        player_sprite.center_y = random.randrange(SCREEN_HEIGHT)
+        coins_hit += len(arcade.check_for_collision_with_list(player_sprite, coin_list))
+    return timeit.default_timer() - start_time, coins_hit
+
+
+def moving_enemies(broadphase):
+    """ Small and huge enemies all moving, and bullets checked against them. """
+    random.seed(2)
+    enemy_list = arcade.SpriteList(broadphase=broadphase)
+    for i in range(ENEMY_COUNT + BOSS_COUNT):
+        scale = 3 if i < BOSS_COUNT else 0.3
+        enemy = arcade.Sprite("images/meteorGrey_big1.png", scale)
+        enemy.center_x = random.randrange(WORLD_SIZE)
+        enemy.center_y = random.randrange(WORLD_SIZE)
+        enemy.change_x = random.uniform(-2, 2)
+        enemy.change_y = random.uniform(-2, 2)
+        enemy_list.append(enemy)
+
+    bullet_list = arcade.SpriteList(use_spatial_hash=False)
+    for i in range(BULLET_COUNT):
+        bullet = arcade.Sprite("images/coin_01.png", SPRITE_SCALING_COIN)
+        bullet.center_x = random.randrange(WORLD_SIZE)
+        bullet.center_y = random.randrange(WORLD_SIZE)
+        bullet.change_y = 5
+        bullet_list.append(bullet)
+
+    start_time = timeit.default_timer()
+    hits = 0
+    for frame in range(FRAMES):
+        enemy_list.update()
+        bullet_list.update()
+        hits += len(arcade.check_for_collision_between_lists(bullet_list, enemy_list))
+    return timeit.default_timer() - start_time, hits
+
+
+def main():
+    """ Main method """
+    # Set the working directory (where we expect to find files) to the same
+    # directory this .py file is in. You can leave this out of your own
+    # code, but it is needed to easily run the examples using "python -m"
+    # as mentioned at the top of this program.
+    file_path = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(file_path)
+
+    for test in (static_coins, moving_enemies):
+        print(test.__doc__.strip())
+        for name, make_broadphase in make_broadphases().items():
+            total_time, hits = test(make_broadphase())
+            print(f"    {name:16} {total_time:7.3f} seconds, {hits} hits")
+
+
+if __name__ == "__main__":
+    main()
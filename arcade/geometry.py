@@ -2,13 +2,33 @@
 Functions for calculating geometry.
 """
 
+import math
+from collections import namedtuple
+
+import numpy as np
+
 from arcade.sprite import Sprite
 from arcade.sprite_list import SpriteList
+from arcade.sprite_list import _stack_polygons
+from arcade.broadphase import SpatialHash
+from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from arcade.arcade_types import Point
 from arcade.arcade_types import PointList
 
 PRECISION = 2
 
+# A sprite hit in a collision check, with the (normal_x, normal_y) unit
+# direction the checked sprite has to move in to get out of it, and how far.
+Contact = namedtuple('Contact', 'sprite, normal_x, normal_y, depth')
+
+# The first sprite a ray hits, the (x, y) point where the ray reaches its
+# hit box, and how far along the ray that is.
+RayHit = namedtuple('RayHit', 'sprite, x, y, distance')
+
 
 def are_polygons_intersecting(poly_a: PointList,
                               poly_b: PointList) -> bool:
@@ -44,31 +64,179 @@ def are_polygons_intersecting(poly_a: PointList,
             projection_1 = polygon[i1]
             projection_2 = polygon[i2]
 
-            normal = (projection_2[1] - projection_1[1],
-                      projection_1[0] - projection_2[0])
+            normal_x = projection_2[1] - projection_1[1]
+            normal_y = projection_1[0] - projection_2[0]
 
-            min_a, max_a, min_b, max_b = (None,) * 4
+            projected_a = [normal_x * x + normal_y * y for x, y in poly_a]
+            projected_b = [normal_x * x + normal_y * y for x, y in poly_b]
 
-            for poly in poly_a:
-                projected = normal[0] * poly[0] + normal[1] * poly[1]
+            if max(projected_a) <= min(projected_b) or max(projected_b) <= min(projected_a):
+                return False
+
+    return True
 
-                if min_a is None or projected < min_a:
-                    min_a = projected
-                if max_a is None or projected > max_a:
-                    max_a = projected
 
-            for poly in poly_b:
-                projected = normal[0] * poly[0] + normal[1] * poly[1]
+def are_polygons_intersecting_batch(poly_a: PointList,
+                                    poly_list: Sequence[PointList]) -> np.ndarray:
+    """
+    Check one polygon against many others at once. Gives the same results
+    as calling ``are_polygons_intersecting`` on each one, as a numpy array
+    of booleans.
 
-                if min_b is None or projected < min_b:
-                    min_b = projected
-                if max_b is None or projected > max_b:
-                    max_b = projected
+    Args:
+        :poly_a (tuple): List of points that define the first polygon.
+        :poly_list (list): Lists of points of the polygons to check against.
+    Returns:
+        np.ndarray
 
-            if max_a <= min_b or max_b <= min_a:
-                return False
+    :Example:
 
-    return True
+    >>> import arcade
+    >>> poly1 = ((0.1, 0.1), (0.2, 0.1), (0.2, 0.2), (0.1, 0.2))
+    >>> poly2 = ((0.15, 0.1), (0.25, 0.1), (0.25, 0.25), (0.15, 0.25))
+    >>> poly3 = ((0.3, 0.1), (0.4, 0.1), (0.4, 0.2), (0.3, 0.2))
+    >>> arcade.are_polygons_intersecting_batch(poly1, [poly2, poly3])
+    array([ True, False])
+    """
+    if len(poly_list) == 0:
+        return np.zeros(0, dtype=bool)
+    points_b, axes_b = _stack_polygons([_get_polygon(poly) for poly in poly_list])
+    points_a, axes_a = _get_polygon(poly_a)
+    return _are_polygons_intersecting(points_a, axes_a, points_b, axes_b)
+
+
+def get_polygon_penetration(poly_a: PointList, poly_b: PointList,
+                            direction: Sequence[float]=None) -> Optional[Tuple[float, float, float]]:
+    """
+    Find the shortest move that takes the first polygon out of the second,
+    using the separating axis test. Returns (normal_x, normal_y, depth):
+    the unit direction to move the first polygon in, and how far. Returns
+    None if the polygons don't intersect.
+
+    If a direction is given, only moves in that direction are considered,
+    and the result is how far along it the first polygon has to go.
+
+    Args:
+        :poly_a (tuple): List of points that define the polygon to move.
+        :poly_b (tuple): List of points that define the other polygon.
+        :direction (tuple): Optional (x, y) direction to move in.
+    Returns:
+        tuple or None
+
+    :Example:
+
+    >>> import arcade
+    >>> poly1 = ((0, 0), (10, 0), (10, 10), (0, 10))
+    >>> poly2 = ((8, 2), (20, 2), (20, 8), (8, 8))
+    >>> arcade.get_polygon_penetration(poly1, poly2)
+    (-1.0, 0.0, 2.0)
+    >>> arcade.get_polygon_penetration(poly1, poly2, direction=(0, 1))
+    (0.0, 1.0, 8.0)
+    """
+    points_a, axes_a = _get_polygon(poly_a)
+    points_b, axes_b = _get_polygon(poly_b)
+    hit, normals, depths = _get_penetrations(points_a, axes_a, points_b[np.newaxis], axes_b[np.newaxis],
+                                             direction)
+    if not hit[0]:
+        return None
+    # Adding zero turns -0.0 into 0.0
+    normal_x, normal_y = (normals[0] + 0.0).tolist()
+    return normal_x, normal_y, float(depths[0])
+
+
+def _get_polygon(points: PointList) -> Tuple[np.ndarray, np.ndarray]:
+    """ Return the points of a polygon and the normals of its edges, as arrays. """
+    points = np.asarray(points, dtype=np.float64)
+    edges = np.roll(points, -1, axis=0) - points
+    return points, np.stack((edges[:, 1], -edges[:, 0]), axis=1)
+
+
+def _get_overlaps(points_a: np.ndarray, axes_a: np.ndarray,
+                  points_b: np.ndarray, axes_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Project N pairs of polygons, given as (N, n, 2) arrays of points and
+    edge normals, on the normals of both. The first polygon can also be a
+    single (n, 2) polygon, checked against all the others.
+
+    Returns the (N, axes, 2) axes, and for each pair and axis how far the
+    first polygon's projection has to go forward and backward along the
+    axis to stop overlapping, in units of the axis length. The polygons
+    are apart if either is zero or less on some axis.
+    """
+    count = len(points_b)
+    if points_a.ndim == 2:
+        points_a = points_a[np.newaxis]
+        axes_a = np.broadcast_to(axes_a, (count,) + axes_a.shape)
+    axes = np.concatenate((axes_a, axes_b), axis=1)
+
+    # (pair, axis, point) projections
+    axis_x = axes[:, :, np.newaxis, 0]
+    axis_y = axes[:, :, np.newaxis, 1]
+    projected_a = axis_x * points_a[:, np.newaxis, :, 0] + axis_y * points_a[:, np.newaxis, :, 1]
+    projected_b = axis_x * points_b[:, np.newaxis, :, 0] + axis_y * points_b[:, np.newaxis, :, 1]
+
+    forward = projected_b.max(axis=2) - projected_a.min(axis=2)
+    backward = projected_a.max(axis=2) - projected_b.min(axis=2)
+    return axes, forward, backward
+
+
+def _are_polygons_intersecting(points_a: np.ndarray, axes_a: np.ndarray,
+                               points_b: np.ndarray, axes_b: np.ndarray) -> np.ndarray:
+    """
+    Separating axis test on N pairs of polygons, laid out as for
+    ``_get_overlaps``.
+    """
+    axes, forward, backward = _get_overlaps(points_a, axes_a, points_b, axes_b)
+    return ((forward > 0) & (backward > 0)).all(axis=1)
+
+
+def _get_penetrations(points_a: np.ndarray, axes_a: np.ndarray,
+                      points_b: np.ndarray, axes_b: np.ndarray,
+                      direction: Sequence[float]=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Separating axis test on N pairs of polygons, laid out as for
+    ``_get_overlaps``, that also finds how to push the first polygon of
+    each pair out of the second. Returns whether each pair intersects,
+    the (N, 2) unit directions to push in, and the (N,) distances.
+
+    Without a direction, the shortest push is found. With one, the
+    polygons are pushed along it. Directions can also be given for each
+    pair as an (N, 2) array, where (0, 0) asks for the shortest push.
+    """
+    axes, forward, backward = _get_overlaps(points_a, axes_a, points_b, axes_b)
+    hit = ((forward > 0) & (backward > 0)).all(axis=1)
+    count = len(hit)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Shortest push
+        lengths = np.hypot(axes[:, :, 0], axes[:, :, 1])
+        forward_distances = np.where(lengths > 0, forward / lengths, np.inf)
+        backward_distances = np.where(lengths > 0, backward / lengths, np.inf)
+        backwards = backward_distances < forward_distances
+        distances = np.where(backwards, backward_distances, forward_distances)
+
+        best = distances.argmin(axis=1) if count else np.zeros(0, dtype=np.int64)
+        rows = np.arange(count)
+        depths = distances[rows, best]
+        signs = np.where(backwards[rows, best], -1.0, 1.0)
+        normals = axes[rows, best] / lengths[rows, best, np.newaxis] * signs[:, np.newaxis]
+
+        if direction is not None:
+            direction = np.asarray(direction, dtype=np.float64)
+            direction = np.broadcast_to(direction, (count, 2))
+            direction_lengths = np.hypot(direction[:, 0], direction[:, 1])
+            directed = direction_lengths > 0
+            direction = direction / direction_lengths[:, np.newaxis]
+
+            # How fast moving along the direction moves along each axis
+            along = axes[:, :, 0] * direction[:, 0, np.newaxis] + axes[:, :, 1] * direction[:, 1, np.newaxis]
+            distances = np.where(along > 0, forward / along,
+                                 np.where(along < 0, backward / -along, np.inf))
+            directed_depths = distances.min(axis=1) if count else np.zeros(0)
+            depths = np.where(directed, directed_depths, depths)
+            normals = np.where(directed[:, np.newaxis], direction, normals)
+
+    return hit, normals, depths
 
 
 def check_for_collision(sprite1: Sprite, sprite2: Sprite) -> bool:
@@ -127,14 +295,24 @@ def _check_for_collision(sprite1: Sprite, sprite2: Sprite) -> bool:
     if distance > collision_radius_sum * collision_radius_sum:
         return False
 
+    left_1, bottom_1, right_1, top_1 = sprite1.get_bounds()
+    left_2, bottom_2, right_2, top_2 = sprite2.get_bounds()
+    if right_1 < left_2 or right_2 < left_1 or top_1 < bottom_2 or top_2 < bottom_1:
+        return False
+
     return are_polygons_intersecting(sprite1.points, sprite2.points)
 
 
 def check_for_collision_with_list(sprite1: Sprite,
-                                  sprite_list: SpriteList) -> List[Sprite]:
+                                  sprite_list: SpriteList,
+                                  offset: Sequence[float]=(0, 0)) -> List[Sprite]:
     """
     Check for a collision between a sprite, and a list of sprites.
 
+    With an (x, y) offset, checks where the sprite would be if it were moved
+    by that much, without moving it. For example ``offset=(0, -2)`` finds the
+    floor right under a sprite.
+
     >>> import arcade
     >>> scale = 1
     >>> sprite_list = arcade.SpriteList()
@@ -153,21 +331,696 @@ def check_for_collision_with_list(sprite1: Sprite,
     >>> collision_list = arcade.check_for_collision_with_list(main_sprite, sprite_list)
     >>> print(len(collision_list))
     1
+    >>> len(arcade.check_for_collision_with_list(main_sprite, sprite_list, offset=(100, 100)))
+    2
     """
     if not isinstance(sprite1, Sprite):
         raise TypeError("Parameter 1 is not an instance of the Sprite class.")
     if not isinstance(sprite_list, SpriteList):
         raise TypeError(f"Parameter 2 is a {type(sprite_list)} instead of expected SpriteList.")
 
-    if sprite_list.use_spatial_hash:
-        sprite_list_to_check = sprite_list.spatial_hash.get_objects_for_box(sprite1)
-        # checks_saved = len(sprite_list) - len(sprite_list_to_check)
+    sprites = sprite_list.sprite_list
+    return [sprites[i] for i in _get_collision_indices(sprite1, sprite_list, offset)]
+
+
+def get_collision_indices(sprite1: Sprite, sprite_list: SpriteList,
+                          offset: Sequence[float]=(0, 0)) -> np.ndarray:
+    """
+    Like ``check_for_collision_with_list``, but return the indexes of the
+    sprites hit, in increasing order, as a numpy array. Sprites waiting on
+    a deferred removal are left out of the count, so the indexes can be used
+    with ``sprite_list[i]``.
+
+    >>> import arcade
+    >>> sprite_list = arcade.SpriteList()
+    >>> filename = "arcade/examples/images/meteorGrey_big1.png"
+    >>> main_sprite = arcade.Sprite(filename, 1)
+    >>> for x in (40, 150, 0):
+    ...     sprite_list.append(arcade.Sprite(filename, 1, center_x=x))
+    >>> arcade.get_collision_indices(main_sprite, sprite_list)
+    array([0, 2])
+    """
+    if not isinstance(sprite1, Sprite):
+        raise TypeError("Parameter 1 is not an instance of the Sprite class.")
+    if not isinstance(sprite_list, SpriteList):
+        raise TypeError(f"Parameter 2 is a {type(sprite_list)} instead of expected SpriteList.")
+
+    return _get_live_positions(sprite_list, _get_collision_indices(sprite1, sprite_list, offset))
+
+
+def get_collision_contacts(sprite1: Sprite, sprite_list: SpriteList,
+                           direction: Sequence[float]=None) -> List[Contact]:
+    """
+    Like ``check_for_collision_with_list``, but for each sprite hit, also
+    find the shortest move that takes ``sprite1`` out of it. Returns a list
+    of ``Contact(sprite, normal_x, normal_y, depth)``, where the normal is
+    the unit direction to move ``sprite1`` in, and the depth how far.
+
+    If a direction is given, only moves in that direction are considered,
+    and the depth is how far along it ``sprite1`` has to go. Moving by the
+    largest depth clears all the contacts.
+
+    >>> import arcade
+    >>> sprite_list = arcade.SpriteList()
+    >>> floor = arcade.Sprite(center_x=0, center_y=-10)
+    >>> floor.width, floor.height = 100, 20
+    >>> sprite_list.append(floor)
+    >>> player = arcade.Sprite(center_x=0, center_y=8)
+    >>> player.width, player.height = 10, 20
+    >>> arcade.get_collision_contacts(player, sprite_list)[0][1:]
+    (0.0, 1.0, 2.0)
+    """
+    if not isinstance(sprite1, Sprite):
+        raise TypeError("Parameter 1 is not an instance of the Sprite class.")
+    if not isinstance(sprite_list, SpriteList):
+        raise TypeError(f"Parameter 2 is a {type(sprite_list)} instead of expected SpriteList.")
+
+    indexes = _get_candidate_indices(sprite1, sprite_list)
+    if len(indexes) == 0:
+        return []
+
+    points_b, axes_b = sprite_list.get_collision_polygons(indexes)
+    points_a, axes_a = sprite1.get_polygon()
+    hit, normals, depths = _get_penetrations(points_a, axes_a, points_b, axes_b, direction)
+
+    sprites = sprite_list.sprite_list
+    # Adding zero turns -0.0 into 0.0
+    normals = normals[hit] + 0.0
+    return [Contact(sprites[i], normal_x, normal_y, depth)
+            for i, (normal_x, normal_y), depth in zip(indexes[hit].tolist(), normals.tolist(),
+                                                      depths[hit].tolist())]
+
+
+def _get_collision_indices(sprite1: Sprite, sprite_list: SpriteList,
+                           offset: Sequence[float]=(0, 0)) -> np.ndarray:
+    """ Find the sprites hit by ``sprite1``, moved by ``offset``. """
+    indexes = _get_candidate_indices(sprite1, sprite_list, offset)
+    if len(indexes) == 0:
+        return indexes
+
+    points_b, axes_b = sprite_list.get_collision_polygons(indexes)
+    points_a, axes_a = sprite1.get_polygon()
+    if offset[0] or offset[1]:
+        points_a = points_a + offset
+    return indexes[_are_polygons_intersecting(points_a, axes_a, points_b, axes_b)]
+
+
+def _get_candidate_indices(sprite1: Sprite, sprite_list: SpriteList,
+                           offset: Sequence[float]=(0, 0)) -> np.ndarray:
+    """
+    Find the indexes of the sprites that might be hit by ``sprite1``, moved
+    by ``offset``. The collision radii and bounding boxes of all the sprites
+    near it are checked at once, so only the ones left need the polygon
+    check.
+    """
+    offset_x, offset_y = offset
+    left, bottom, right, top = sprite1.get_bounds()
+    indexes, positions, radii = _get_indices_near_bounds(
+        sprite_list, (left + offset_x, bottom + offset_y, right + offset_x, top + offset_y), sprite1)
+    if len(indexes) == 0:
+        return indexes
+
+    # The collision_radius property would store the default radius, and
+    # update every list the sprite is in
+    radius = sprite1._collision_radius or max(sprite1.width, sprite1.height)
+    radius_sum = radii + radius
+    diff = positions - (sprite1.center_x + offset_x, sprite1.center_y + offset_y)
+    close = (diff * diff).sum(axis=1) <= radius_sum * radius_sum
+    return indexes[close]
+
+
+def _get_indices_near_bounds(sprite_list: SpriteList, bounds: Sequence[float], exclude: Sprite=None
+                             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the indexes of the sprites whose bounding boxes touch the (left,
+    bottom, right, top) bounds, leaving out ``exclude``, by looking them up
+    in the list's grid or spatial hash. Also returns their (x, y) centers and
+    collision radii.
+    """
+    left, bottom, right, top = bounds
+    sprite_idx = sprite_list.sprite_idx
+    if sprite_list.is_frozen:
+        indexes = sprite_list._static_grid.get_indexes_for_bounds(left, bottom, right, top)
+    elif sprite_list.use_spatial_hash:
+        candidates = sprite_list.spatial_hash.get_objects_for_bounds(left, bottom, right, top)
+        indexes = np.unique(np.fromiter((sprite_idx[sprite] for sprite in candidates),
+                                        dtype=np.int64, count=len(candidates)))
     else:
-        sprite_list_to_check = sprite_list
-
-    collision_list = []
-    for sprite2 in sprite_list_to_check:
-        if sprite1 is not sprite2 and sprite2 not in collision_list:
-            if _check_for_collision(sprite1, sprite2):
-                collision_list.append(sprite2)
-    return collision_list
+        indexes = np.arange(len(sprite_list.sprite_list))
+
+    # Sprites waiting on a deferred removal are no longer in the list
+    skip = [sprite_idx[sprite] for sprite in sprite_list._pending_removals]
+    if exclude in sprite_idx:
+        skip.append(sprite_idx[exclude])
+    if skip:
+        indexes = indexes[~np.isin(indexes, skip)]
+    if len(indexes) == 0:
+        return indexes, np.zeros((0, 2)), np.zeros(0)
+
+    positions, radii, sprite_bounds = sprite_list.get_collision_bounds(indexes)
+    close = ((sprite_bounds[:, 0] <= right) & (sprite_bounds[:, 2] >= left) &
+             (sprite_bounds[:, 1] <= top) & (sprite_bounds[:, 3] >= bottom))
+    return indexes[close], positions[close], radii[close]
+
+
+def _get_indices_in_polygon(sprite_list: SpriteList, points: np.ndarray, axes: np.ndarray
+                            ) -> np.ndarray:
+    """
+    Find the indexes of the sprites whose hit boxes overlap a polygon, given
+    as arrays of points and edge normals. A single point with no normals
+    finds the sprites it is inside of.
+    """
+    left, bottom = points.min(axis=0)
+    right, top = points.max(axis=0)
+    indexes = _get_indices_near_bounds(sprite_list, (left, bottom, right, top))[0]
+    if len(indexes) == 0:
+        return indexes
+
+    points_b, axes_b = sprite_list.get_collision_polygons(indexes)
+    return indexes[_are_polygons_intersecting(points, axes, points_b, axes_b)]
+
+
+def check_for_collision_between_lists(list_a: SpriteList,
+                                      list_b: SpriteList) -> List[Tuple[Sprite, Sprite]]:
+    """
+    Find all the collisions between the sprites of two lists, in one pass.
+    Returns a list of (sprite from list_a, sprite from list_b) pairs.
+
+    If a list is frozen, the boxes of the other list are looked up in its
+    grid. If a list has a spatial hash, the sprites of the other list are
+    looked up in it, iterating over the smaller list when both have one.
+    Otherwise the bounding boxes are sorted and swept. Each pair gets at
+    most one polygon check.
+
+    >>> import arcade
+    >>> filename = "arcade/examples/images/meteorGrey_big1.png"
+    >>> bullets = arcade.SpriteList()
+    >>> enemies = arcade.SpriteList(use_spatial_hash=False)
+    >>> for x in (0, 300):
+    ...     bullets.append(arcade.Sprite(filename, 0.2, center_x=x))
+    >>> for x in (20, 150, 310):
+    ...     enemies.append(arcade.Sprite(filename, 0.5, center_x=x))
+    >>> pairs = arcade.check_for_collision_between_lists(bullets, enemies)
+    >>> sorted((a.center_x, b.center_x) for a, b in pairs)
+    [(0.0, 20.0), (300.0, 310.0)]
+    """
+    if not isinstance(list_a, SpriteList):
+        raise TypeError(f"Parameter 1 is a {type(list_a)} instead of expected SpriteList.")
+    if not isinstance(list_b, SpriteList):
+        raise TypeError(f"Parameter 2 is a {type(list_b)} instead of expected SpriteList.")
+
+    hits_a, hits_b = _get_close_pairs(list_a, list_b)
+    if len(hits_a) == 0:
+        return []
+
+    # Polygons of the sprites left, each one fetched once
+    unique_a, inverse_a = np.unique(hits_a, return_inverse=True)
+    unique_b, inverse_b = np.unique(hits_b, return_inverse=True)
+    points_a, axes_a = list_a.get_collision_polygons(unique_a)
+    points_b, axes_b = list_b.get_collision_polygons(unique_b)
+    hit = _are_polygons_intersecting(points_a[inverse_a], axes_a[inverse_a],
+                                     points_b[inverse_b], axes_b[inverse_b])
+
+    sprites_a = list_a.sprite_list
+    sprites_b = list_b.sprite_list
+    collisions = []
+    for i, j in zip(hits_a[hit].tolist(), hits_b[hit].tolist()):
+        sprite_a = sprites_a[i]
+        sprite_b = sprites_b[j]
+        if sprite_a is not sprite_b:
+            collisions.append((sprite_a, sprite_b))
+    return collisions
+
+
+def _get_pair_contacts(list_a: SpriteList, list_b: SpriteList, directions: np.ndarray=None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find all the collisions between the sprites of two lists, and how to
+    push each sprite of ``list_a`` out of the ``list_b`` sprite it hit.
+    ``directions`` gives an (x, y) unit direction to push each sprite of
+    ``list_a`` in, by index, where (0, 0) means the shortest way out.
+
+    Returns the indexes of the sprites in each list, the (N, 2) unit
+    directions to push in, and the (N,) distances.
+    """
+    hits_a, hits_b = _get_close_pairs(list_a, list_b)
+    if list_a is list_b:
+        hits_a, hits_b = hits_a[hits_a != hits_b], hits_b[hits_a != hits_b]
+    if len(hits_a) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros((0, 2)), np.zeros(0)
+
+    unique_a, inverse_a = np.unique(hits_a, return_inverse=True)
+    unique_b, inverse_b = np.unique(hits_b, return_inverse=True)
+    points_a, axes_a = list_a.get_collision_polygons(unique_a)
+    points_b, axes_b = list_b.get_collision_polygons(unique_b)
+    hit, normals, depths = _get_penetrations(points_a[inverse_a], axes_a[inverse_a],
+                                             points_b[inverse_b], axes_b[inverse_b],
+                                             None if directions is None else directions[hits_a])
+    return hits_a[hit], hits_b[hit], normals[hit], depths[hit]
+
+
+def _get_close_pairs(list_a: SpriteList, list_b: SpriteList) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the pairs of sprites from two lists whose collision radii and
+    bounding boxes touch, as matching arrays of indexes into each list.
+    """
+    indexes_a = _get_live_indexes(list_a)
+    indexes_b = _get_live_indexes(list_b)
+    if len(indexes_a) == 0 or len(indexes_b) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    positions_a, radii_a, bounds_a = list_a.get_collision_bounds(indexes_a)
+    positions_b, radii_b, bounds_b = list_b.get_collision_bounds(indexes_b)
+
+    # Candidate pairs, as positions in the index arrays. A list checked
+    # against itself is swept, as its hash would hit every sprite.
+    if list_a is list_b:
+        pairs_a, pairs_b = _get_sweep_pairs(bounds_a, bounds_b)
+    elif list_b.is_frozen:
+        pairs_a, pairs_b = list_b._static_grid.get_pairs_for_bounds(bounds_a)
+    elif list_a.is_frozen:
+        pairs_b, pairs_a = list_a._static_grid.get_pairs_for_bounds(bounds_b)
+    elif list_b.use_spatial_hash and (len(indexes_a) <= len(indexes_b) or not list_a.use_spatial_hash):
+        pairs_a, pairs_b = _get_hash_pairs(bounds_a, list_b, indexes_b)
+    elif list_a.use_spatial_hash:
+        pairs_b, pairs_a = _get_hash_pairs(bounds_b, list_a, indexes_a)
+    else:
+        pairs_a, pairs_b = _get_sweep_pairs(bounds_a, bounds_b)
+
+    radius_sum = radii_a[pairs_a] + radii_b[pairs_b]
+    diff = positions_a[pairs_a] - positions_b[pairs_b]
+    close = (diff * diff).sum(axis=1) <= radius_sum * radius_sum
+    box_a = bounds_a[pairs_a]
+    box_b = bounds_b[pairs_b]
+    close &= ((box_a[:, 0] <= box_b[:, 2]) & (box_a[:, 2] >= box_b[:, 0]) &
+              (box_a[:, 1] <= box_b[:, 3]) & (box_a[:, 3] >= box_b[:, 1]))
+
+    return indexes_a[pairs_a[close]], indexes_b[pairs_b[close]]
+
+
+def _get_live_indexes(sprite_list: SpriteList) -> np.ndarray:
+    """ Indexes of the sprites in a list, leaving out deferred removals. """
+    indexes = np.arange(len(sprite_list.sprite_list))
+    if sprite_list._pending_removals:
+        pending = [sprite_list.sprite_idx[sprite] for sprite in sprite_list._pending_removals]
+        indexes = indexes[~np.isin(indexes, pending)]
+    return indexes
+
+
+def _get_live_positions(sprite_list: SpriteList, indexes: np.ndarray) -> np.ndarray:
+    """
+    Turn indexes into a list's slots into positions among the sprites that
+    aren't waiting on a deferred removal, as ``sprite_list[i]`` counts them.
+    """
+    if not sprite_list._pending_removals:
+        return indexes
+    pending = np.sort([sprite_list.sprite_idx[sprite] for sprite in sprite_list._pending_removals])
+    return indexes - np.searchsorted(pending, indexes)
+
+
+def _get_hash_pairs(query_bounds: np.ndarray, sprite_list: SpriteList,
+                    indexes: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Look up each box in the spatial hash of a sprite list. Returns the
+    positions of the boxes, and of the sprites found in ``indexes``.
+    """
+    positions = np.empty(len(sprite_list.sprite_list), dtype=np.int64)
+    positions[indexes] = np.arange(len(indexes))
+
+    spatial_hash = sprite_list.spatial_hash
+    sprite_idx = sprite_list.sprite_idx
+    query = []
+    found = []
+    for i, (left, bottom, right, top) in enumerate(query_bounds.tolist()):
+        for sprite in spatial_hash.get_objects_for_bounds(left, bottom, right, top):
+            query.append(i)
+            found.append(sprite_idx[sprite])
+    return np.array(query, dtype=np.int64), positions[np.array(found, dtype=np.int64)]
+
+
+def _get_sweep_pairs(bounds_a: np.ndarray, bounds_b: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Sort and sweep. Returns the pairs of boxes that overlap on the x axis,
+    as positions in each array.
+    """
+    # Boxes in b that can reach a box in a start no further left than the
+    # widest box in b
+    order = np.argsort(bounds_b[:, 0], kind='stable')
+    lefts = bounds_b[order, 0]
+    widest = (bounds_b[:, 2] - bounds_b[:, 0]).max()
+    first = np.searchsorted(lefts, bounds_a[:, 0] - widest, side='left')
+    last = np.searchsorted(lefts, bounds_a[:, 2], side='right')
+
+    counts = last - first
+    pairs_a = np.repeat(np.arange(len(bounds_a)), counts)
+    offsets = np.repeat(first - (np.cumsum(counts) - counts), counts)
+    pairs_b = order[np.arange(counts.sum()) + offsets]
+    return pairs_a, pairs_b
+
+
+def cast_ray(start: Point, end: Point, sprite_list: SpriteList) -> Optional[RayHit]:
+    """
+    Find the first sprite hit by a line going from ``start`` to ``end``.
+    Returns a ``RayHit(sprite, x, y, distance)`` with the point where the
+    line first reaches the sprite's hit box, or None if nothing is in the
+    way. A line starting inside a sprite hits it at distance 0.
+
+    The cells of the list's spatial hash, or of its grid if it is frozen,
+    are walked along the line from the start, and only the sprites in them
+    are checked. The walk stops once a sprite is hit.
+
+    >>> import arcade
+    >>> walls = arcade.SpriteList()
+    >>> for x in (100, 200):
+    ...     wall = arcade.Sprite(center_x=x, center_y=0)
+    ...     wall.width, wall.height = 20, 100
+    ...     walls.append(wall)
+    >>> arcade.cast_ray((0, 0), (300, 0), walls)[1:]
+    (90.0, 0.0, 90.0)
+    >>> arcade.cast_ray((0, 0), (0, 300), walls) is None
+    True
+    """
+    if not isinstance(sprite_list, SpriteList):
+        raise TypeError(f"Parameter 3 is a {type(sprite_list)} instead of expected SpriteList.")
+
+    start_x, start_y = float(start[0]), float(start[1])
+    end_x, end_y = float(end[0]), float(end[1])
+    if sprite_list.is_frozen or (sprite_list.use_spatial_hash and
+                                 isinstance(sprite_list.spatial_hash, SpatialHash)):
+        sprite, fraction = _cast_ray_through_cells(start_x, start_y, end_x, end_y, sprite_list)
+    else:
+        indexes, fractions = _cast_rays(np.array(((start_x, start_y),)), np.array(((end_x, end_y),)),
+                                        sprite_list)
+        index, fraction = int(indexes[0]), float(fractions[0])
+        sprite = sprite_list.sprite_list[index] if index >= 0 else None
+    if sprite is None:
+        return None
+
+    direction_x = end_x - start_x
+    direction_y = end_y - start_y
+    return RayHit(sprite, start_x + direction_x * fraction, start_y + direction_y * fraction,
+                  fraction * float(np.hypot(direction_x, direction_y)))
+
+
+def has_line_of_sight(start: Point, end: Point, sprite_list: SpriteList) -> bool:
+    """
+    Check that a line going from ``start`` to ``end`` doesn't hit any of the
+    sprites, such as walls between an enemy and the player.
+
+    >>> import arcade
+    >>> walls = arcade.SpriteList()
+    >>> wall = arcade.Sprite(center_x=100, center_y=0)
+    >>> wall.width, wall.height = 20, 100
+    >>> walls.append(wall)
+    >>> arcade.has_line_of_sight((0, 0), (300, 0), walls)
+    False
+    >>> arcade.has_line_of_sight((0, 100), (300, 100), walls)
+    True
+    """
+    return cast_ray(start, end, sprite_list) is None
+
+
+def cast_rays(starts: np.ndarray, ends: np.ndarray, sprite_list: SpriteList) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Like ``cast_ray``, for many rays at once, given as (N, 2) arrays of
+    start and end points. Returns the index of the first sprite each ray
+    hits, or -1, and how far along the ray it is hit, or infinity. Sprites
+    waiting on a deferred removal are left out of the count, so the indexes
+    can be used with ``sprite_list[i]``.
+
+    >>> import arcade
+    >>> import numpy as np
+    >>> walls = arcade.SpriteList()
+    >>> wall = arcade.Sprite(center_x=100, center_y=0)
+    >>> wall.width, wall.height = 20, 100
+    >>> walls.append(wall)
+    >>> starts = np.zeros((3, 2))
+    >>> ends = np.array(((300, 0), (300, 100), (-300, 0)))
+    >>> indexes, distances = arcade.cast_rays(starts, ends, walls)
+    >>> indexes.tolist(), distances.round(2).tolist()
+    ([0, 0, -1], [90.0, 94.87, inf])
+    """
+    if not isinstance(sprite_list, SpriteList):
+        raise TypeError(f"Parameter 3 is a {type(sprite_list)} instead of expected SpriteList.")
+
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    indexes, fractions = _cast_rays(starts, ends, sprite_list)
+    hit = indexes >= 0
+    indexes[hit] = _get_live_positions(sprite_list, indexes[hit])
+    return indexes, fractions * np.hypot(*(ends - starts).T)
+
+
+def _cast_rays(starts: np.ndarray, ends: np.ndarray, sprite_list: SpriteList) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the first sprite hit by each ray, and the fraction of the way
+    along the ray where it is hit.
+    """
+    if sprite_list.is_frozen:
+        grid = sprite_list._static_grid
+        rays, middles = _walk_rays(starts, ends, grid.origin, grid.cell_size)[:2]
+        stretches, indexes = grid.get_pairs_for_points(middles)
+        rays = rays[stretches]
+    elif sprite_list.use_spatial_hash and isinstance(sprite_list.spatial_hash, SpatialHash):
+        spatial_hash = sprite_list.spatial_hash
+        sprite_idx = sprite_list.sprite_idx
+        walked_rays, middles = _walk_rays(starts, ends, np.zeros(2), spatial_hash.cell_size)[:2]
+        rays = []
+        indexes = []
+        for ray, (x, y) in zip(walked_rays.tolist(), middles.tolist()):
+            for sprite in spatial_hash.get_objects_for_point(x, y):
+                rays.append(ray)
+                indexes.append(sprite_idx[sprite])
+        rays = np.array(rays, dtype=np.int64)
+        indexes = np.array(indexes, dtype=np.int64)
+    else:
+        # Boxes around the rays, looked up like those of sprites
+        ray_bounds = np.concatenate((np.minimum(starts, ends), np.maximum(starts, ends)), axis=1)
+        list_indexes = _get_live_indexes(sprite_list)
+        if len(list_indexes) == 0:
+            rays = indexes = np.zeros(0, dtype=np.int64)
+        elif sprite_list.use_spatial_hash:
+            rays, indexes = _get_hash_pairs(ray_bounds, sprite_list, list_indexes)
+        else:
+            rays, indexes = _get_sweep_pairs(ray_bounds, sprite_list.get_collision_bounds(list_indexes)[2])
+
+    # A sprite spanning several cells is found once per cell
+    count = max(len(sprite_list.sprite_list), 1)
+    pairs = np.unique(rays * count + indexes)
+    return _get_first_hits(starts, ends, pairs // count, pairs % count, sprite_list)
+
+
+def _cast_ray_through_cells(start_x: float, start_y: float, end_x: float, end_y: float,
+                            sprite_list: SpriteList) -> Tuple[Optional[Sprite], float]:
+    """
+    Walk one ray through the cells of the frozen grid or spatial hash, from
+    the start, checking the sprites in each cell, until one is hit. Returns
+    the first sprite hit, or None, and the fraction of the way along the
+    ray where it is hit. Done in plain Python, as a ray meets too few
+    sprites in each cell for numpy to pay off.
+    """
+    sprite_idx = sprite_list.sprite_idx
+    if sprite_list.is_frozen:
+        grid = sprite_list._static_grid
+        origin_x, origin_y = grid.origin.tolist()
+        cell_size = grid.cell_size
+    else:
+        spatial_hash = sprite_list.spatial_hash
+        origin_x = origin_y = 0.0
+        cell_size = spatial_hash.cell_size
+
+    direction_x = end_x - start_x
+    direction_y = end_y - start_y
+    checked = set()
+    best_sprite = None
+    best_key = (np.inf, 0)
+    for x, y, exit_fraction in _walk_ray(start_x, start_y, end_x, end_y, origin_x, origin_y, cell_size):
+        if sprite_list.is_frozen:
+            sprites = [sprite_list.sprite_list[i] for i in grid.get_indexes_for_point(x, y)]
+        else:
+            sprites = spatial_hash.get_objects_for_point(x, y)
+        for sprite in sprites:
+            if sprite in checked:
+                continue
+            checked.add(sprite)
+            fraction = _clip_ray(start_x, start_y, direction_x, direction_y, sprite.points)
+            # Lowest index first on ties, like cast_rays
+            key = (fraction, sprite_idx[sprite])
+            if fraction != np.inf and key < best_key:
+                best_sprite, best_key = sprite, key
+
+        # A sprite hit before the end of this cell is in one of the cells
+        # walked so far, so nothing further along can be hit first
+        if best_sprite is not None and best_key[0] <= exit_fraction:
+            break
+    return best_sprite, best_key[0]
+
+
+def _walk_ray(start_x: float, start_y: float, end_x: float, end_y: float,
+              origin_x: float, origin_y: float, cell_size: float) -> Iterable[Tuple[float, float, float]]:
+    """
+    Plain Python version of ``_walk_rays``, for one ray. Yields the (x, y)
+    point in the middle of each piece of the ray, in order, and the
+    fraction of the way along the ray where the piece ends.
+    """
+    direction_x = end_x - start_x
+    direction_y = end_y - start_y
+    cell_x = math.floor((start_x - origin_x) / cell_size)
+    cell_y = math.floor((start_y - origin_y) / cell_size)
+    left_x = abs(math.floor((end_x - origin_x) / cell_size) - cell_x)
+    left_y = abs(math.floor((end_y - origin_y) / cell_size) - cell_y)
+    step_x = 1 if direction_x > 0 else -1
+    step_y = 1 if direction_y > 0 else -1
+
+    def get_crossing(cell, step, origin, start, direction):
+        line = cell + 1 if step > 0 else cell
+        return (origin + line * cell_size - start) / direction
+
+    crossing_x = get_crossing(cell_x, step_x, origin_x, start_x, direction_x) if left_x else math.inf
+    crossing_y = get_crossing(cell_y, step_y, origin_y, start_y, direction_y) if left_y else math.inf
+    enter = 0.0
+    while True:
+        if left_x and crossing_x <= crossing_y:
+            leave = crossing_x
+            cell_x += step_x
+            left_x -= 1
+            crossing_x = get_crossing(cell_x, step_x, origin_x, start_x, direction_x) if left_x else math.inf
+        elif left_y:
+            leave = crossing_y
+            cell_y += step_y
+            left_y -= 1
+            crossing_y = get_crossing(cell_y, step_y, origin_y, start_y, direction_y) if left_y else math.inf
+        else:
+            leave = 1.0
+        middle = (enter + leave) / 2
+        yield start_x + direction_x * middle, start_y + direction_y * middle, leave
+        if leave == 1.0 and not left_x and not left_y:
+            return
+        enter = leave
+
+
+def _walk_rays(starts: np.ndarray, ends: np.ndarray, origin: np.ndarray,
+               cell_size: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    DDA walk of the rays through a grid of square cells, with a cell corner
+    at ``origin``, all at once. Each ray is cut where it crosses the grid
+    lines. For each piece, in order along each ray, returns the ray, the
+    (x, y) point in the middle of the piece, which is in the piece's cell,
+    and the fraction of the way along the ray where the piece ends.
+    """
+    count = len(starts)
+    directions = ends - starts
+    first = np.floor((starts - origin) / cell_size)
+    last = np.floor((ends - origin) / cell_size)
+
+    # Every ray goes from fraction 0 to 1, through the grid lines between
+    # the cells it starts and ends in
+    rays = [np.arange(count), np.arange(count)]
+    fractions = [np.zeros(count), np.ones(count)]
+    for axis in (0, 1):
+        counts = np.abs(last[:, axis] - first[:, axis]).astype(np.int64)
+        crossing_rays = np.repeat(np.arange(count), counts)
+        steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        lines = first[crossing_rays, axis] + np.where(directions[crossing_rays, axis] > 0, steps, 1 - steps)
+        rays.append(crossing_rays)
+        fractions.append((origin[axis] + lines * cell_size - starts[crossing_rays, axis]) /
+                         directions[crossing_rays, axis])
+    rays = np.concatenate(rays)
+    fractions = np.concatenate(fractions)
+    order = np.lexsort((fractions, rays))
+    rays = rays[order]
+    fractions = fractions[order]
+
+    # Pieces go from one cut to the next one on the same ray
+    same_ray = rays[:-1] == rays[1:]
+    rays = rays[:-1][same_ray]
+    enters = fractions[:-1][same_ray]
+    exits = fractions[1:][same_ray]
+    middles = starts[rays] + directions[rays] * ((enters + exits) / 2)[:, np.newaxis]
+    return rays, middles, exits
+
+
+def _get_first_hits(starts: np.ndarray, ends: np.ndarray, rays: np.ndarray, indexes: np.ndarray,
+                    sprite_list: SpriteList) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check the rays against the sprites at ``indexes``, pair by pair. Returns
+    the index of the first sprite each ray hits, or -1, and the fraction of
+    the way along the ray where it is hit, or infinity.
+    """
+    first_hits = np.full(len(starts), -1, dtype=np.int64)
+    first_fractions = np.full(len(starts), np.inf)
+    if len(rays) == 0:
+        return first_hits, first_fractions
+
+    unique, inverse = np.unique(indexes, return_inverse=True)
+    points = sprite_list.get_collision_polygons(unique)[0][inverse]
+    fractions = _clip_rays(starts[rays], ends[rays] - starts[rays], points)
+
+    # Nearest hit of each ray, lowest index first on ties
+    order = np.lexsort((indexes, fractions, rays))
+    rays = rays[order]
+    first = np.ones(len(rays), dtype=bool)
+    first[1:] = rays[1:] != rays[:-1]
+    first &= np.isfinite(fractions[order])
+    first_hits[rays[first]] = indexes[order][first]
+    first_fractions[rays[first]] = fractions[order][first]
+    return first_hits, first_fractions
+
+
+def _clip_ray(start_x: float, start_y: float, direction_x: float, direction_y: float,
+              points: PointList) -> float:
+    """ Plain Python version of ``_clip_rays``, for one ray and polygon. """
+    following = points[1:] + points[:1]
+    area = sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, following))
+    if area == 0:
+        return math.inf
+    sign = 1.0 if area > 0 else -1.0
+
+    enter = 0.0
+    leave = 1.0
+    for (x1, y1), (x2, y2) in zip(points, following):
+        normal_x = (y2 - y1) * sign
+        normal_y = -(x2 - x1) * sign
+        if normal_x == 0 and normal_y == 0:
+            continue
+        outside = normal_x * (start_x - x1) + normal_y * (start_y - y1)
+        speed = normal_x * direction_x + normal_y * direction_y
+        if speed < 0:
+            enter = max(enter, -outside / speed)
+        elif speed > 0:
+            leave = min(leave, -outside / speed)
+        elif outside >= 0:
+            return math.inf
+    return enter if enter < leave else math.inf
+
+
+def _clip_rays(starts: np.ndarray, directions: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Cyrus-Beck clipping of N rays against N convex polygons, given as an
+    (N, n, 2) array of points. Returns the fraction of the way along each
+    ray where it enters its polygon, or infinity if it misses. Rays that
+    only touch a polygon's outline miss it, like polygons that only touch.
+    """
+    following = np.concatenate((points[:, 1:], points[:, :1]), axis=1)
+    edges = following - points
+    normals = np.empty_like(edges)
+    normals[:, :, 0] = edges[:, :, 1]
+    normals[:, :, 1] = -edges[:, :, 0]
+    # Point the normals out of the polygon, whichever way round it goes
+    area = (points[:, :, 0] * following[:, :, 1] - following[:, :, 0] * points[:, :, 1]).sum(axis=1)
+    normals *= np.sign(area)[:, np.newaxis, np.newaxis]
+
+    # How far outside of each edge the start is, and how fast the ray goes
+    # out. Repeated points give empty edges, which don't count.
+    outside = (normals * (starts[:, np.newaxis] - points)).sum(axis=2)
+    speed = (normals * directions[:, np.newaxis]).sum(axis=2)
+    empty = (normals == 0).all(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = -outside / speed
+    enter = np.where(speed < 0, crossing, -np.inf).max(axis=1).clip(0, None)
+    leave = np.where(speed > 0, crossing, np.inf).min(axis=1).clip(None, 1)
+
+    hit = (enter < leave) & (area != 0) & ~((speed == 0) & (outside >= 0) & ~empty).any(axis=1)
+    return np.where(hit, enter, np.inf)
@@ -3,71 +3,98 @@
 """
 # pylint: disable=too-many-arguments, too-many-locals, too-few-public-methods
 
+import math
+from typing import List
+from typing import Sequence
+
+import numpy as np
+
 from arcade.geometry import check_for_collision_with_list
-from arcade.geometry import check_for_collision
+from arcade.geometry import get_collision_contacts
+from arcade.geometry import Contact
+from arcade.geometry import _get_pair_contacts
+from arcade.geometry import _get_collision_indices
 from arcade.sprite import Sprite
+from arcade.sprite import _X, _Y, _WIDTH, _HEIGHT, _CHANGE_X, _CHANGE_Y
 from arcade.sprite_list import SpriteList
 
+# Sprites are pushed this much further out of what they hit than needed, as
+# sprite points are rounded to two decimal places.
+_CONTACT_MARGIN = 0.01
+
+
+def _get_step_count(sprite: Sprite, change_x: float, change_y: float, max_step: float=None) -> int:
+    """
+    Number of equal steps to split a move into, so that no step is longer
+    than ``max_step``. By default that is half the sprite's smaller side,
+    so fast sprites can't jump over walls.
+    """
+    if max_step is None:
+        max_step = min(sprite.width, sprite.height) / 2
+    distance = max(abs(change_x), abs(change_y))
+    if max_step <= 0 or distance <= max_step:
+        return 1
+    return math.ceil(distance / max_step)
+
+
+def _push_out(sprite: Sprite, walls: SpriteList, direction: Sequence[float]) -> List[Contact]:
+    """
+    Move a sprite along a unit direction until it is clear of all the walls
+    it overlaps, in one step. Returns the contacts that were resolved.
+    """
+    contacts = get_collision_contacts(sprite, walls, direction)
+    if contacts:
+        depth = max(contact.depth for contact in contacts) + _CONTACT_MARGIN
+        sprite.position = (sprite.center_x + direction[0] * depth,
+                           sprite.center_y + direction[1] * depth)
+    return contacts
+
 
 class PhysicsEngineSimple:
     """
     This class will move everything, and take care of collisions.
     """
 
-    def __init__(self, player_sprite: Sprite, walls: SpriteList):
+    def __init__(self, player_sprite: Sprite, walls: SpriteList, max_step: float=None):
         """
         Constructor.
+
+        Args:
+            :player_sprite: The sprite to move.
+            :walls: Sprites the player can't move through.
+            :max_step: Longest distance the player moves between collision \
+            checks. Faster moves are split into equal steps. Defaults to half \
+            the player's smaller side.
         """
         assert(isinstance(player_sprite, Sprite))
         assert(isinstance(walls, SpriteList))
         self.player_sprite = player_sprite
         self.walls = walls
+        self.max_step = max_step
 
     def update(self):
         """
         Move everything and resolve collisions.
+
+        The player moves along x, then along y. A hit pushes the player back
+        out of the walls in one step, using how deep they overlap.
         """
-        # --- Move in the x direction
-        self.player_sprite.center_x += self.player_sprite.change_x
-
-        # Check for wall hit
-        hit_list = \
-            check_for_collision_with_list(self.player_sprite,
-                                          self.walls)
-
-        # If we hit a wall, move so the edges are at the same point
-        if len(hit_list) > 0:
-            if self.player_sprite.change_x > 0:
-                for item in hit_list:
-                    self.player_sprite.right = min(item.left,
-                                                   self.player_sprite.right)
-            elif self.player_sprite.change_x < 0:
-                for item in hit_list:
-                    self.player_sprite.left = max(item.right,
-                                                  self.player_sprite.left)
-            else:
-                print("Error, collision while player wasn't moving.")
-
-        # --- Move in the y direction
-        self.player_sprite.center_y += self.player_sprite.change_y
-
-        # Check for wall hit
-        hit_list = \
-            check_for_collision_with_list(self.player_sprite,
-                                          self.walls)
-
-        # If we hit a wall, move so the edges are at the same point
-        if len(hit_list) > 0:
-            if self.player_sprite.change_y > 0:
-                for item in hit_list:
-                    self.player_sprite.top = min(item.bottom,
-                                                 self.player_sprite.top)
-            elif self.player_sprite.change_y < 0:
-                for item in hit_list:
-                    self.player_sprite.bottom = max(item.top,
-                                                    self.player_sprite.bottom)
-            else:
-                print("Error, collision while player wasn't moving.")
+        change_x = self.player_sprite.change_x
+        change_y = self.player_sprite.change_y
+        steps = _get_step_count(self.player_sprite, change_x, change_y, self.max_step)
+        step_x = change_x / steps
+        step_y = change_y / steps
+
+        for _ in range(steps):
+            # --- Move in the x direction
+            if step_x:
+                self.player_sprite.center_x += step_x
+                _push_out(self.player_sprite, self.walls, (-1 if step_x > 0 else 1, 0))
+
+            # --- Move in the y direction
+            if step_y:
+                self.player_sprite.center_y += step_y
+                _push_out(self.player_sprite, self.walls, (0, -1 if step_y > 0 else 1))
 
 
 class PhysicsEnginePlatformer:
@@ -76,13 +103,23 @@ class PhysicsEnginePlatformer:
     """
 
     def __init__(self, player_sprite: Sprite, platforms: SpriteList,
-                 gravity_constant: float = 0.5):
+                 gravity_constant: float = 0.5, max_step: float=None):
         """
         Constructor.
+
+        Args:
+            :player_sprite: The sprite to move.
+            :platforms: Sprites the player stands on and can't move through.
+            :gravity_constant: How much the player's downward speed grows \
+            each update.
+            :max_step: Longest distance the player moves between collision \
+            checks. Faster moves are split into equal steps. Defaults to half \
+            the player's smaller side.
         """
         self.player_sprite = player_sprite
         self.platforms = platforms
         self.gravity_constant = gravity_constant
+        self.max_step = max_step
 
     def can_jump(self) -> bool:
         """
@@ -90,152 +127,250 @@ def can_jump(self) -> bool:
         the player_sprite. If there is a floor, the player can jump
         and we return a True.
         """
-        # --- Move in the y direction
-        self.player_sprite.center_y -= 2
-
-        # Check for wall hit
-        hit_list = \
-            check_for_collision_with_list(self.player_sprite,
-                                          self.platforms)
-
-        self.player_sprite.center_y += 2
-
-        if len(hit_list) > 0:
-            return True
-        else:
-            return False
+        # Check for a floor 2 pixels down, without moving the player
+        hit_list = check_for_collision_with_list(self.player_sprite, self.platforms, offset=(0, -2))
+        return len(hit_list) > 0
 
     def update(self):
         """
         Move everything and resolve collisions.
-        """
-        # print(f"Spot A ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
 
+        Landing and hitting the ceiling push the player straight down or up
+        out of the platforms, so they land on ramps where they hit them.
+        Running into a ramp no steeper than 45 degrees climbs it, and
+        running into anything else pushes the player back.
+        """
         # --- Add gravity
         self.player_sprite.change_y -= self.gravity_constant
 
-        # --- Move in the y direction
-        self.player_sprite.center_y += self.player_sprite.change_y
-
-        # Check for wall hit
-        hit_list = check_for_collision_with_list(self.player_sprite, self.platforms)
-
-        # If we hit a wall, move so the edges are at the same point
-        if len(hit_list) > 0:
-            if self.player_sprite.change_y > 0:
-                for item in hit_list:
-                    self.player_sprite.top = min(item.bottom,
-                                                 self.player_sprite.top)
-                # print(f"Spot X ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-            elif self.player_sprite.change_y < 0:
-                for item in hit_list:
-                    while check_for_collision(self.player_sprite, item):
-                        # self.player_sprite.bottom = item.top <- Doesn't work for ramps
-                        self.player_sprite.bottom += 0.25
-
-                    if item.change_x != 0:
-                        self.player_sprite.center_x += item.change_x
-                # print(f"Spot Y ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-            else:
-                pass
-                # TODO: The code below can't execute, as "item" doesn't
-                # exist. In theory, this condition should never be arrived at.
-                # Collision while player wasn't moving, most likely
-                # moving platform.
-                # if self.player_sprite.center_y >= item.center_y:
-                #     self.player_sprite.bottom = item.top
-                # else:
-                #     self.player_sprite.top = item.bottom
-            self.player_sprite.change_y = min(0.0, hit_list[0].change_y)
-
-        # print(f"Spot B ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-        self.player_sprite.center_y = round(self.player_sprite.center_y, 2)
-        # print(f"Spot Q ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-
-        # --- Move in the x direction
-        self.player_sprite.center_x += self.player_sprite.change_x
-
-        check_again = True
-        while check_again:
-            check_again = False
-            # Check for wall hit
-            hit_list = check_for_collision_with_list(self.player_sprite, self.platforms)
-
-            # If we hit a wall, move so the edges are at the same point
-            if len(hit_list) > 0:
-                change_x = self.player_sprite.change_x
-                if change_x > 0:
-                    for item in hit_list:
-                        # print(f"Spot 1 ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-                        # See if we can "run up" a ramp
-                        self.player_sprite.center_y += change_x
-                        if len(check_for_collision_with_list(self.player_sprite, self.platforms)) > 0:
-                            self.player_sprite.center_y -= change_x
-                            self.player_sprite.right = min(item.left, self.player_sprite.right)
-                            # print(f"Spot R ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-                            check_again = True
-                            break
-                        # else:
-                            # print("Run up ok 1")
-                        # print(f"Spot 2 ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-
-                elif change_x < 0:
-                    for item in hit_list:
-                        # See if we can "run up" a ramp
-                        self.player_sprite.center_y -= change_x
-                        if len(check_for_collision_with_list(self.player_sprite, self.platforms)) > 0:
-                            # Can't run up the ramp, reverse
-                            self.player_sprite.center_y += change_x
-                            self.player_sprite.left = max(item.right, self.player_sprite.left)
-                            # print(f"Reverse 1 {item.right}, {self.player_sprite.left}")
-                            # Ok, if we were shoved back to the right, we need to check this whole thing again.
-                            check_again = True
-                            break
-                        # print(f"Spot 4 ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-
+        change_x = self.player_sprite.change_x
+        change_y = self.player_sprite.change_y
+        steps = _get_step_count(self.player_sprite, change_x, change_y, self.max_step)
+        step_x = change_x / steps
+        step_y = change_y / steps
+
+        landed_on = []
+        for _ in range(steps):
+            # --- Move in the y direction
+            if step_y:
+                self.player_sprite.center_y += step_y
+                contacts = _push_out(self.player_sprite, self.platforms, (0, -1 if step_y > 0 else 1))
+                if contacts:
+                    if step_y < 0:
+                        landed_on = contacts
+                    self.player_sprite.change_y = min(0.0, contacts[0].sprite.change_y)
+                    step_y = 0
+
+            # --- Move in the x direction
+            if step_x:
+                self.player_sprite.center_x += step_x
+                self._resolve_sideways(step_x)
+
+        # Ride along with moving platforms we landed on
+        for contact in landed_on:
+            if contact.sprite.change_x != 0:
+                self.player_sprite.center_x += contact.sprite.change_x
+
+        self._move_platforms()
+
+    def _move_platforms(self):
+        """
+        Move the platforms that have a velocity, bouncing them off their
+        boundaries, and push the player out of the way of the ones moving
+        sideways. Platforms that don't move are never looked at.
+        """
+        platforms = self.platforms
+        indexes = platforms.get_kinematic_indexes()
+        if len(indexes) == 0:
+            return
+
+        sprites = [platforms.sprite_list[i] for i in indexes.tolist()]
+        state = platforms._sprite_state[indexes]
+        velocity = state[:, _CHANGE_X:_CHANGE_Y + 1]
+        points = platforms.get_collision_polygons(indexes)[0]
+        bounds = np.concatenate((points.min(axis=1), points.max(axis=1)), axis=1)
+        # Missing boundaries become NaN, which never compares as crossed
+        boundaries = np.array([(sprite.boundary_left, sprite.boundary_bottom,
+                                sprite.boundary_right, sprite.boundary_top)
+                               for sprite in sprites], dtype=np.float64)
+
+        # --- Move in the x direction, then in the y direction
+        for axis in (0, 1):
+            change = velocity[:, axis]
+            shift = change.copy()
+            low = bounds[:, axis] + shift
+            crossed = low <= boundaries[:, axis]
+            shift[crossed] += boundaries[crossed, axis] - low[crossed]
+            change[crossed & (change < 0)] *= -1
+
+            high = bounds[:, axis + 2] + shift
+            crossed = high >= boundaries[:, axis + 2]
+            shift[crossed] += boundaries[crossed, axis + 2] - high[crossed]
+            change[crossed & (change > 0)] *= -1
+
+            new_positions = (state[:, _X + axis] + shift).tolist()
+            for sprite, position, new_change in zip(sprites, new_positions, change.tolist()):
+                if axis == 0:
+                    sprite.center_x = position
+                    sprite.change_x = new_change
                 else:
-                    print("Error, collision while player wasn't moving.\n"
-                          "Make sure you aren't calling multiple updates, like "
-                          "a physics engine update and an all sprites list update.")
-
-            # print(f"Spot E ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-
-        for platform in self.platforms:
-            if platform.change_x != 0 or platform.change_y != 0:
-                platform.center_x += platform.change_x
-
-                if platform.boundary_left is not None \
-                        and platform.left <= platform.boundary_left:
-                    platform.left = platform.boundary_left
-                    if platform.change_x < 0:
-                        platform.change_x *= -1
-
-                if platform.boundary_right is not None \
-                        and platform.right >= platform.boundary_right:
-                    platform.right = platform.boundary_right
-                    if platform.change_x > 0:
-                        platform.change_x *= -1
-
-                if check_for_collision(self.player_sprite, platform):
-                    if platform.change_x < 0:
-                        self.player_sprite.right = platform.left
-                    if platform.change_x > 0:
-                        self.player_sprite.left = platform.right
-
-                platform.center_y += platform.change_y
-
-                if platform.boundary_top is not None \
-                        and platform.top >= platform.boundary_top:
-                    platform.top = platform.boundary_top
-                    if platform.change_y > 0:
-                        platform.change_y *= -1
-
-                if platform.boundary_bottom is not None \
-                        and platform.bottom <= platform.boundary_bottom:
-                    platform.bottom = platform.boundary_bottom
-                    if platform.change_y < 0:
-                        platform.change_y *= -1
-
-        # self.player_sprite.center_x = round(self.player_sprite.center_x, 2)
-        # print(f"Spot C ({self.player_sprite.center_x}, {self.player_sprite.center_y})")
-        # print()
+                    sprite.center_y = position
+                    sprite.change_y = new_change
+
+            if axis == 0:
+                self._push_player_sideways(indexes)
+
+    def _push_player_sideways(self, indexes: np.ndarray):
+        """ Move the player out of the way of the moved platforms at ``indexes``. """
+        hits = np.intersect1d(_get_collision_indices(self.player_sprite, self.platforms), indexes)
+        for i in hits.tolist():
+            platform = self.platforms.sprite_list[i]
+            if platform.change_x < 0:
+                self.player_sprite.right = platform.left
+            if platform.change_x > 0:
+                self.player_sprite.left = platform.right
+
+    def _resolve_sideways(self, step_x: float):
+        """ Climb a ramp, or get pushed back, after moving sideways by ``step_x``. """
+        contacts = get_collision_contacts(self.player_sprite, self.platforms, (0, 1))
+        if not contacts:
+            return
+
+        # See if we can "run up" a ramp. Climbing no higher than we moved
+        # sideways allows slopes up to 45 degrees.
+        climb = max(contact.depth for contact in contacts) + _CONTACT_MARGIN
+        if climb <= abs(step_x) + _CONTACT_MARGIN:
+            self.player_sprite.center_y += climb
+            if len(check_for_collision_with_list(self.player_sprite, self.platforms)) == 0:
+                return
+            self.player_sprite.center_y -= climb
+
+        # Can't run up it, so it's a wall
+        _push_out(self.player_sprite, self.platforms, (-1 if step_x > 0 else 1, 0))
+
+
+class PhysicsEngineMultiBody:
+    """
+    Moves every sprite in a list of bodies, such as enemies, NPCs or
+    projectiles, and keeps them out of a list of walls, all in one pass.
+
+    The bodies move by their change_x and change_y, along x then along y,
+    like with ``PhysicsEngineSimple``. Velocities are applied to the whole
+    list at once, and the collisions of all the bodies are found and
+    resolved together, so stepping many bodies costs little more than
+    stepping one. With gravity, bodies that land or hit a ceiling stop
+    moving up or down.
+    """
+
+    def __init__(self, bodies: SpriteList, walls: SpriteList,
+                 gravity_constant: float=0, collide_bodies: bool=False,
+                 max_step: float=None):
+        """
+        Constructor.
+
+        Args:
+            :bodies: The sprites to move.
+            :walls: Sprites the bodies can't move through. Freezing the \
+            list makes the checks faster.
+            :gravity_constant: How much the downward speed of each body \
+            grows each update.
+            :collide_bodies: Also push the bodies apart from each other.
+            :max_step: Longest distance a body moves between collision \
+            checks. Faster moves are split into equal steps. Defaults to half \
+            the smaller side of each body.
+        """
+        assert(isinstance(bodies, SpriteList))
+        assert(isinstance(walls, SpriteList))
+        self.bodies = bodies
+        self.walls = walls
+        self.gravity_constant = gravity_constant
+        self.collide_bodies = collide_bodies
+        self.max_step = max_step
+
+    def update(self):
+        """
+        Move all the bodies and resolve collisions.
+        """
+        bodies = self.bodies
+        bodies._check_not_frozen()
+        bodies.flush_removals()
+        count = len(bodies.sprite_list)
+        if count == 0:
+            return
+        bodies._check_shared_not_frozen()
+
+        state = bodies._sprite_state[:count]
+        state[:, _CHANGE_Y] -= self.gravity_constant
+
+        # Everyone takes the same number of steps, enough for the fastest
+        velocity = state[:, _CHANGE_X:_CHANGE_Y + 1]
+        if self.max_step is None:
+            max_step = np.minimum(state[:, _WIDTH], state[:, _HEIGHT]) / 2
+        else:
+            max_step = np.full(count, self.max_step)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step_counts = np.abs(velocity).max(axis=1) / max_step
+        step_counts = step_counts[np.isfinite(step_counts)]
+        steps = max(1, int(math.ceil(step_counts.max()))) if len(step_counts) else 1
+        step = velocity / steps
+
+        for _ in range(steps):
+            for axis in (0, 1):
+                moving = step[:, axis] != 0
+                if not moving.any():
+                    continue
+                state[:, _X + axis] += step[:, axis]
+                bodies._on_bulk_change()
+
+                # Push back against the direction of travel. Bodies that
+                # didn't move this way get pushed the shortest way out.
+                directions = np.zeros((count, 2))
+                directions[:, axis] = -np.sign(step[:, axis])
+                hit = self._push_out_of_walls(directions)
+
+                if axis == 1:
+                    stopped = hit & moving
+                    state[stopped, _CHANGE_Y] = 0
+                    step[stopped, 1] = 0
+
+            if self.collide_bodies:
+                self._push_bodies_apart()
+                self._push_out_of_walls(np.zeros((count, 2)))
+
+    def _push_out_of_walls(self, directions: np.ndarray) -> np.ndarray:
+        """
+        Push each body out of all the walls it overlaps, in one move along
+        its direction. Returns which bodies hit a wall.
+        """
+        bodies = self.bodies
+        count = len(bodies.sprite_list)
+        hit = np.zeros(count, dtype=bool)
+        body_indexes, wall_indexes, normals, depths = _get_pair_contacts(bodies, self.walls, directions)
+        if len(body_indexes) == 0:
+            return hit
+
+        # The deepest contact of each body decides the push
+        deepest = np.zeros(count)
+        np.maximum.at(deepest, body_indexes, depths)
+        keep = depths == deepest[body_indexes]
+        push = np.zeros((count, 2))
+        push[body_indexes[keep]] = normals[keep] * (depths[keep, np.newaxis] + _CONTACT_MARGIN)
+
+        bodies._sprite_state[:count, _X:_Y + 1] += push
+        bodies._on_bulk_change()
+        hit[body_indexes] = True
+        return hit
+
+    def _push_bodies_apart(self):
+        """ Move overlapping bodies half of the way out of each other each. """
+        bodies = self.bodies
+        count = len(bodies.sprite_list)
+        body_indexes, other_indexes, normals, depths = _get_pair_contacts(bodies, bodies)
+        if len(body_indexes) == 0:
+            return
+
+        # Each pair shows up both ways round, pushing in opposite directions
+        push = np.zeros((count, 2))
+        np.add.at(push, body_indexes, normals * (depths[:, np.newaxis] + _CONTACT_MARGIN) / 2)
+        bodies._sprite_state[:count, _X:_Y + 1] += push
+        bodies._on_bulk_change()
@@ -37,6 +37,7 @@ class ShaderException(Exception):
     GL_FLOAT_VEC4: (GLfloat, glUniform4fv, 4, 1),
 
     GL_SAMPLER_2D: (GLint, glUniform1iv, 1, 1),
+    GL_SAMPLER_2D_ARRAY: (GLint, glUniform1iv, 1, 1),
 
     GL_FLOAT_MAT2: (GLfloat, glUniformMatrix2fv, 4, 1),
     GL_FLOAT_MAT3: (GLfloat, glUniformMatrix3fv, 6, 1),
@@ -123,7 +124,7 @@ def __init__(self, *shaders: Shader):
 
         self._uniforms = {}
         self._introspect_uniforms()
-        weakref.finalize(self, Program._delete, shaders_id, prog_id)
+        self._finalizer = weakref.finalize(self, Program._delete, shaders_id, prog_id)
 
     @staticmethod
     def _delete(shaders_id, prog_id):
@@ -139,7 +140,8 @@ def _delete(shaders_id, prog_id):
 
     def release(self):
         if self.prog_id != 0:
-            glDeleteProgram(self.prog_id)
+            # Runs _delete now, and makes sure it doesn't run again later
+            self._finalizer()
             self.prog_id = 0
 
     def __getitem__(self, item):
@@ -227,6 +229,43 @@ def program(vertex_shader: str, fragment_shader: str) -> Program:
     )
 
 
+# Shared programs, per OpenGL context, keyed by shader source.
+# Each entry is [program, reference count].
+_program_cache = weakref.WeakKeyDictionary()
+
+
+def get_program(vertex_shader: str, fragment_shader: str) -> Program:
+    """Return a program for the shader code, shared with everyone else using
+    the same code in the current context.
+
+    The program is only compiled the first time. Every call must be matched
+    by a call to `release_program` once the program is no longer needed.
+    """
+    if gl.current_context is None:
+        raise ShaderException("No OpenGL context")
+    context_cache = _program_cache.setdefault(gl.current_context, {})
+    key = (vertex_shader, fragment_shader)
+    entry = context_cache.get(key)
+    if entry is None:
+        entry = context_cache[key] = [program(vertex_shader, fragment_shader), 0]
+    entry[1] += 1
+    return entry[0]
+
+
+def release_program(shared_program: Program):
+    """Give back a program from `get_program`. It is deleted when nobody
+    uses it anymore.
+    """
+    for context_cache in list(_program_cache.values()):
+        for key, entry in context_cache.items():
+            if entry[0] is shared_program:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del context_cache[key]
+                    shared_program.release()
+                return
+
+
 def compile_shader(source: str, shader_type: GLenum) -> GLuint:
     """Compile the shader code of the given type.
 
@@ -479,12 +518,20 @@ def _enable_attrib(self, buf_desc: BufferDescription):
             offset += attribsize
             glEnableVertexAttribArray(loc)
 
-    def render(self, mode: GLuint, instances: int=1):
+    def render(self, mode: GLuint, instances: int=1, first: int=0, vertices: int=None):
+        """Draw the vertex array.
+
+        `first` and `vertices` select a range of vertices to draw, instead of
+        all of them. With an index buffer, they select a range of indices.
+        """
         if self.ibo is not None:
-            count = self.ibo.size // 4
-            glDrawElementsInstanced(mode, count, GL_UNSIGNED_INT, None, instances)
+            count = self.ibo.size // 4 - first if vertices is None else vertices
+            # The indices are 4 byte unsigned ints
+            glDrawElementsInstanced(mode, count, GL_UNSIGNED_INT, c_void_p(first * 4), instances)
         else:
-            glDrawArraysInstanced(mode, 0, self.num_vertices, instances)
+            if vertices is None:
+                vertices = self.num_vertices
+            glDrawArraysInstanced(mode, first, vertices, instances)
 
 
 def vertex_array(program: GLuint, content, index_buffer=None):
@@ -538,3 +585,55 @@ def use(self, texture_unit: int=0):
 
 def texture(size: Tuple[int, int], component: int, data: np.array) -> Texture:
     return Texture(size, component, data)
+
+
+class TextureArray:
+    """Array of RGBA textures of the same size, bound as GL_TEXTURE_2D_ARRAY.
+
+    Each layer can be written to separately with `write`, which only uploads
+    the given block of pixels.
+    """
+    def __init__(self, size: Tuple[int, int], layers: int):
+        self.width, self.height = size
+        self.layers = layers
+        glActiveTexture(GL_TEXTURE0 + 0)
+        self.texture_id = texture_id = GLuint()
+        glGenTextures(1, byref(self.texture_id))
+
+        if self.texture_id.value == 0:
+            raise ShaderException("Cannot create Texture.")
+
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        try:
+            glTexImage3D(
+                GL_TEXTURE_2D_ARRAY, 0, GL_RGBA8, self.width, self.height, layers, 0,
+                GL_RGBA, GL_UNSIGNED_BYTE, None
+            )
+        except GLException:
+            raise GLException(f"Unable to create texture array. {size} {layers}")
+
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        weakref.finalize(self, Texture.release, texture_id)
+
+    def write(self, layer: int, x: int, y: int, data: np.array):
+        """Upload a block of RGBA pixels, shaped (height, width, 4), into a layer."""
+        height, width = data.shape[:2]
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage3D(
+            GL_TEXTURE_2D_ARRAY, 0, x, y, layer, width, height, 1,
+            GL_RGBA, GL_UNSIGNED_BYTE, data.ctypes.data_as(c_void_p)
+        )
+
+    def use(self, texture_unit: int=0):
+        glActiveTexture(GL_TEXTURE0 + texture_unit)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+
+
+def texture_array(size: Tuple[int, int], layers: int) -> TextureArray:
+    return TextureArray(size, layers)
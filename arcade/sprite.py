@@ -8,11 +8,11 @@
 
 import math
 
+import numpy as np
 
 from arcade.draw_commands import load_texture
 from arcade.draw_commands import draw_texture_rectangle
 from arcade.draw_commands import Texture
-from arcade.draw_commands import rotate_point
 from arcade.arcade_types import RGB
 
 from typing import Sequence
@@ -23,6 +23,69 @@
 FACE_UP = 3
 FACE_DOWN = 4
 
+# Layout of a sprite's state row. Sprite lists keep the rows of all their
+# sprites in one array, so they can update them all at once with numpy.
+_X = 0
+_Y = 1
+_ANGLE = 2
+_WIDTH = 3
+_HEIGHT = 4
+_CHANGE_X = 5
+_CHANGE_Y = 6
+_CHANGE_ANGLE = 7
+_RED = 8
+_GREEN = 9
+_BLUE = 10
+_ALPHA = 11
+_STATE_SIZE = 12
+
+
+class _Velocity:
+    """
+    A sprite's velocity, as a list-like [change_x, change_y]. Items are read
+    from the sprite, and changing them sets the sprite's velocity.
+    """
+    __slots__ = ('_sprite',)
+
+    def __init__(self, sprite: 'Sprite'):
+        self._sprite = sprite
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, i):
+        return self._sprite._state[_CHANGE_X:_CHANGE_Y + 1].tolist()[i]
+
+    def __setitem__(self, i, value):
+        velocity = list(self)
+        velocity[i] = value
+        if len(velocity) != 2:
+            raise ValueError("The velocity has to keep two items.")
+        self._sprite._set_velocity(velocity)
+
+    def __iter__(self):
+        return iter(self._sprite._state[_CHANGE_X:_CHANGE_Y + 1].tolist())
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class FrozenSpriteListException(RuntimeError):
+    """
+    Raised when changing a frozen sprite list, or a sprite in one. Call
+    ``unfreeze()`` on the list first.
+    """
+    pass
+
+
 class Sprite:
     """
     Class that represents a 'sprite' on-screen.
@@ -113,39 +176,44 @@ def __init__(self,
 
         self.sprite_lists = []
 
+        # Position, angle, size, velocity and color. While the sprite is in a
+        # sprite list, this is a view into that list's state array.
+        self._state = np.zeros(_STATE_SIZE)
+        self._state[_RED:_ALPHA + 1] = 255
+        self._state_list = None
+        # Number of frozen sprite lists this sprite is in
+        self._frozen_lists = 0
+
+        self._points = None
+        self._point_list_cache = None
+        self._point_list_cache_key = None
+        self._bounds_cache = None
+        self._point_array_cache = None
+        self._axes_cache = None
+
         if filename is not None:
             self.texture = load_texture(filename, image_x, image_y,
                                         image_width, image_height)
 
             self.textures = [self.texture]
-            self._width = self.texture.width * scale
-            self._height = self.texture.height * scale
+            self._state[_WIDTH] = self.texture.width * scale
+            self._state[_HEIGHT] = self.texture.height * scale
         else:
             self.textures = []
             self._texture = None
-            self._width = 0
-            self._height = 0
 
         self.cur_texture_index = 0
 
         self.scale = scale
-        self._position = [center_x, center_y]
-        self._angle = 0.0
-
-        self.velocity = [0, 0]
-        self.change_angle = 0
+        self._state[_X] = center_x
+        self._state[_Y] = center_y
 
         self.boundary_left = None
         self.boundary_right = None
         self.boundary_top = None
         self.boundary_bottom = None
 
-        self._alpha = 255
         self._collision_radius = None
-        self._color = (255, 255, 255)
-
-        self._points = None
-        self._point_list_cache = None
 
         self.force = [0, 0]
         self.guid = None
@@ -198,14 +266,13 @@ def get_texture(self) -> int:
 
     def _get_position(self) -> (float, float):
         """ Get the center x coordinate of the sprite. """
-        return (self._position[0], self._position[1])
+        return float(self._state[_X]), float(self._state[_Y])
 
     def _set_position(self, new_value: (float, float)):
         """ Set the center x coordinate of the sprite. """
-        self.clear_spatial_hashes()
-        self._point_list_cache = None
-        self._position[0] = new_value[0]
-        self._position[1] = new_value[1]
+        self._check_not_frozen()
+        self._state[_X] = new_value[0]
+        self._state[_Y] = new_value[1]
         self.add_spatial_hashes()
 
         for sprite_list in self.sprite_lists:
@@ -221,12 +288,10 @@ def set_position(self, center_x: float, center_y: float):
         >>> empty_sprite = arcade.Sprite()
         >>> empty_sprite.set_position(10, 10)
         """
-        if center_x != self._position[0] or center_y != self._position[1]:
-            from arcade.sprite_list import SpriteList
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
-            self._position[0] = center_x
-            self._position[1] = center_y
+        self._check_not_frozen()
+        if center_x != self._state[_X] or center_y != self._state[_Y]:
+            self._state[_X] = center_x
+            self._state[_Y] = center_y
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -241,7 +306,13 @@ def set_points(self, points: Sequence[Sequence[float]]):
         >>> my_points = (0,0),(1,1),(0,1),(1,0)
         >>> empty_sprite.set_points(my_points)
         """
+        self._check_not_frozen()
         self._points = points
+        self._point_list_cache = None
+        self.add_spatial_hashes()
+
+        for sprite_list in self.sprite_lists:
+            sprite_list.update_hit_box(self)
 
     def get_points(self) -> Tuple[Tuple[float, float]]:
         """
@@ -252,43 +323,78 @@ def get_points(self) -> Tuple[Tuple[float, float]]:
         >>> my_points = (0,0),(1,1),(0,1),(1,0)
         >>> empty_sprite.set_points(my_points)
         >>> empty_sprite.get_points()
-        ((0, 0), (1, 1), (0, 1), (1, 0))
+        ((0.0, 0.0), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0))
+        """
+        self._update_geometry()
+        return self._point_list_cache
+
+    def _update_geometry(self):
         """
-        if self._point_list_cache is not None:
-            return self._point_list_cache
+        Recalculate the points and bounding box of the sprite, if it moved,
+        turned or changed size since the last time.
+        """
+        # The cache is keyed on the position, angle and size, as sprite lists
+        # can move their sprites without going through the properties.
+        cache_key = self._state[_X:_HEIGHT + 1].tolist()
+        if self._point_list_cache is not None and cache_key == self._point_list_cache_key:
+            return
 
+        self._point_list_cache_key = cache_key
+        center_x, center_y, angle, width, height = cache_key
         if self._points is not None:
-            point_list = []
-            for point in range(len(self._points)):
-                point = (self._points[point][0] + self.center_x,
-                         self._points[point][1] + self.center_y)
-                point_list.append(point)
-            self._point_list_cache = tuple(point_list)
+            point_list = tuple((x + center_x, y + center_y) for x, y in self._points)
         else:
-            x1, y1 = rotate_point(self.center_x - self.width / 2,
-                                  self.center_y - self.height / 2,
-                                  self.center_x,
-                                  self.center_y,
-                                  self.angle)
-            x2, y2 = rotate_point(self.center_x + self.width / 2,
-                                  self.center_y - self.height / 2,
-                                  self.center_x,
-                                  self.center_y,
-                                  self.angle)
-            x3, y3 = rotate_point(self.center_x + self.width / 2,
-                                  self.center_y + self.height / 2,
-                                  self.center_x,
-                                  self.center_y,
-                                  self.angle)
-            x4, y4 = rotate_point(self.center_x - self.width / 2,
-                                  self.center_y + self.height / 2,
-                                  self.center_x,
-                                  self.center_y,
-                                  self.angle)
-
-            self._point_list_cache = ((x1, y1), (x2, y2), (x3, y3), (x4, y4))
+            # The corners rotated like rotate_point does, with the sine and
+            # cosine only worked out once. They are rounded to two decimal
+            # places the way numpy does, so sprite lists can work out the
+            # same points for all their sprites at once.
+            cos = math.cos(math.radians(angle))
+            sin = math.sin(math.radians(angle))
+            point_list = []
+            for x, y in ((-width / 2, -height / 2), (width / 2, -height / 2),
+                         (width / 2, height / 2), (-width / 2, height / 2)):
+                point_list.append((round((x * cos - y * sin + center_x) * 100) / 100,
+                                   round((x * sin + y * cos + center_y) * 100) / 100))
+            point_list = tuple(point_list)
+        self._point_list_cache = point_list
 
-        return self._point_list_cache
+        x_values = [point[0] for point in point_list]
+        y_values = [point[1] for point in point_list]
+        self._bounds_cache = (min(x_values), min(y_values), max(x_values), max(y_values))
+
+        # The arrays are only made when a collision check asks for them
+        self._point_array_cache = None
+        self._axes_cache = None
+
+    def get_bounds(self) -> Tuple[float, float, float, float]:
+        """
+        Get the (left, bottom, right, top) bounding box of the sprite's
+        points.
+
+        >>> import arcade
+        >>> empty_sprite = arcade.Sprite(center_x=10)
+        >>> empty_sprite.width = 4
+        >>> empty_sprite.height = 2
+        >>> empty_sprite.get_bounds()
+        (8.0, -1.0, 12.0, 1.0)
+        """
+        self._update_geometry()
+        return self._bounds_cache
+
+    def get_polygon(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the sprite's points as an (n, 2) array, along with the normals
+        of its edges as an (n, 2) array. Both are cached, and must not be
+        changed.
+        """
+        self._update_geometry()
+        if self._point_array_cache is None:
+            point_list = self._point_list_cache
+            # Edge normals, used as the separating axes in collision checks
+            axes = [(y2 - y1, x1 - x2) for (x1, y1), (x2, y2)
+                    in zip(point_list, point_list[1:] + point_list[:1])]
+            self._point_array_cache, self._axes_cache = np.array((point_list, axes), dtype=np.float64)
+        return self._point_array_cache, self._axes_cache
 
     points = property(get_points, set_points)
 
@@ -306,8 +412,12 @@ def _set_collision_radius(self, collision_radius):
         >>> empty_sprite = arcade.Sprite()
         >>> empty_sprite.collision_radius = 5
         """
+        self._check_not_frozen()
         self._collision_radius = collision_radius
 
+        for sprite_list in self.sprite_lists:
+            sprite_list.update_hit_box(self)
+
     def _get_collision_radius(self):
         """
         Get the collision radius.
@@ -323,10 +433,13 @@ def _get_collision_radius(self):
         >>> empty_sprite.width = 3
         >>> empty_sprite.height = 4
         >>> empty_sprite.collision_radius
-        4
+        4.0
         """
         if not self._collision_radius:
-            self._collision_radius = max(self.width, self.height)
+            # A frozen sprite can't store it, so just work it out each time
+            if self._frozen_lists:
+                return max(self.width, self.height)
+            self._set_collision_radius(max(self.width, self.height))
         return self._collision_radius
 
     collision_radius = property(_get_collision_radius, _set_collision_radius)
@@ -335,17 +448,18 @@ def __lt__(self, other):
         return self.texture.texture_id.value < other.texture.texture_id.value
 
     def clear_spatial_hashes(self):
+        """ Take this sprite out of the spatial hashes of its sprite lists. """
         for sprite_list in self.sprite_lists:
-            if sprite_list.use_spatial_hash and sprite_list.spatial_hash is not None:
-                try:
-                    sprite_list.spatial_hash.remove_object(self)
-                except ValueError:
-                    print("Warning, attempt to remove item from spatial hash that doesn't exist in the hash.")
+            if sprite_list.use_spatial_hash:
+                sprite_list.spatial_hash.remove_object(self)
 
     def add_spatial_hashes(self):
+        """
+        Let the spatial hashes of this sprite's lists know it moved. Each
+        hash moves the sprite the next time it is used for a collision check.
+        """
         for sprite_list in self.sprite_lists:
-            if sprite_list.use_spatial_hash:
-                sprite_list.spatial_hash.insert_object_for_box(self)
+            sprite_list.mark_moved(self)
 
     def _get_bottom(self) -> float:
         """
@@ -364,11 +478,7 @@ def _get_bottom(self) -> float:
         1.0
         >>> arcade.quick_run(0.25)
         """
-        points = self.get_points()
-        my_min = points[0][1]
-        for point in range(1, len(points)):
-            my_min = min(my_min, points[point][1])
-        return my_min
+        return self.get_bounds()[1]
 
     def _set_bottom(self, amount: float):
         """
@@ -398,11 +508,7 @@ def _get_top(self) -> float:
         >>> ship_sprite.angle = 90
         >>> arcade.quick_run(0.25)
         """
-        points = self.get_points()
-        my_max = points[0][1]
-        for i in range(1, len(points)):
-            my_max = max(my_max, points[i][1])
-        return my_max
+        return self.get_bounds()[3]
 
     def _set_top(self, amount: float):
         """ The highest y coordinate. """
@@ -414,14 +520,13 @@ def _set_top(self, amount: float):
 
     def _get_width(self) -> float:
         """ Get the center x coordinate of the sprite. """
-        return self._width
+        return float(self._state[_WIDTH])
 
     def _set_width(self, new_value: float):
         """ Set the center x coordinate of the sprite. """
-        if new_value != self._width:
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
-            self._width = new_value
+        self._check_not_frozen()
+        if new_value != self._state[_WIDTH]:
+            self._state[_WIDTH] = new_value
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -431,14 +536,13 @@ def _set_width(self, new_value: float):
 
     def _get_height(self) -> float:
         """ Get the center x coordinate of the sprite. """
-        return self._height
+        return float(self._state[_HEIGHT])
 
     def _set_height(self, new_value: float):
         """ Set the center x coordinate of the sprite. """
-        if new_value != self._height:
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
-            self._height = new_value
+        self._check_not_frozen()
+        if new_value != self._state[_HEIGHT]:
+            self._state[_HEIGHT] = new_value
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -449,14 +553,13 @@ def _set_height(self, new_value: float):
 
     def _get_center_x(self) -> float:
         """ Get the center x coordinate of the sprite. """
-        return self._position[0]
+        return float(self._state[_X])
 
     def _set_center_x(self, new_value: float):
         """ Set the center x coordinate of the sprite. """
-        if new_value != self._position[0]:
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
-            self._position[0] = new_value
+        self._check_not_frozen()
+        if new_value != self._state[_X]:
+            self._state[_X] = new_value
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -466,14 +569,13 @@ def _set_center_x(self, new_value: float):
 
     def _get_center_y(self) -> float:
         """ Get the center y coordinate of the sprite. """
-        return self._position[1]
+        return float(self._state[_Y])
 
     def _set_center_y(self, new_value: float):
         """ Set the center y coordinate of the sprite. """
-        if new_value != self._position[1]:
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
-            self._position[1] = new_value
+        self._check_not_frozen()
+        if new_value != self._state[_Y]:
+            self._state[_Y] = new_value
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -483,34 +585,71 @@ def _set_center_y(self, new_value: float):
 
     def _get_change_x(self) -> float:
         """ Get the velocity in the x plane of the sprite. """
-        return self.velocity[0]
+        return float(self._state[_CHANGE_X])
 
     def _set_change_x(self, new_value: float):
         """ Set the velocity in the x plane of the sprite. """
-        self.velocity[0] = new_value
+        self._check_not_frozen()
+        self._state[_CHANGE_X] = new_value
+        self._sync_velocity()
 
     change_x = property(_get_change_x, _set_change_x)
 
     def _get_change_y(self) -> float:
         """ Get the velocity in the y plane of the sprite. """
-        return self.velocity[1]
+        return float(self._state[_CHANGE_Y])
 
     def _set_change_y(self, new_value: float):
         """ Set the velocity in the y plane of the sprite. """
-        self.velocity[1] = new_value
+        self._check_not_frozen()
+        self._state[_CHANGE_Y] = new_value
+        self._sync_velocity()
 
     change_y = property(_get_change_y, _set_change_y)
 
+    def _get_velocity(self) -> _Velocity:
+        """
+        Get the velocity as a [change_x, change_y] list. Changing an item
+        changes the sprite's velocity.
+
+        >>> import arcade
+        >>> sprite = arcade.Sprite()
+        >>> sprite.velocity[0] = 5
+        >>> sprite.change_x, sprite.velocity
+        (5.0, [5.0, 0.0])
+        """
+        return _Velocity(self)
+
+    def _set_velocity(self, new_value: Sequence[float]):
+        """ Set the velocity as (change_x, change_y). """
+        self._check_not_frozen()
+        self._state[_CHANGE_X] = new_value[0]
+        self._state[_CHANGE_Y] = new_value[1]
+        self._sync_velocity()
+
+    velocity = property(_get_velocity, _set_velocity)
+
+    def _get_change_angle(self) -> float:
+        """ Get the change in angle for each update. """
+        return float(self._state[_CHANGE_ANGLE])
+
+    def _set_change_angle(self, new_value: float):
+        """ Set the change in angle for each update. """
+        self._check_not_frozen()
+        self._state[_CHANGE_ANGLE] = new_value
+        self._sync_state()
+
+    change_angle = property(_get_change_angle, _set_change_angle)
+
     def _get_angle(self) -> float:
         """ Get the angle of the sprite's rotation. """
-        return self._angle
+        return float(self._state[_ANGLE])
 
     def _set_angle(self, new_value: float):
         """ Set the angle of the sprite's rotation. """
-        if new_value != self._angle:
-            self.clear_spatial_hashes()
-            self._angle = new_value
-            self._point_list_cache = None
+        self._check_not_frozen()
+        if new_value != self._state[_ANGLE]:
+            self._state[_ANGLE] = new_value
             self.add_spatial_hashes()
 
             for sprite_list in self.sprite_lists:
@@ -537,11 +676,7 @@ def _get_left(self) -> float:
         1.0
         >>> arcade.quick_run(0.25)
         """
-        points = self.get_points()
-        my_min = points[0][0]
-        for i in range(1, len(points)):
-            my_min = min(my_min, points[i][0])
-        return my_min
+        return self.get_bounds()[0]
 
     def _set_left(self, amount: float):
         """ The left most x coordinate. """
@@ -570,12 +705,7 @@ def _get_right(self) -> float:
         1.0
         >>> arcade.quick_run(0.25)
         """
-
-        points = self.get_points()
-        my_max = points[0][0]
-        for point in range(1, len(points)):
-            my_max = max(my_max, points[point][0])
-        return my_max
+        return self.get_bounds()[2]
 
     def _set_right(self, amount: float):
         """ The right most x coordinate. """
@@ -595,12 +725,11 @@ def _set_texture(self, texture: Texture):
         """
         Set the current sprite texture.
         """
+        self._check_not_frozen()
         if isinstance(texture, Texture):
-            self.clear_spatial_hashes()
-            self._point_list_cache = None
             self._texture = texture
-            self._width = texture.width
-            self._height = texture.height
+            self._state[_WIDTH] = texture.width
+            self._state[_HEIGHT] = texture.height
             self.add_spatial_hashes()
             for sprite_list in self.sprite_lists:
                 sprite_list.update_texture(self)
@@ -615,13 +744,16 @@ def _get_color(self) -> RGB:
         """
         Return the RGB color associated with the sprite.
         """
-        return self._color
+        return int(self._state[_RED]), int(self._state[_GREEN]), int(self._state[_BLUE])
 
     def _set_color(self, color: RGB):
         """
         Set the current sprite color as a RGB value
         """
-        self._color = color
+        self._check_not_frozen()
+        self._state[_RED] = color[0]
+        self._state[_GREEN] = color[1]
+        self._state[_BLUE] = color[2]
         for sprite_list in self.sprite_lists:
             sprite_list.update_position(self)
 
@@ -631,18 +763,25 @@ def _get_alpha(self) -> RGB:
         """
         Return the RGB color associated with the sprite.
         """
-        return self._alpha
+        return int(self._state[_ALPHA])
 
     def _set_alpha(self, alpha: RGB):
         """
         Set the current sprite color as a RGB value
         """
-        self._alpha = alpha
+        self._check_not_frozen()
+        self._state[_ALPHA] = alpha
         for sprite_list in self.sprite_lists:
             sprite_list.update_position(self)
 
     alpha = property(_get_alpha, _set_alpha)
 
+    def _check_not_frozen(self):
+        """ Raise ``FrozenSpriteListException`` if any of our lists are frozen. """
+        if self._frozen_lists:
+            raise FrozenSpriteListException("The sprite is in a frozen sprite list. "
+                                            "Call unfreeze() on it before changing the sprite.")
+
     def register_sprite_list(self, new_list):
         """
         Register this sprite as belonging to a list. We will automatically
@@ -650,9 +789,27 @@ def register_sprite_list(self, new_list):
         """
         self.sprite_lists.append(new_list)
 
+    def _sync_state(self):
+        """
+        Copy the state row into the lists that keep their own copy of it.
+        Only needed for state that doesn't already notify the lists.
+        """
+        if len(self.sprite_lists) > 1:
+            for sprite_list in self.sprite_lists:
+                if sprite_list is not self._state_list:
+                    sprite_list.update_state(self)
+
+    def _sync_velocity(self):
+        """
+        Let the lists know the velocity changed, so each can add the sprite
+        to, or drop it from, the indexes of its moving sprites.
+        """
+        for sprite_list in self.sprite_lists:
+            sprite_list.update_velocity(self)
+
     def draw(self):
         """ Draw the sprite. """
-        if self._alpha != 255:
+        if self.alpha != 255:
             transparent = False
         else:
             transparent = True
@@ -683,7 +840,7 @@ def remove_from_sprite_lists(self):
         """
         Remove the sprite from all sprite lists.
         """
-        for sprite_list in self.sprite_lists:
+        for sprite_list in list(self.sprite_lists):
             if self in sprite_list:
                 sprite_list.remove(self)
         self.sprite_lists.clear()
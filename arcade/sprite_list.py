@@ -7,24 +7,56 @@
 from typing import TypeVar
 from typing import Generic
 from typing import List
+from typing import Tuple
 
 import pyglet.gl as gl
 
 import math
+import weakref
 import numpy as np
 
-from PIL import Image
-
 from arcade.sprite import Sprite
+from arcade.sprite import FrozenSpriteListException
 from arcade.sprite import get_distance_between_sprites
+from arcade.sprite import _X, _Y, _ANGLE, _WIDTH, _HEIGHT
+from arcade.sprite import _CHANGE_X, _CHANGE_Y, _CHANGE_ANGLE
+from arcade.sprite import _RED, _ALPHA, _STATE_SIZE
 
 from arcade.draw_commands import rotate_point
+from arcade.draw_commands import load_texture
+from arcade.draw_commands import Texture
+from arcade.draw_commands import flush_draw_commands
 from arcade.window_commands import get_projection
+from arcade.texture_atlas import TextureAtlas
+from arcade.broadphase import Broadphase
+from arcade.broadphase import SpatialHash
+from arcade.broadphase import StaticGrid
 from arcade import shader
 
+_INITIAL_CAPACITY = 16
+
+# If more than this fraction of the sprites changed, upload the whole buffer
+# instead of the changed ranges.
+_FULL_UPLOAD_FRACTION = 0.25
+# Changed sprites closer together than this are uploaded as one range.
+_DIRTY_RANGE_GAP = 8
+
+# Corners of the default hit box, as fractions of the sprite's size, in the
+# order Sprite.points gives them
+_UNIT_CORNERS = np.array(((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)))
+
+# Bounding boxes computed for collision checks are grown by this much, to
+# cover the rounding of the sprite points
+_BOUNDS_MARGIN = 0.01
+
+# Layout of the per-sprite instance data sent to the graphics card
+_SPRITE_DATA_TYPE = np.dtype([('position', '2f4'), ('angle', 'f4'), ('size', '2f4'),
+                              ('sub_tex_coords', '4f4'), ('tex_layer', 'f4'), ('color', '4B')])
+
 VERTEX_SHADER = """
 #version 330
 uniform mat4 Projection;
+uniform sampler2DArray Texture;
 
 // per vertex
 in vec2 in_vert;
@@ -35,9 +67,10 @@
 in float in_angle;
 in vec2 in_scale;
 in vec4 in_sub_tex_coords;
+in float in_tex_layer;
 in vec4 in_color;
 
-out vec2 v_texture;
+out vec3 v_texture;
 out vec4 v_color;
 
 void main() {
@@ -49,19 +82,23 @@
     pos = in_pos + vec2(rotate * (in_vert * in_scale));
     gl_Position = Projection * vec4(pos, 0.0, 1.0);
 
+    // Sub-texture coordinates are in atlas pixels, with the top row of the
+    // image first.
+    vec2 atlas_size = vec2(textureSize(Texture, 0).xy);
     vec2 tex_offset = in_sub_tex_coords.xy;
     vec2 tex_size = in_sub_tex_coords.zw;
 
-    v_texture = (in_texture * tex_size + tex_offset) * vec2(1, -1);
+    v_texture = vec3((tex_offset + vec2(in_texture.x, 1.0 - in_texture.y) * tex_size) / atlas_size,
+                     in_tex_layer);
     v_color = in_color;
 }
 """
 
 FRAGMENT_SHADER = """
 #version 330
-uniform sampler2D Texture;
+uniform sampler2DArray Texture;
 
-in vec2 v_texture;
+in vec3 v_texture;
 in vec4 v_color;
 
 out vec4 f_color;
@@ -108,202 +145,428 @@ def _create_rects(rect_list: Iterable[Sprite]) -> List[float]:
     return v2f
 
 
-class SpatialHash:
-    """
-    Structure for fast collision checking.
-
-    See: https://www.gamedev.net/articles/programming/general-and-gameplay-programming/spatial-hashing-r2697/
-    """
+T = TypeVar('T', bound=Sprite)
 
-    def __init__(self, cell_size):
-        self.cell_size = cell_size
-        self.contents = {}
 
-    def _hash(self, point):
-        return int(point[0] / self.cell_size), int(point[1] / self.cell_size)
+class SpriteList(Generic[T]):
+    """
+    Keeps a list of sprites, and draws them all with one draw call.
+
+    The position, angle, size, velocity and color of every sprite are kept
+    in one numpy array owned by the list. Each sprite's properties read and
+    write its row of that array, which lets ``move``, ``update`` and buffer
+    refreshes work on all the sprites at once. A sprite that is in several
+    lists lives in the array of the first one, and the other lists keep a
+    copy of its row.
+    """
 
-    def insert_object_for_box(self, new_object: Sprite):
+    def __init__(self, use_spatial_hash=True, spatial_hash_cell_size=128, is_static=False,
+                 atlas: TextureAtlas=None, defer_removals: bool=False,
+                 broadphase: Broadphase=None):
         """
-        Insert a sprite.
+        Initialize the sprite list
+
+        Args:
+            :use_spatial_hash: Keep a spatial hash to speed up collision checks.
+            :spatial_hash_cell_size: Size of each spatial hash cell.
+            :is_static: Set if the sprites rarely move, so the graphics card \
+            can keep the buffer in static memory.
+            :atlas: Texture atlas to draw from. Sprite lists can share an atlas. \
+            By default each list gets its own.
+            :defer_removals: Batch up removed sprites, and take them out of \
+            the list all at once on the next draw, update or access.
+            :broadphase: Index used instead of a ``SpatialHash`` to find the \
+            sprites near a box, such as a ``LooseQuadtree`` or \
+            ``SweepAndPrune``. Each list needs its own.
         """
-        # Get the corners
-        min_x = new_object.left
-        max_x = new_object.right
-        min_y = new_object.bottom
-        max_y = new_object.top
+        # List of sprites in the sprite list
+        self.sprite_list = []
+        self.sprite_idx = dict()
 
-        # print(f"New - Center: ({new_object.center_x}, {new_object.center_y}), Angle: {new_object.angle}, "
-        #       f"Left: {new_object.left}, Right {new_object.right}")
+        # One state row per sprite, in the same order as sprite_list
+        self._sprite_state = np.zeros((_INITIAL_CAPACITY, _STATE_SIZE))
+        # Sprites that use the default Sprite.update, and can be moved in bulk
+        self._plain_update = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        # Sprites that are also in other sprite lists
+        self._shared_sprites = set()
+        # Indexes of the sprites with a change_x or change_y, such as moving
+        # platforms, so they can be moved without going through the others
+        self._kinematic_indexes = set()
+        # Collision radius of each sprite, and the bounds of its hit box
+        # points around its center. NaN means these follow the sprite's size.
+        self._collision_radii = np.full(_INITIAL_CAPACITY, np.nan)
+        self._hit_box_bounds = np.full((_INITIAL_CAPACITY, 4), np.nan)
+
+        # Used in drawing optimization via OpenGL. The shader program is
+        # shared by all sprite lists, and fetched the first time we draw.
+        self.program = None
+        self.sprite_data = None
+        self.sprite_data_buf = None
+        self.vao = None
+        self.vbo_buf = None
 
-        min_point = (min_x, min_y)
-        max_point = (max_x, max_y)
+        # Indexes of sprites whose buffer data changed since the last draw
+        self._dirty_sprites = set()
+        self._all_sprites_dirty = False
 
-        # print(f"Add 1: {min_point} {max_point}")
+        # All the images the sprites use are packed into this
+        self.atlas = atlas if atlas is not None else TextureAtlas()
 
-        # hash the minimum and maximum points
-        min_point, max_point = self._hash(min_point), self._hash(max_point)
+        # Used in collision detection optimization
+        self._cell_size = spatial_hash_cell_size
+        if broadphase is None:
+            broadphase = SpatialHash(cell_size=spatial_hash_cell_size)
+        self._spatial_hash = broadphase
+        self._spatial_hash_stale = False
+        # Sprites that changed since the hash was last used. They are moved
+        # in the hash all at once, so a sprite that changes many times
+        # between collision checks is only moved once.
+        self._moved_sprites = set()
+        self.use_spatial_hash = use_spatial_hash
+        self.is_static = is_static
 
-        # print(f"Add 2: {min_point} {max_point}")
-        # print("Add: ", min_point, max_point)
+        # Sprites removed while defer_removals is set, still taking up a slot
+        self.defer_removals = defer_removals
+        self._pending_removals = set()
 
-        # iterate over the rectangular region
-        for i in range(min_point[0], max_point[0] + 1):
-            for j in range(min_point[1], max_point[1] + 1):
-                # append to each intersecting cell
-                bucket = self.contents.setdefault((i, j), [])
-                if new_object in bucket:
-                    # print(f"Error, {new_object.guid} already in ({i}, {j}) bucket. ")
-                    pass
-                else:
-                    bucket.append(new_object)
-                    # print(f"Adding {new_object.guid} to ({i}, {j}) bucket. "
-                    #       f"{new_object._position} {min_point} {max_point}")
+        # Read-only collision index, with the collision bounds and polygons
+        # of the sprites, while frozen
+        self._static_grid = None
+        self._static_bounds = None
+        self._static_points = None
+        self._static_axes = None
 
-    def remove_object(self, sprite_to_delete: Sprite):
+    def _get_spatial_hash(self) -> Broadphase:
         """
-        Remove a Sprite.
+        Return the spatial hash, first bringing it up to date with the
+        sprites that changed since it was last used. If sprites were moved
+        in bulk, it is rebuilt.
         """
-        # Get the corners
-        min_x = sprite_to_delete.left
-        max_x = sprite_to_delete.right
-        min_y = sprite_to_delete.bottom
-        max_y = sprite_to_delete.top
-
-        # print(f"Del - Center: ({sprite_to_delete.center_x}, {sprite_to_delete.center_y}), "
-        #       f"Angle: {sprite_to_delete.angle}, Left: {sprite_to_delete.left}, Right {sprite_to_delete.right}")
+        if self._spatial_hash_stale:
+            self._spatial_hash_stale = False
+            self._moved_sprites.clear()
+            indexes = np.arange(len(self.sprite_list))
+            if self._pending_removals:
+                pending = [self.sprite_idx[sprite] for sprite in self._pending_removals]
+                indexes = indexes[~np.isin(indexes, pending)]
+            sprites = [self.sprite_list[i] for i in indexes.tolist()]
+            bounds = self.get_collision_bounds(indexes)[2]
+            self._spatial_hash.rebuild(sprites, bounds.tolist())
+        elif self._moved_sprites:
+            for sprite in self._moved_sprites:
+                self._spatial_hash.update_object_for_box(sprite)
+            self._moved_sprites.clear()
+        return self._spatial_hash
+
+    def _set_spatial_hash(self, spatial_hash: Broadphase):
+        self._spatial_hash = spatial_hash
+        self._spatial_hash_stale = False
+        self._moved_sprites.clear()
+
+    spatial_hash = property(_get_spatial_hash, _set_spatial_hash)
+
+    def freeze(self, cell_size: float=None):
+        """
+        Compile the sprites into a read-only collision index, for lists of
+        walls and platforms that never change. Collision checks against a
+        frozen list work on flat arrays of grid cells, bounding boxes and
+        polygons, without going through the sprites.
+
+        Until ``unfreeze`` is called, the list and its sprites can't be
+        changed. Adding, removing or moving sprites, or setting any of their
+        properties, raises ``FrozenSpriteListException``, before anything is
+        changed. That includes sprites also in other lists. Sprites with a
+        change_x or change_y, such as moving platforms, can't be frozen, so
+        keep them in a list of their own.
+
+        Args:
+            :cell_size: Size of the grid cells. Defaults to the list's \
+            spatial hash cell size.
+        """
+        self.flush_removals()
+        self.update_velocities()
+        if self._kinematic_indexes:
+            raise ValueError(f"{len(self._kinematic_indexes)} sprites in the list have a change_x or "
+                             "change_y, and could not be moved once frozen. Keep moving sprites in a "
+                             "list that isn't frozen.")
+        if cell_size is None:
+            cell_size = self._cell_size
+
+        self.unfreeze()
+        count = len(self.sprite_list)
+        self._static_bounds = self.get_collision_bounds(np.arange(count))
+        self._static_grid = StaticGrid(self._static_bounds[2], cell_size)
+        self._static_points, self._static_axes = self.get_collision_polygons(np.arange(count))
+
+        # Sprites that keep their state here get a read-only view of it
+        read_only = self._sprite_state.view()
+        read_only.flags.writeable = False
+        for i, sprite in enumerate(self.sprite_list):
+            sprite._frozen_lists += 1
+            if sprite._state_list is self:
+                sprite._state = read_only[i]
 
-        min_point = (min_x, min_y)
-        max_point = (max_x, max_y)
+        # The spatial hash isn't used while frozen
+        if self.use_spatial_hash:
+            self._spatial_hash.clear()
+            self._spatial_hash_stale = True
+            self._moved_sprites.clear()
 
-        # print(f"Remove 1: {min_point} {max_point}")
+    def unfreeze(self):
+        """ Drop the index made by ``freeze``, so the list can be changed again. """
+        if self._static_grid is None:
+            return
 
-        # hash the minimum and maximum points
-        min_point, max_point = self._hash(min_point), self._hash(max_point)
+        for i, sprite in enumerate(self.sprite_list):
+            sprite._frozen_lists -= 1
+            if sprite._state_list is self:
+                sprite._state = self._sprite_state[i]
+        self._static_grid = None
+        self._static_bounds = None
+        self._static_points = None
+        self._static_axes = None
 
-        # print(f"Remove 2: {min_point} {max_point}")
-        # print("Remove: ", min_point, max_point)
+    def _get_is_frozen(self) -> bool:
+        """ True between calls to ``freeze`` and ``unfreeze``. """
+        return self._static_grid is not None
 
-        # iterate over the rectangular region
-        for i in range(min_point[0], max_point[0] + 1):
-            for j in range(min_point[1], max_point[1] + 1):
-                bucket = self.contents.setdefault((i, j), [])
-                try:
-                    bucket.remove(sprite_to_delete)
-                    # print(f"Removing {sprite_to_delete.guid} from ({i}, {j}) bucket. {sprite_to_delete._position} "
-                    #       f"{min_point} {max_point}")
+    is_frozen = property(_get_is_frozen)
 
-                except ValueError:
-                    print(f"Warning, tried to remove item {sprite_to_delete.guid} from spatial hash {i} {j} when "
-                          f"it wasn't there. {min_point} {max_point}")
+    def _check_not_frozen(self):
+        if self._static_grid is not None:
+            raise FrozenSpriteListException("The sprite list is frozen. Call unfreeze() before changing it.")
 
-    def get_objects_for_box(self, check_object: Sprite) -> List[Sprite]:
+    def _check_shared_not_frozen(self):
         """
-        Returns colliding Sprites.
+        Check that none of our sprites are in a frozen list, before their
+        state is changed in bulk.
         """
-        # Get the corners
-        min_x = check_object.left
-        max_x = check_object.right
-        min_y = check_object.bottom
-        max_y = check_object.top
-
-        min_point = (min_x, min_y)
-        max_point = (max_x, max_y)
+        for sprite in self._shared_sprites:
+            sprite._check_not_frozen()
 
-        # hash the minimum and maximum points
-        min_point, max_point = self._hash(min_point), self._hash(max_point)
+    def _ensure_capacity(self, count: int):
+        """
+        Grow the state arrays, and the instance buffer if we have one, so
+        they can hold ``count`` sprites. Capacity doubles each time, so
+        appends only reallocate now and then.
+        """
+        capacity = len(self._sprite_state)
+        if count <= capacity:
+            return
 
-        close_by_sprites = []
-        # iterate over the rectangular region
-        for i in range(min_point[0], max_point[0] + 1):
-            for j in range(min_point[1], max_point[1] + 1):
-                # print(f"Checking {i}, {j}")
-                # append to each intersecting cell
-                new_items = self.contents.setdefault((i, j), [])
-                # for item in new_items:
-                #     print(f"Found {item.guid} in {i}, {j}")
-                close_by_sprites.extend(new_items)
+        while capacity < count:
+            capacity *= 2
 
-        return close_by_sprites
+        used = len(self.sprite_list)
+        new_state = np.zeros((capacity, _STATE_SIZE))
+        new_state[:used] = self._sprite_state[:used]
+        self._sprite_state = new_state
 
+        new_plain_update = np.zeros(capacity, dtype=bool)
+        new_plain_update[:used] = self._plain_update[:used]
+        self._plain_update = new_plain_update
 
-T = TypeVar('T', bound=Sprite)
+        new_collision_radii = np.full(capacity, np.nan)
+        new_collision_radii[:used] = self._collision_radii[:used]
+        self._collision_radii = new_collision_radii
 
+        new_hit_box_bounds = np.full((capacity, 4), np.nan)
+        new_hit_box_bounds[:used] = self._hit_box_bounds[:used]
+        self._hit_box_bounds = new_hit_box_bounds
 
-class SpriteList(Generic[T]):
+        # Point our sprites at the new array
+        for i, sprite in enumerate(self.sprite_list):
+            if sprite._state_list is self:
+                sprite._state = new_state[i]
 
-    next_texture_id = 0
+        if self.sprite_data is not None:
+            new_sprite_data = np.zeros(capacity, dtype=_SPRITE_DATA_TYPE)
+            new_sprite_data[:used] = self.sprite_data[:used]
+            self.sprite_data = new_sprite_data
+            self._create_sprite_buffer()
 
-    def __init__(self, use_spatial_hash=True, spatial_hash_cell_size=128, is_static=False):
+    def append(self, item: T):
         """
-        Initialize the sprite list
+        Add a new sprite to the list. A sprite that is waiting on a deferred
+        removal gets its old slot back.
         """
-        # List of sprites in the sprite list
-        self.sprite_list = []
-        self.sprite_idx = dict()
+        self._check_not_frozen()
+        reattach = item in self._pending_removals
+        if reattach:
+            self._pending_removals.remove(item)
+            idx = self.sprite_idx[item]
+        else:
+            idx = len(self.sprite_list)
+            self._ensure_capacity(idx + 1)
+
+        self._sprite_state[idx] = item._state
+        self._plain_update[idx] = type(item).update is Sprite.update
+        self._write_hit_box(idx, item)
+        if item._state[_CHANGE_X] or item._state[_CHANGE_Y]:
+            self._kinematic_indexes.add(idx)
+        if item._state_list is None:
+            item._state = self._sprite_state[idx]
+            item._state_list = self
+
+        if item.sprite_lists:
+            self._shared_sprites.add(item)
+            for sprite_list in item.sprite_lists:
+                sprite_list._shared_sprites.add(item)
+
+        if not reattach:
+            self.sprite_list.append(item)
+            self.sprite_idx[item] = idx
+        item.register_sprite_list(self)
 
-        # Used in drawing optimization via OpenGL
-        self.program = shader.program(
-            vertex_shader=VERTEX_SHADER,
-            fragment_shader=FRAGMENT_SHADER
-        )
-        self.sprite_data = None
-        self.sprite_data_buf = None
-        self.texture_id = None
-        self.texture = None
-        self.vao = None
-        self.vbo_buf = None
+        # Fill in the new slot of the instance buffer
+        if self.sprite_data is not None:
+            self._write_sprite_data(idx, idx + 1)
+            self._write_texture_data(idx, item)
+            self._dirty_sprites.add(idx)
 
-        self.array_of_texture_names = []
-        self.array_of_images = []
+        # A stale hash picks up the new sprite when it is rebuilt
+        if self.use_spatial_hash and not self._spatial_hash_stale:
+            self._spatial_hash.insert_object_for_box(item)
 
-        # Used in collision detection optimization
-        self.spatial_hash = SpatialHash(cell_size=spatial_hash_cell_size)
-        self.use_spatial_hash = use_spatial_hash
-        self.is_static = is_static
+    def recalculate_spatial_hash(self, item: T):
+        if self.use_spatial_hash:
+            self._moved_sprites.discard(item)
+            self.spatial_hash.update_object_for_box(item)
 
-    def append(self, item: T):
+    def mark_moved(self, item: T):
         """
-        Add a new sprite to the list.
+        Called when a sprite moves or changes shape. The spatial hash is
+        brought up to date the next time it is used.
         """
-        idx = len(self.sprite_list)
-        self.sprite_list.append(item)
-        self.sprite_idx[item] = idx
-        item.register_sprite_list(self)
-        self.vao = None
-        if self.use_spatial_hash:
-            self.spatial_hash.insert_object_for_box(item)
-
-    def recalculate_spatial_hash(self, item: T):
-        if self.use_spatial_hash:
-            self.spatial_hash.remove_object(item)
-            self.spatial_hash.insert_object_for_box(item)
+        self._check_not_frozen()
+        if self.use_spatial_hash and not self._spatial_hash_stale:
+            self._moved_sprites.add(item)
 
     def remove(self, item: T):
         """
         Remove a specific sprite from the list.
+
+        The last sprite in the list is moved into the removed sprite's slot,
+        so removal takes constant time but can change the drawing order.
+        With ``defer_removals`` set, the sprite drops out of collision checks
+        right away, and the list is compacted later by ``flush_removals``.
         """
-        self.sprite_list.remove(item)
+        if item not in self:
+            raise ValueError("Sprite is not in the sprite list.")
+        self._check_not_frozen()
 
-        # Rebuild index list
-        self.sprite_idx[item] = dict()
-        for idx, sprite in enumerate(self.sprite_list):
-            self.sprite_idx[sprite] = idx
+        if self.use_spatial_hash and not self._spatial_hash_stale:
+            self._spatial_hash.remove_object(item)
+            self._moved_sprites.discard(item)
 
-        self.vao = None
-        if self.use_spatial_hash:
-            self.spatial_hash.remove_object(item)
+        self._detach(item)
+
+        if self.defer_removals:
+            self._kinematic_indexes.discard(self.sprite_idx[item])
+            self._pending_removals.add(item)
+        else:
+            self._remove_index(self.sprite_idx.pop(item))
+
+    def flush_removals(self):
+        """
+        Take the sprites removed while ``defer_removals`` is set out of the
+        list, in one pass. This is done automatically before drawing or
+        updating the list. Reading the list skips the removed sprites
+        instead, so sprites can be removed while looping over the list.
+        """
+        if not self._pending_removals:
+            return
+
+        # Going from the highest index down means the last sprite is never
+        # one that is waiting to be removed.
+        indexes = sorted((self.sprite_idx.pop(sprite) for sprite in self._pending_removals), reverse=True)
+        self._pending_removals.clear()
+        for idx in indexes:
+            self._remove_index(idx)
+
+    def _detach(self, item: T):
+        """ Unlink a sprite from this list, and sort out who keeps its state. """
+        # Give the sprite its own copy of its state before we overwrite the row
+        if item._state_list is self:
+            item._state = item._state.copy()
+            item._state_list = None
+
+        item.sprite_lists.remove(self)
+        self._shared_sprites.discard(item)
+        if len(item.sprite_lists) == 1:
+            item.sprite_lists[0]._shared_sprites.discard(item)
+
+        # If the sprite is still in other lists, one of them keeps its state
+        if item._state_list is None and item.sprite_lists:
+            new_owner = item.sprite_lists[0]
+            row = new_owner._sprite_state[new_owner.sprite_idx[item]]
+            row[:] = item._state
+            item._state = row
+            item._state_list = new_owner
+
+    def _remove_index(self, idx: int):
+        """ Fill the slot at ``idx`` with the last sprite, and drop the last slot. """
+        last = len(self.sprite_list) - 1
+        if idx != last:
+            moved = self.sprite_list[last]
+            self.sprite_list[idx] = moved
+            self.sprite_idx[moved] = idx
+            self._sprite_state[idx] = self._sprite_state[last]
+            self._plain_update[idx] = self._plain_update[last]
+            self._collision_radii[idx] = self._collision_radii[last]
+            self._hit_box_bounds[idx] = self._hit_box_bounds[last]
+            if last in self._kinematic_indexes:
+                self._kinematic_indexes.add(idx)
+            else:
+                self._kinematic_indexes.discard(idx)
+            if moved._state_list is self:
+                moved._state = self._sprite_state[idx]
+            if self.sprite_data is not None:
+                self.sprite_data[idx] = self.sprite_data[last]
+                self._dirty_sprites.add(idx)
+
+        self.sprite_list.pop()
+        self._dirty_sprites.discard(last)
+        self._kinematic_indexes.discard(last)
 
     def update(self):
         """
         Call the update() method on each sprite in the list.
+
+        Sprites that don't override ``update`` are all moved in one
+        vectorized step.
         """
-        for sprite in self.sprite_list:
-            sprite.update()
+        self.flush_removals()
+        count = len(self.sprite_list)
+        state = self._sprite_state[:count]
+        plain_update = self._plain_update[:count]
+
+        moving = plain_update & state[:, _CHANGE_X:_CHANGE_ANGLE + 1].any(axis=1)
+        if moving.any():
+            self._check_not_frozen()
+            for sprite in self._shared_sprites:
+                if moving[self.sprite_idx[sprite]]:
+                    sprite._check_not_frozen()
+        if moving.all():
+            state[:, _X:_Y + 1] += state[:, _CHANGE_X:_CHANGE_Y + 1]
+            state[:, _ANGLE] += state[:, _CHANGE_ANGLE]
+            self._on_bulk_change()
+        elif moving.any():
+            state[moving, _X:_Y + 1] += state[moving, _CHANGE_X:_CHANGE_Y + 1]
+            state[moving, _ANGLE] += state[moving, _CHANGE_ANGLE]
+            self._on_bulk_change()
+
+        if not plain_update.all():
+            # Sprites can remove others, or themselves, as they update
+            for sprite in [self.sprite_list[i] for i in np.flatnonzero(~plain_update).tolist()]:
+                if sprite in self:
+                    sprite.update()
 
     def update_animation(self):
         """
         Call the update_animation() method on each sprite in the list.
         """
+        self.flush_removals()
         for sprite in self.sprite_list:
             sprite.update_animation()
 
@@ -311,150 +574,126 @@ def move(self, change_x: float, change_y: float):
         """
         Moves all contained Sprites.
         """
-        for sprite in self.sprite_list:
-            sprite.center_x += change_x
-            sprite.center_y += change_y
+        self._check_not_frozen()
+        # Rows of sprites waiting on a deferred removal are moved too, which
+        # does no harm, as they no longer belong to any sprite
+        count = len(self.sprite_list)
+        if count == 0:
+            return
+        self._check_shared_not_frozen()
+        self._sprite_state[:count, _X] += change_x
+        self._sprite_state[:count, _Y] += change_y
+        self._on_bulk_change()
 
-    def preload_textures(self, texture_names):
-        self.array_of_texture_names.extend(texture_names)
-        self.array_of_images = None
+    def _on_bulk_change(self):
+        """
+        Bring everything up to date after the state array was changed
+        directly, rather than through sprite properties.
+        """
+        if self.use_spatial_hash:
+            self._spatial_hash_stale = True
+            self._moved_sprites.clear()
+
+        # Sprites in other lists need their state, and those lists, updated.
+        for sprite in self._shared_sprites:
+            i = self.sprite_idx[sprite]
+            if sprite._state_list is not self:
+                sprite._state[:] = self._sprite_state[i]
+            for sprite_list in sprite.sprite_lists:
+                if sprite_list is not self:
+                    if sprite_list.use_spatial_hash:
+                        sprite_list._spatial_hash_stale = True
+                        sprite_list._moved_sprites.clear()
+                    sprite_list.update_position(sprite)
+
+        if self.vao is not None:
+            self._write_sprite_data(0, len(self.sprite_list))
+            self._all_sprites_dirty = True
+
+    def preload_textures(self, texture_list):
+        """
+        Add textures to the atlas ahead of time, so there is no pause when a
+        sprite starts using them. Takes textures, or names of image files.
+        """
+        for texture in texture_list:
+            if not isinstance(texture, Texture):
+                texture = load_texture(texture)
+            self.atlas.add(texture)
+
+    def _get_sub_tex_coords(self, texture: Texture):
+        """ Return the atlas (x, y, width, height) and page for a texture. """
+        region = self.atlas.add(texture)
+        return region.pixel_coordinates, region.page
+
+    def _write_sprite_data(self, start: int, end: int):
+        """
+        Copy position, angle, size and color of a range of sprites from the
+        state array into the buffer data.
+        """
+        state = self._sprite_state[start:end]
+        sprite_data = self.sprite_data[start:end]
+        sprite_data['position'] = state[:, _X:_Y + 1]
+        sprite_data['angle'] = np.radians(state[:, _ANGLE])
+        sprite_data['size'] = state[:, _WIDTH:_HEIGHT + 1] / 2
+        sprite_data['color'] = state[:, _RED:_ALPHA + 1]
+
+    def _write_texture_data(self, i: int, sprite: Sprite):
+        """ Set the atlas location of a sprite's texture in the buffer data. """
+        sub_tex_coords, tex_layer = self._get_sub_tex_coords(sprite.texture)
+        self.sprite_data[i]['sub_tex_coords'] = sub_tex_coords
+        self.sprite_data[i]['tex_layer'] = tex_layer
 
     def calculate_sprite_buffer(self):
 
         if len(self.sprite_list) == 0:
             return
 
-        # Loop through each sprite and grab its position, and the texture it will be using.
-        array_of_positions = []
-        array_of_sizes = []
-        array_of_colors = []
-        array_of_angles = []
-
-        for sprite in self.sprite_list:
-            array_of_positions.append([sprite.center_x, sprite.center_y])
-            array_of_angles.append(math.radians(sprite.angle))
-            size_h = sprite.height / 2
-            size_w = sprite.width / 2
-            array_of_sizes.append([size_w, size_h])
-            array_of_colors.append(sprite.color + (sprite.alpha, ))
-
-        new_array_of_texture_names = []
-        new_array_of_images = []
-        new_texture = False
-        if self.array_of_images is None:
-            new_texture = True
-
-        # print()
-        # print("New texture start: ", new_texture)
+        # Grab the texture each sprite will be using.
+        array_of_sub_tex_coords = []
+        array_of_tex_layers = []
 
         for sprite in self.sprite_list:
+            sub_tex_coords, tex_layer = self._get_sub_tex_coords(sprite.texture)
+            array_of_sub_tex_coords.append(sub_tex_coords)
+            array_of_tex_layers.append(tex_layer)
 
-            name_of_texture_to_check = sprite.texture.name
-            if name_of_texture_to_check not in self.array_of_texture_names:
-                new_texture = True
-                # print("New because of ", name_of_texture_to_check)
-
-            if name_of_texture_to_check not in new_array_of_texture_names:
-                new_array_of_texture_names.append(name_of_texture_to_check)
-                image = sprite.texture.image
-                new_array_of_images.append(image)
-
-        # print("New texture end: ", new_texture)
-        # print(new_array_of_texture_names)
-        # print(self.array_of_texture_names)
-        # print()
-
-        if new_texture:
-            # Add back in any old textures. Chances are we'll need them.
-            for index, old_texture_name in enumerate(self.array_of_texture_names):
-                if old_texture_name not in new_array_of_texture_names:
-                    new_array_of_texture_names.append(old_texture_name)
-                    image = self.array_of_images[index]
-                    new_array_of_images.append(image)
-
-            self.array_of_texture_names = new_array_of_texture_names
+        # Create numpy array with info on location and such. It is as big as
+        # the state array, so there is room to append without reallocating.
+        count = len(self.sprite_list)
+        self.sprite_data = np.zeros(len(self._sprite_state), dtype=_SPRITE_DATA_TYPE)
+        self._write_sprite_data(0, count)
+        self.sprite_data['sub_tex_coords'][:count] = array_of_sub_tex_coords
+        self.sprite_data['tex_layer'][:count] = array_of_tex_layers
 
-            self.array_of_images = new_array_of_images
-            # print(f"New Texture Atlas with names {self.array_of_texture_names}")
-
-        # Get their sizes
-        widths, heights = zip(*(i.size for i in self.array_of_images))
-
-        # Figure out what size a composite would be
-        total_width = sum(widths)
-        max_height = max(heights)
-
-        if new_texture:
-
-            # TODO: This code isn't valid, but I think some releasing might be in order.
-            # if self.texture is not None:
-            #     shader.Texture.release(self.texture_id)
-
-            # Make the composite image
-            new_image = Image.new('RGBA', (total_width, max_height))
-
-            x_offset = 0
-            for image in self.array_of_images:
-                new_image.paste(image, (x_offset, 0))
-                x_offset += image.size[0]
-
-            # Create a texture out the composite image
-            self.texture = shader.texture(
-                (new_image.width, new_image.height),
-                4,
-                np.asarray(new_image)
-            )
-
-            if self.texture_id is None:
-                self.texture_id = SpriteList.next_texture_id
-
-        # Create a list with the coordinates of all the unique textures
-        tex_coords = []
-        start_x = 0.0
-        for image in self.array_of_images:
-            end_x = start_x + (image.width / total_width)
-            normalized_width = image.width / total_width
-            start_height = 1 - (image.height / max_height)
-            normalized_height = image.height / max_height
-            tex_coords.append([start_x, start_height, normalized_width, normalized_height])
-            start_x = end_x
-
-        # Go through each sprite and pull from the coordinate list, the proper
-        # coordinates for that sprite's image.
-        array_of_sub_tex_coords = []
-        for sprite in self.sprite_list:
-            index = self.array_of_texture_names.index(sprite.texture.name)
-            array_of_sub_tex_coords.append(tex_coords[index])
-
-        # Create numpy array with info on location and such
-        buffer_type = np.dtype([('position', '2f4'), ('angle', 'f4'), ('size', '2f4'),
-                                ('sub_tex_coords', '4f4'), ('color', '4B')])
-        self.sprite_data = np.zeros(len(self.sprite_list), dtype=buffer_type)
-        self.sprite_data['position'] = array_of_positions
-        self.sprite_data['angle'] = array_of_angles
-        self.sprite_data['size'] = array_of_sizes
-        self.sprite_data['sub_tex_coords'] = array_of_sub_tex_coords
-        self.sprite_data['color'] = array_of_colors
+        self._create_sprite_buffer()
 
+    def _create_sprite_buffer(self):
+        """
+        Send the whole instance data array to a new buffer, and set up the
+        vertex array to draw from it.
+        """
         if self.is_static:
             usage = 'static'
         else:
-            usage = 'stream'
+            usage = 'dynamic'
 
         self.sprite_data_buf = shader.buffer(
             self.sprite_data.tobytes(),
             usage=usage
         )
-
-        vertices = np.array([
-            #  x,    y,   u,   v
-            -1.0, -1.0, 0.0, 0.0,
-            -1.0, 1.0, 0.0, 1.0,
-            1.0, -1.0, 1.0, 0.0,
-            1.0, 1.0, 1.0, 1.0,
-        ], dtype=np.float32
-        )
-        self.vbo_buf = shader.buffer(vertices.tobytes())
+        self._dirty_sprites.clear()
+        self._all_sprites_dirty = False
+
+        if self.vbo_buf is None:
+            vertices = np.array([
+                #  x,    y,   u,   v
+                -1.0, -1.0, 0.0, 0.0,
+                -1.0, 1.0, 0.0, 1.0,
+                1.0, -1.0, 1.0, 0.0,
+                1.0, 1.0, 1.0, 1.0,
+            ], dtype=np.float32
+            )
+            self.vbo_buf = shader.buffer(vertices.tobytes())
         vbo_buf_desc = shader.BufferDescription(
             self.vbo_buf,
             '2f 2f',
@@ -462,71 +701,276 @@ def calculate_sprite_buffer(self):
         )
         pos_angle_scale_buf_desc = shader.BufferDescription(
             self.sprite_data_buf,
-            '2f 1f 2f 4f 4B',
-            ('in_pos', 'in_angle', 'in_scale', 'in_sub_tex_coords', 'in_color'),
+            '2f 1f 2f 4f 1f 4B',
+            ('in_pos', 'in_angle', 'in_scale', 'in_sub_tex_coords', 'in_tex_layer', 'in_color'),
             normalized=['in_color'], instanced=True)
 
         vao_content = [vbo_buf_desc, pos_angle_scale_buf_desc]
 
         # Can add buffer to index vertices
+        if self.program is None:
+            self.program = shader.get_program(VERTEX_SHADER, FRAGMENT_SHADER)
+            weakref.finalize(self, shader.release_program, self.program)
+
         self.vao = shader.vertex_array(self.program, vao_content)
 
+    def _copy_state(self, sprite: Sprite) -> int:
+        """
+        Copy the state of a sprite into our array, if we only keep a copy of
+        it. Returns the sprite's index.
+        """
+        i = self.sprite_idx[sprite]
+        if sprite._state_list is not self:
+            self._sprite_state[i] = sprite._state
+        return i
+
+    def _write_hit_box(self, i: int, sprite: Sprite):
+        """ Fill in the collision radius and hit box bounds of a sprite. """
+        self._collision_radii[i] = sprite._collision_radius or np.nan
+        if sprite._points is None:
+            self._hit_box_bounds[i] = np.nan
+        else:
+            points = np.asarray(sprite._points, dtype=np.float64)
+            self._hit_box_bounds[i, :2] = points.min(axis=0)
+            self._hit_box_bounds[i, 2:] = points.max(axis=0)
+
+    def update_hit_box(self, sprite):
+        """ Called when the collision radius or hit box points of a sprite change. """
+        self._write_hit_box(self.sprite_idx[sprite], sprite)
+
+    def get_collision_bounds(self, indexes: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Return the (x, y) centers, the collision radii, and the (left, bottom,
+        right, top) bounding boxes of the hit boxes, of the sprites at the
+        given indexes.
+        """
+        if self._static_bounds is not None:
+            positions, radii, bounds = self._static_bounds
+            return positions[indexes], radii[indexes], bounds[indexes]
+
+        state = self._sprite_state[indexes]
+        width = state[:, _WIDTH]
+        height = state[:, _HEIGHT]
+
+        radii = self._collision_radii[indexes]
+        sized = np.isnan(radii)
+        radii[sized] = np.maximum(width[sized], height[sized])
+
+        # Rotated rectangles, unless the sprite has hit box points
+        angle = np.radians(state[:, _ANGLE])
+        cos = np.abs(np.cos(angle))
+        sin = np.abs(np.sin(angle))
+        half_width = (width * cos + height * sin) / 2
+        half_height = (width * sin + height * cos) / 2
+        bounds = np.stack((-half_width, -half_height, half_width, half_height), axis=1)
+
+        hit_box_bounds = self._hit_box_bounds[indexes]
+        has_points = ~np.isnan(hit_box_bounds[:, 0])
+        bounds[has_points] = hit_box_bounds[has_points]
+
+        # Sprite points are rounded, so leave a little room around the boxes
+        bounds[:, :2] -= _BOUNDS_MARGIN
+        bounds[:, 2:] += _BOUNDS_MARGIN
+        bounds[:, 0::2] += state[:, _X, np.newaxis]
+        bounds[:, 1::2] += state[:, _Y, np.newaxis]
+        return state[:, _X:_Y + 1], radii, bounds
+
+    def get_collision_polygons(self, indexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the points of the hit boxes of the sprites at the given
+        indexes, and the normals of their edges, as two (N, n, 2) arrays.
+        Hit boxes with fewer points are padded by repeating their last point
+        and their first normal. Sprites without hit box points are worked
+        out all at once, giving the same points as ``Sprite.points``.
+        """
+        if self._static_points is not None:
+            return self._static_points[indexes], self._static_axes[indexes]
+
+        state = self._sprite_state[indexes]
+        angle = np.radians(state[:, _ANGLE])
+        cos = np.cos(angle)[:, np.newaxis]
+        sin = np.sin(angle)[:, np.newaxis]
+        corner_x = _UNIT_CORNERS[:, 0] * state[:, _WIDTH, np.newaxis]
+        corner_y = _UNIT_CORNERS[:, 1] * state[:, _HEIGHT, np.newaxis]
+        points = np.empty((len(indexes), 4, 2))
+        points[:, :, 0] = corner_x * cos - corner_y * sin + state[:, _X, np.newaxis]
+        points[:, :, 1] = corner_x * sin + corner_y * cos + state[:, _Y, np.newaxis]
+        points = np.round(points, 2)
+        edges = np.roll(points, -1, axis=1) - points
+        axes = np.stack((edges[:, :, 1], -edges[:, :, 0]), axis=2)
+
+        has_points = ~np.isnan(self._hit_box_bounds[indexes, 0])
+        if not has_points.any():
+            return points, axes
+
+        hit_box_points, hit_box_axes = _stack_polygons(
+            [self.sprite_list[i].get_polygon() for i in indexes[has_points].tolist()])
+        size = max(4, hit_box_points.shape[1])
+        if size > 4:
+            points = np.concatenate((points, np.repeat(points[:, -1:], size - 4, axis=1)), axis=1)
+            axes = np.concatenate((axes, np.repeat(axes[:, :1], size - 4, axis=1)), axis=1)
+        padding = size - hit_box_points.shape[1]
+        if padding:
+            hit_box_points = np.concatenate(
+                (hit_box_points, np.repeat(hit_box_points[:, -1:], padding, axis=1)), axis=1)
+            hit_box_axes = np.concatenate((hit_box_axes, np.repeat(hit_box_axes[:, :1], padding, axis=1)), axis=1)
+        points[has_points] = hit_box_points
+        axes[has_points] = hit_box_axes
+        return points, axes
+
+    def query_rect(self, left: float, right: float, bottom: float, top: float) -> List[Sprite]:
+        """
+        Return the sprites whose hit boxes overlap a rectangle, in list
+        order. The sprites are looked up in the spatial hash, and nothing is
+        moved or changed.
+
+        >>> import arcade
+        >>> sprite_list = arcade.SpriteList()
+        >>> for x in (0, 50, 100):
+        ...     sprite = arcade.Sprite(center_x=x)
+        ...     sprite.width, sprite.height = 20, 20
+        ...     sprite_list.append(sprite)
+        >>> [sprite.center_x for sprite in sprite_list.query_rect(5, 60, -5, 5)]
+        [0.0, 50.0]
+        """
+        from arcade.geometry import _get_indices_in_polygon
+        corners = np.array(((left, bottom), (right, bottom), (right, top), (left, top)), dtype=np.float64)
+        axes = np.array(((0, -1), (1, 0), (0, 1), (-1, 0)), dtype=np.float64)
+        return [self.sprite_list[i] for i in _get_indices_in_polygon(self, corners, axes).tolist()]
+
+    def sprites_at_point(self, x: float, y: float) -> List[Sprite]:
+        """
+        Return the sprites whose hit boxes the point (x, y) is inside of, in
+        list order, such as the sprites under the mouse. The sprites are
+        looked up in the spatial hash, and nothing is moved or changed.
+        """
+        from arcade.geometry import _get_indices_in_polygon
+        point = np.array(((x, y),), dtype=np.float64)
+        return [self.sprite_list[i] for i in _get_indices_in_polygon(self, point, np.zeros((0, 2))).tolist()]
+
     def update_positions(self):
 
+        for sprite in self._shared_sprites:
+            self._copy_state(sprite)
+
         if self.vao is None:
             return
 
-        for i, sprite in enumerate(self.sprite_list):
-            self.sprite_data[i]['position'] = [sprite.center_x, sprite.center_y]
-            self.sprite_data[i]['angle'] = math.radians(sprite.angle)
-            self.sprite_data[i]['size'] = [sprite.width / 2, sprite.height / 2]
-            self.sprite_data[i]['color'] = sprite.color + (sprite.alpha, )
+        self._write_sprite_data(0, len(self.sprite_list))
+        self._all_sprites_dirty = True
+
+    def update_state(self, sprite):
+        """ Called when sprite state that isn't drawn, like velocity, changes. """
+        self._copy_state(sprite)
+
+    def update_velocity(self, sprite):
+        """ Called when the change_x or change_y of a sprite changes. """
+        i = self._copy_state(sprite)
+        if self._sprite_state[i, _CHANGE_X] or self._sprite_state[i, _CHANGE_Y]:
+            self._kinematic_indexes.add(i)
+        else:
+            self._kinematic_indexes.discard(i)
+
+    def update_velocities(self):
+        """
+        Find the sprites that move again, after change_x or change_y was
+        written for many sprites at once straight into the state array.
+        """
+        moving = self._sprite_state[:len(self.sprite_list), _CHANGE_X:_CHANGE_Y + 1].any(axis=1)
+        # Sprites waiting to be compacted away still have their rows
+        if self._pending_removals:
+            moving[[self.sprite_idx[sprite] for sprite in self._pending_removals]] = False
+        self._kinematic_indexes = set(np.flatnonzero(moving).tolist())
+
+    def get_kinematic_indexes(self) -> np.ndarray:
+        """
+        Return the indexes of the sprites that have a change_x or change_y,
+        in order, without going through the sprites that don't. Velocities
+        set through sprite properties are picked up as they change, and
+        ``update_velocities`` picks up the ones set in bulk.
+        """
+        if not self._kinematic_indexes:
+            return np.zeros(0, dtype=np.int64)
+        indexes = np.fromiter(self._kinematic_indexes, dtype=np.int64, count=len(self._kinematic_indexes))
+        indexes.sort()
+        return indexes
 
     def update_texture(self, sprite):
+        i = self._copy_state(sprite)
+
         if self.vao is None:
             return
 
-        self.calculate_sprite_buffer()
+        self._write_texture_data(i, sprite)
+        self.sprite_data[i]['size'] = [sprite.width / 2, sprite.height / 2]
+        self._dirty_sprites.add(i)
 
     def update_position(self, sprite):
+        i = self._copy_state(sprite)
 
         if self.vao is None:
             return
 
-        i = self.sprite_idx[sprite]
-
-        self.sprite_data[i]['position'] = [sprite.center_x, sprite.center_y]
-        self.sprite_data[i]['angle'] = math.radians(sprite.angle)
-        self.sprite_data[i]['size'] = [sprite.width / 2, sprite.height / 2]
-        self.sprite_data[i]['color'] = sprite.color + (sprite.alpha, )
+        self._write_sprite_data(i, i + 1)
+        self._dirty_sprites.add(i)
 
     def update_location(self, sprite):
+        i = self._copy_state(sprite)
 
         if self.vao is None:
             return
 
-        i = self.sprite_idx[sprite]
-
         self.sprite_data[i]['position'] = [sprite.center_x, sprite.center_y]
+        self._dirty_sprites.add(i)
 
     def update_angle(self, sprite):
+        i = self._copy_state(sprite)
 
         if self.vao is None:
             return
 
-        i = self.sprite_idx[sprite]
-
         self.sprite_data[i]['angle'] = math.radians(sprite.angle)
+        self._dirty_sprites.add(i)
+
+    def _upload_dirty_sprites(self):
+        """
+        Send the buffer data of sprites that changed since the last draw to
+        the graphics card. Small changes upload just the changed ranges.
+        """
+        if not self._all_sprites_dirty and not self._dirty_sprites:
+            return
+
+        count = len(self.sprite_list)
+        if self._all_sprites_dirty or len(self._dirty_sprites) > count * _FULL_UPLOAD_FRACTION:
+            # Let the driver give us fresh storage rather than wait on the old one
+            self.sprite_data_buf.orphan()
+            self.sprite_data_buf.write(self.sprite_data[:count].tobytes())
+        else:
+            item_size = self.sprite_data.dtype.itemsize
+            indexes = np.array(sorted(self._dirty_sprites))
+            # Split the sorted indexes into runs wherever there is a big gap
+            breaks = np.flatnonzero(np.diff(indexes) > _DIRTY_RANGE_GAP) + 1
+            starts = np.concatenate(([indexes[0]], indexes[breaks]))
+            ends = np.concatenate((indexes[breaks - 1], [indexes[-1]])) + 1
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.sprite_data_buf.write(self.sprite_data[start:end].tobytes(), offset=start * item_size)
+
+        self._dirty_sprites.clear()
+        self._all_sprites_dirty = False
 
     def draw(self):
 
+        self.flush_removals()
         if len(self.sprite_list) == 0:
             return
 
+        # Batched shapes drawn before us need to be under us
+        flush_draw_commands()
+
         if self.vao is None:
             self.calculate_sprite_buffer()
 
-        self.texture.use(0)
+        self.atlas.use(0)
 
         gl.glEnable(gl.GL_BLEND)
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
@@ -534,34 +978,69 @@ def draw(self):
         # gl.glTexParameterf(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
 
         with self.vao:
-            self.program['Texture'] = self.texture_id
+            self.program['Texture'] = 0
             self.program['Projection'] = get_projection().flatten()
 
-            if not self.is_static:
-                self.sprite_data_buf.write(self.sprite_data.tobytes())
+            self._upload_dirty_sprites()
 
             self.vao.render(gl.GL_TRIANGLE_STRIP, instances=len(self.sprite_list))
 
-            if not self.is_static:
-                self.sprite_data_buf.orphan()
+    def _get_live_sprites(self) -> List[T]:
+        """ The sprites in the list, leaving out the ones waiting on a deferred removal. """
+        if not self._pending_removals:
+            return self.sprite_list
+        pending = self._pending_removals
+        return [sprite for sprite in self.sprite_list if sprite not in pending]
 
     def __len__(self) -> int:
         """ Return the length of the sprite list. """
-        return len(self.sprite_list)
+        return len(self.sprite_list) - len(self._pending_removals)
 
     def __iter__(self) -> Iterable[T]:
-        """ Return an iterable object of sprites. """
-        return iter(self.sprite_list)
+        """
+        Return an iterable object of sprites. Sprites removed during the
+        loop are skipped if it hasn't reached them yet.
+        """
+        for sprite in self.sprite_list:
+            if sprite not in self._pending_removals:
+                yield sprite
 
     def __getitem__(self, i):
-        return self.sprite_list[i]
+        return self._get_live_sprites()[i]
+
+    def __contains__(self, item) -> bool:
+        """ Return whether a sprite is in the list. """
+        return item in self.sprite_idx and item not in self._pending_removals
 
     def pop(self) -> Sprite:
         """
         Pop off the last sprite in the list.
         """
-        self.program = None
-        return self.sprite_list.pop()
+        sprite = self[-1]
+        self.remove(sprite)
+        return sprite
+
+
+def _stack_polygons(polygons: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack (points, edge normals) pairs into two (N, n, 2) arrays. Polygons
+    with fewer points are padded by repeating their last point and their
+    first normal, which doesn't change what they collide with.
+    """
+    size = max(len(points) for points, axes in polygons)
+    if all(len(points) == size for points, axes in polygons):
+        return (np.stack([points for points, axes in polygons]),
+                np.stack([axes for points, axes in polygons]))
+
+    stacked_points = np.empty((len(polygons), size, 2))
+    stacked_axes = np.empty((len(polygons), size, 2))
+    for i, (points, axes) in enumerate(polygons):
+        count = len(points)
+        stacked_points[i, :count] = points
+        stacked_points[i, count:] = points[-1]
+        stacked_axes[i, :count] = axes
+        stacked_axes[i, count:] = axes[0]
+    return stacked_points, stacked_axes
 
 
 def get_closest_sprite(sprite1: Sprite, sprite_list: SpriteList) -> (Sprite, float):
@@ -0,0 +1,291 @@
+"""
+Texture atlas used by sprite lists to draw many different images with a
+single texture.
+
+Images are packed into square pages with a shelf packer. A page starts small
+and doubles in size until it reaches the largest size the graphics card
+supports; after that, new pages are added. The pages are stored as layers of
+one OpenGL texture array, so a sprite list can still draw all of its sprites
+with one instanced draw call.
+
+Adding an image only uploads that image with a sub-image write. The rest of
+the atlas is only re-uploaded when the page size or page count has to grow.
+"""
+
+from ctypes import byref
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pyglet.gl as gl
+
+from arcade import shader
+
+DEFAULT_INITIAL_PAGE_SIZE = 256
+DEFAULT_MAX_PAGE_SIZE = 4096
+
+
+class AtlasRegion:
+    """
+    Location of one image inside a ``TextureAtlas``.
+
+    Attributes:
+        :page: Index of the page (texture array layer) holding the image.
+        :x: Left pixel coordinate of the image in the page.
+        :y: Top pixel coordinate of the image in the page.
+        :width: Width of the image in pixels.
+        :height: Height of the image in pixels.
+    """
+    __slots__ = ('page', 'x', 'y', 'width', 'height')
+
+    def __init__(self, page: int, x: int, y: int, width: int, height: int):
+        self.page = page
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def pixel_coordinates(self) -> Tuple[int, int, int, int]:
+        """ Return (x, y, width, height) of the image in page pixels. """
+        return self.x, self.y, self.width, self.height
+
+    def __repr__(self):
+        return f"AtlasRegion(page={self.page}, x={self.x}, y={self.y}, " \
+               f"width={self.width}, height={self.height})"
+
+
+class _Shelf:
+    """ One row of images in an atlas page. """
+    __slots__ = ('y', 'height', 'used_width')
+
+    def __init__(self, y: int, height: int):
+        self.y = y
+        self.height = height
+        self.used_width = 0
+
+
+class _AtlasPage:
+    """
+    Shelf packer for one square page.
+
+    Images are placed left to right on shelves. A new shelf is opened below
+    the last one when no existing shelf has room for the image.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.shelves: List[_Shelf] = []
+        self.used_height = 0
+
+    def allocate(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """
+        Find a spot for a block of the given size. Returns the (x, y) of the
+        spot, or None if the page is full.
+        """
+        if width > self.size or height > self.size:
+            return None
+
+        # Pick the shelf that wastes the least amount of height
+        best_shelf = None
+        for shelf in self.shelves:
+            if shelf.height >= height and self.size - shelf.used_width >= width:
+                if best_shelf is None or shelf.height < best_shelf.height:
+                    best_shelf = shelf
+
+        if best_shelf is None:
+            if self.size - self.used_height < height:
+                return None
+            best_shelf = _Shelf(self.used_height, height)
+            self.shelves.append(best_shelf)
+            self.used_height += height
+
+        x = best_shelf.used_width
+        best_shelf.used_width += width
+        return x, best_shelf.y
+
+    def grow(self, new_size: int):
+        """
+        Enlarge the page. Existing shelves keep their location, and get
+        the extra width to the right.
+        """
+        self.size = new_size
+
+
+def get_max_texture_size() -> int:
+    """
+    Return the largest texture size supported by the current OpenGL
+    context, limited to ``DEFAULT_MAX_PAGE_SIZE``.
+    """
+    if gl.current_context is None:
+        return DEFAULT_MAX_PAGE_SIZE
+    value = gl.GLint()
+    gl.glGetIntegerv(gl.GL_MAX_TEXTURE_SIZE, byref(value))
+    return min(value.value, DEFAULT_MAX_PAGE_SIZE)
+
+
+def _get_max_layers() -> int:
+    if gl.current_context is None:
+        return 256
+    value = gl.GLint()
+    gl.glGetIntegerv(gl.GL_MAX_ARRAY_TEXTURE_LAYERS, byref(value))
+    return value.value
+
+
+def _next_power_of_two(value: int) -> int:
+    result = 1
+    while result < value:
+        result *= 2
+    return result
+
+
+class TextureAtlas:
+    """
+    Growable texture atlas that maps texture names to regions of a texture
+    array.
+
+    >>> import arcade
+    >>> atlas = arcade.TextureAtlas(max_page_size=64)
+    >>> texture = arcade.load_texture("arcade/examples/images/coin_01.png", 0, 0, 20, 20)
+    >>> region = atlas.add(texture)
+    >>> region.page, region.width, region.height
+    (0, 20, 20)
+    >>> atlas.add(texture) is region
+    True
+    """
+
+    def __init__(self, initial_page_size: int=DEFAULT_INITIAL_PAGE_SIZE,
+                 max_page_size: int=None, border: int=1):
+        """
+        Create an empty atlas.
+
+        Args:
+            :initial_page_size: Starting width and height of the first page.
+            :max_page_size: Largest page size. Defaults to the largest texture \
+            size the graphics card supports.
+            :border: Transparent pixels kept between images, to avoid \
+            neighbouring images bleeding into each other.
+        """
+        if max_page_size is None:
+            max_page_size = get_max_texture_size()
+        self.max_page_size = max_page_size
+        self.page_size = min(initial_page_size, max_page_size)
+        self.border = border
+
+        self.regions: Dict[str, AtlasRegion] = {}
+
+        self._pages: List[_AtlasPage] = []
+        self._images = []
+        self._pending_uploads = []
+
+        self._texture = None
+        self._texture_size = 0
+        self._texture_layers = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.regions
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    @property
+    def page_count(self) -> int:
+        """ Number of pages currently in use. """
+        return len(self._pages)
+
+    def get_region(self, name: str) -> AtlasRegion:
+        """ Return the region for an image already in the atlas. """
+        return self.regions[name]
+
+    def add(self, texture) -> AtlasRegion:
+        """
+        Add a texture to the atlas, if it isn't already there, and return
+        its region.
+        """
+        region = self.regions.get(texture.name)
+        if region is not None:
+            return region
+
+        image = texture.image
+        width, height = image.size
+        padded_width = width + self.border
+        padded_height = height + self.border
+
+        if padded_width > self.max_page_size or padded_height > self.max_page_size:
+            raise ValueError(f"Texture {texture.name} is {width}x{height}, which is larger than "
+                             f"the maximum atlas page size of {self.max_page_size}.")
+
+        page_index, position = self._allocate(padded_width, padded_height)
+        region = AtlasRegion(page_index, position[0], position[1], width, height)
+        self.regions[texture.name] = region
+        self._images.append((region, image))
+        self._pending_uploads.append((region, image))
+        return region
+
+    def _allocate(self, width: int, height: int) -> Tuple[int, Tuple[int, int]]:
+        """ Find room for a block, growing or adding pages as needed. """
+        for page_index, page in enumerate(self._pages):
+            position = page.allocate(width, height)
+            if position is not None:
+                return page_index, position
+
+        # While there is only one page, make it bigger before adding another.
+        while len(self._pages) <= 1 and self.page_size < self.max_page_size:
+            if not self._pages and self.page_size >= max(width, height):
+                break
+            self.page_size = min(self.page_size * 2, self.max_page_size)
+            for page in self._pages:
+                page.grow(self.page_size)
+            if self._pages:
+                position = self._pages[0].allocate(width, height)
+                if position is not None:
+                    return 0, position
+
+        page = _AtlasPage(self.page_size)
+        self._pages.append(page)
+        return len(self._pages) - 1, page.allocate(width, height)
+
+    def _image_data(self, image) -> np.ndarray:
+        """ Return an image as an RGBA array, padded with the border. """
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        data = np.asarray(image)
+        if self.border:
+            padded = np.zeros((data.shape[0] + self.border, data.shape[1] + self.border, 4), dtype=np.uint8)
+            padded[:data.shape[0], :data.shape[1]] = data
+            data = padded
+        return np.ascontiguousarray(data)
+
+    def _update_texture(self):
+        """ Create or resize the texture, and upload any pending images. """
+        if self._texture is None \
+                or self._texture_size != self.page_size \
+                or self._texture_layers < len(self._pages):
+
+            layers = max(1, self._texture_layers)
+            while layers < len(self._pages):
+                layers *= 2
+            layers = min(layers, _get_max_layers())
+            if layers < len(self._pages):
+                raise ValueError(f"Texture atlas needs {len(self._pages)} pages, "
+                                 f"but only {layers} are supported.")
+
+            self._texture = shader.texture_array((self.page_size, self.page_size), layers)
+            self._texture_size = self.page_size
+            self._texture_layers = layers
+
+            # Everything needs to go into the new texture
+            self._pending_uploads = list(self._images)
+
+        for region, image in self._pending_uploads:
+            self._texture.write(region.page, region.x, region.y, self._image_data(image))
+        self._pending_uploads.clear()
+
+    def use(self, texture_unit: int=0):
+        """
+        Bind the atlas texture to a texture unit, uploading new images first.
+        """
+        self._update_texture()
+        self._texture.use(texture_unit)
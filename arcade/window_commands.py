@@ -237,6 +237,8 @@ def finish_render():
     """
     global _window
 
+    from arcade.draw_commands import flush_draw_commands
+    flush_draw_commands()
     _window.flip()
 
 
@@ -264,12 +266,20 @@ def quick_run(time_to_pause: Number):
     close_window()
 
 
-def start_render():
+def start_render(batch: bool=False):
     """
     Get set up to render. Required to be called before drawing anything to the
     screen.
+
+    Args:
+        :batch: Collect the shapes drawn with the draw_* commands this frame \
+        and draw them with a few draw calls. Batching stays on until the \
+        next ``start_render``. See ``set_draw_command_batching``.
     """
     gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+    # Set batching every frame, so a batched frame doesn't leave it on
+    from arcade.draw_commands import set_draw_command_batching
+    set_draw_command_batching(batch)
     # gl.glMatrixMode(gl.GL_MODELVIEW)
     # gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
 
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+import arcade
+from arcade.broadphase import Broadphase, _get_bounds, _overlaps
+
+
+def make_broadphases():
+    return [arcade.SpatialHash(cell_size=32), arcade.LooseQuadtree(size=64), arcade.SweepAndPrune()]
+
+
+def make_sprite(rng):
+    sprite = arcade.Sprite(center_x=rng.uniform(-300, 300), center_y=rng.uniform(-300, 300))
+    # Mostly small sprites, with a few huge ones
+    size = rng.uniform(200, 400) if rng.random() < 0.05 else rng.uniform(2, 20)
+    sprite.width = size
+    sprite.height = size * rng.uniform(0.5, 2)
+    sprite.angle = rng.uniform(0, 360)
+    return sprite
+
+
+@pytest.mark.parametrize("broadphase", make_broadphases(), ids=lambda b: type(b).__name__)
+def test_queries_find_every_overlapping_sprite(broadphase):
+    rng = random.Random(5)
+    sprite_list = arcade.SpriteList(broadphase=broadphase)
+    sprites = [make_sprite(rng) for _ in range(200)]
+    for sprite in sprites:
+        sprite_list.append(sprite)
+
+    for step in range(10):
+        for sprite in sprites[step::4]:
+            sprite.center_x += rng.uniform(-30, 30)
+            sprite.center_y += rng.uniform(-30, 30)
+        if step % 3 == 0:
+            sprite_list.move(rng.uniform(-500, 500), 0)
+        sprite_list.remove(sprites.pop(rng.randrange(len(sprites))))
+
+        for _ in range(20):
+            query = make_sprite(rng)
+            bounds = _get_bounds(query)
+            expected = {sprite for sprite in sprites if _overlaps(bounds, _get_bounds(sprite))}
+            found = sprite_list.spatial_hash.get_objects_for_box(query)
+            assert len(found) == len(set(found))
+            assert expected <= set(found)
+            assert set(found) <= set(sprites)
+
+
+@pytest.mark.parametrize("broadphase", make_broadphases(), ids=lambda b: type(b).__name__)
+def test_collision_checks_with_broadphase(broadphase):
+    rng = random.Random(6)
+    sprite_list = arcade.SpriteList(broadphase=broadphase)
+    for _ in range(150):
+        sprite_list.append(make_sprite(rng))
+
+    for _ in range(30):
+        player = make_sprite(rng)
+        expected = {sprite for sprite in sprite_list if arcade.check_for_collision(player, sprite)}
+        assert set(arcade.check_for_collision_with_list(player, sprite_list)) == expected
+
+
+def test_sweep_and_prune_reports_readded_sprites_once():
+    rng = random.Random(7)
+    sprite_list = arcade.SpriteList(broadphase=arcade.SweepAndPrune())
+    sprites = [make_sprite(rng) for _ in range(30)]
+    for sprite in sprites:
+        sprite_list.append(sprite)
+    sprite_list.spatial_hash.get_objects_for_box(sprites[0])
+
+    # Removed and added back, then rebuilt, without a query in between
+    sprite_list.remove(sprites[0])
+    sprite_list.append(sprites[0])
+    sprite_list.move(5, 0)
+
+    found = sprite_list.spatial_hash.get_objects_for_box(sprites[0])
+    assert len(found) == len(set(found))
+    assert sprites[0] in found
+
+    # Covers every sprite
+    cover = arcade.Sprite(center_x=0, center_y=0)
+    cover.width = cover.height = 2000
+    others = arcade.SpriteList(use_spatial_hash=False)
+    others.append(cover)
+    pairs = arcade.check_for_collision_between_lists(others, sprite_list)
+    assert sorted(id(b) for a, b in pairs) == sorted(id(sprite) for sprite in sprites)
+
+
+def test_incomplete_broadphase_cannot_be_created():
+    class MissingQuery(Broadphase):
+        def _insert(self, new_object, bounds):
+            pass
+
+        def remove_object(self, sprite_to_delete):
+            pass
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError):
+        MissingQuery()
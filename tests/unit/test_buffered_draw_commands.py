@@ -21,6 +21,11 @@
     create_ellipse_filled,
     create_ellipse_outline,
     create_ellipse_filled_with_colors,
+    create_rectangle_batch,
+    create_line_batch,
+    create_rounded_rectangle_batch,
+    SDFShapes,
+    ShapeElementList,
 )
 
 
@@ -57,6 +62,21 @@ def test_create_line():
     np.testing.assert_array_equal(data, expected)
 
 
+def test_create_line_keeps_vertices_on_cpu():
+    line = create_line(
+        start_x=10, start_y=20, end_x=30, end_y=40,
+        color=(100, 110, 120), line_width=5
+    )
+    # Nothing is sent to the graphics card until the line is drawn
+    assert line._vbo is None
+    assert line._vao is None
+
+    expected = np.zeros(2, dtype=buffer_type)
+    expected["vertex"] = [10, 20], [30, 40]
+    expected["color"] = [100, 110, 120, 255], [100, 110, 120, 255]
+    np.testing.assert_array_equal(line.data, expected)
+
+
 def test_create_line_generic_with_colors():
     line = create_line_generic_with_colors(
         point_list=[(10, 20), (30, 40), (50, 60)],
@@ -161,12 +181,11 @@ def test_create_rectangle(mocker):
         center_x=200, center_y=200, width=50, height=50,
         color=(0, 255, 0), border_width=3, tilt_angle=0
     )
-    mock.assert_called_with(
-        [(175, 175), (175, 225), (225, 175), (225, 225)],
-        [(0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255)],
-        gl.GL_TRIANGLE_STRIP,
-        3
-    )
+    point_list, color_list, shape_mode, line_width = mock.call_args[0]
+    np.testing.assert_allclose(point_list, [(175, 175), (175, 225), (225, 175), (225, 225)])
+    assert color_list == [(0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255)]
+    assert shape_mode == gl.GL_TRIANGLE_STRIP
+    assert line_width == 3
 
 
 def test_create_rectangle_outline(mocker):
@@ -175,13 +194,12 @@ def test_create_rectangle_outline(mocker):
         center_x=200, center_y=200, width=50, height=50,
         color=(0, 255, 0), border_width=3, tilt_angle=0
     )
-    mock.assert_called_with(
-        [(175, 175), (175, 225), (225, 225), (225, 175), (175, 175)],
-        [(0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255),
-         (0, 255, 0, 255), (0, 255, 0, 255)],
-        gl.GL_LINE_STRIP,
-        3
-    )
+    point_list, color_list, shape_mode, line_width = mock.call_args[0]
+    np.testing.assert_allclose(point_list, [(175, 175), (175, 225), (225, 225), (225, 175), (175, 175)])
+    assert color_list == [(0, 255, 0, 255), (0, 255, 0, 255), (0, 255, 0, 255),
+                          (0, 255, 0, 255), (0, 255, 0, 255)]
+    assert shape_mode == gl.GL_LINE_STRIP
+    assert line_width == 3
 
 
 def test_create_rectangle_filled(mocker):
@@ -237,21 +255,22 @@ def test_create_ellipse(mocker):
         center_x=100, center_y=100, width=50, height=80,
         color=(200, 150, 100), num_segments=10
     )
-    mock.assert_called_with(
-        [(150.0, 100.0),
-         (140.45084688381107, 52.977173573474644),
-         (140.45085003374027, 147.022819489717),
-         (115.45084564139354, 23.915476576687922),
-         (115.4508507380858, 176.08452077368725),
-         (84.54914671356813, 23.915480551125484),
-         (84.54915181026028, 176.08452209849975),
-         (59.54914839129532, 52.97718397868734),
-         (59.54915154122427, 147.02282295812122),
-         (50.00000000000007, 100.00000428718346)],
-        (200, 150, 100),
-        gl.GL_TRIANGLE_STRIP,
-        1
-    )
+    point_list, color, shape_mode, line_width = mock.call_args[0]
+    np.testing.assert_allclose(point_list, [
+        (150.0, 100.0),
+        (140.45084688381107, 52.977173573474644),
+        (140.45085003374027, 147.022819489717),
+        (115.45084564139354, 23.915476576687922),
+        (115.4508507380858, 176.08452077368725),
+        (84.54914671356813, 23.915480551125484),
+        (84.54915181026028, 176.08452209849975),
+        (59.54914839129532, 52.97718397868734),
+        (59.54915154122427, 147.02282295812122),
+        (50.00000000000007, 100.00000428718346)
+    ], atol=1e-4)
+    assert color == (200, 150, 100)
+    assert shape_mode == gl.GL_TRIANGLE_STRIP
+    assert line_width == 1
 
 
 def test_create_ellipse_outline(mocker):
@@ -260,22 +279,23 @@ def test_create_ellipse_outline(mocker):
         center_x=100, center_y=100, width=50, height=80,
         color=(200, 150, 100), num_segments=10
     )
-    mock.assert_called_with(
-        [(150.0, 100.0),
-         (140.45085003374027, 147.022819489717),
-         (115.4508507380858, 176.08452077368725),
-         (84.54915181026028, 176.08452209849975),
-         (59.54915154122427, 147.02282295812122),
-         (50.00000000000007, 100.00000428718346),
-         (59.54914839129532, 52.97718397868734),
-         (84.54914671356813, 23.915480551125484),
-         (115.45084564139354, 23.915476576687922),
-         (140.45084688381107, 52.977173573474644),
-         (150.0, 100.0)],
-        (200, 150, 100),
-        gl.GL_LINE_STRIP,
-        1
-    )
+    point_list, color, shape_mode, line_width = mock.call_args[0]
+    np.testing.assert_allclose(point_list, [
+        (150.0, 100.0),
+        (140.45085003374027, 147.022819489717),
+        (115.4508507380858, 176.08452077368725),
+        (84.54915181026028, 176.08452209849975),
+        (59.54915154122427, 147.02282295812122),
+        (50.00000000000007, 100.00000428718346),
+        (59.54914839129532, 52.97718397868734),
+        (84.54914671356813, 23.915480551125484),
+        (115.45084564139354, 23.915476576687922),
+        (140.45084688381107, 52.977173573474644),
+        (150.0, 100.0)
+    ], atol=1e-4)
+    assert color == (200, 150, 100)
+    assert shape_mode == gl.GL_LINE_STRIP
+    assert line_width == 1
 
 
 def test_create_ellipse_filled(mocker):
@@ -287,7 +307,7 @@ def test_create_ellipse_filled(mocker):
     num_segments = 128
     mock.assert_called_with(
         100, 100, 50, 80, (200, 150, 100),
-        border_width, tilt_angle, num_segments, filled=True
+        border_width, tilt_angle, num_segments, filled=True, sdf=False
     )
 
 
@@ -299,19 +319,77 @@ def test_create_ellipse_filled_with_colors(mocker):
         outside_color=(200, 150, 100), inside_color=(0, 50, 100),
         num_segments=num_segments
     )
-    mock.assert_called_with(
-        [(100, 100),
-         (150.0, 100.0),
-         (140.45085003374027, 147.022819489717),
-         (115.4508507380858, 176.08452077368725),
-         (84.54915181026028, 176.08452209849975),
-         (59.54915154122427, 147.02282295812122),
-         (50.00000000000007, 100.00000428718346),
-         (59.54914839129532, 52.97718397868734),
-         (84.54914671356813, 23.915480551125484),
-         (115.45084564139354, 23.915476576687922),
-         (140.45084688381107, 52.977173573474644),
-         (150.0, 100.0)],
-        [(0, 50, 100)] + [(200, 150, 100)] * (num_segments + 1),
-        gl.GL_TRIANGLE_FAN
-    )
+    point_list, color_list, shape_mode = mock.call_args[0]
+    np.testing.assert_allclose(point_list, [
+        (100, 100),
+        (150.0, 100.0),
+        (140.45085003374027, 147.022819489717),
+        (115.4508507380858, 176.08452077368725),
+        (84.54915181026028, 176.08452209849975),
+        (59.54915154122427, 147.02282295812122),
+        (50.00000000000007, 100.00000428718346),
+        (59.54914839129532, 52.97718397868734),
+        (84.54914671356813, 23.915480551125484),
+        (115.45084564139354, 23.915476576687922),
+        (140.45084688381107, 52.977173573474644),
+        (150.0, 100.0)
+    ], atol=1e-4)
+    assert color_list == [(0, 50, 100)] + [(200, 150, 100)] * (num_segments + 1)
+    assert shape_mode == gl.GL_TRIANGLE_FAN
+
+
+def test_create_rectangle_batch():
+    rects = create_rectangle_batch([(10, 20), (30, 40)], [(4, 6), (8, 10)], (255, 0, 0))
+
+    assert len(rects) == 2
+    assert rects.mode == gl.GL_TRIANGLE_STRIP
+    np.testing.assert_allclose(rects.instance_data['center'], [(10, 20), (30, 40)])
+    np.testing.assert_allclose(rects.instance_data['size'], [(4, 6), (8, 10)])
+    assert rects.instance_data['color'].tolist() == [[255, 0, 0, 255]] * 2
+
+    rects.update(1, center=(50, 60), color=(1, 2, 3, 4))
+    np.testing.assert_allclose(rects.instance_data['center'][1], (50, 60))
+    assert rects.instance_data['color'][1].tolist() == [1, 2, 3, 4]
+    assert rects.instance_data['color'][0].tolist() == [255, 0, 0, 255]
+
+
+def test_create_line_batch():
+    lines = create_line_batch([(0, 0), (10, 10)], [(3, 4), (10, 12)],
+                              [(1, 2, 3), (4, 5, 6)], line_width=2)
+
+    np.testing.assert_allclose(lines.instance_data['center'], [(0, 0), (10, 10)])
+    np.testing.assert_allclose(lines.instance_data['size'], [(5, 2), (2, 2)])
+    np.testing.assert_allclose(lines.instance_data['angle'], [53.130102, 90], atol=1e-4)
+    assert lines.instance_data['color'].tolist() == [[1, 2, 3, 255], [4, 5, 6, 255]]
+
+
+def test_create_rounded_rectangle_batch():
+    rects = create_rounded_rectangle_batch([(10, 20), (30, 40)], [(4, 6), (8, 10)], 2,
+                                           (1, 2, 3), border_width=[0, 3])
+
+    assert rects.mode == gl.GL_TRIANGLE_STRIP
+    np.testing.assert_allclose(rects.instance_data['size'], [(2, 3), (4, 5)])
+    np.testing.assert_allclose(rects.instance_data['corner_radius'], [2, 2])
+    np.testing.assert_allclose(rects.instance_data['border_width'], [0, 3])
+
+    rects.update(0, border_width=1, corner_radius=0.5)
+    np.testing.assert_allclose(rects.instance_data['border_width'], [1, 3])
+    np.testing.assert_allclose(rects.instance_data['corner_radius'], [0.5, 2])
+
+
+def test_create_ellipse_as_sdf_shape():
+    filled = create_ellipse_filled(10, 20, 30, 40, (1, 2, 3), tilt_angle=15, sdf=True)
+    outline = create_ellipse_outline(10, 20, 30, 40, (1, 2, 3), border_width=3, sdf=True)
+
+    assert isinstance(filled, SDFShapes) and len(filled) == 1
+    np.testing.assert_allclose(filled.instance_data['center'], [(10, 20)])
+    np.testing.assert_allclose(filled.instance_data['size'], [(30, 40)])
+    np.testing.assert_allclose(filled.instance_data['angle'], [15])
+    np.testing.assert_allclose(filled.instance_data['border_width'], [0])
+    np.testing.assert_allclose(outline.instance_data['border_width'], [3])
+    assert filled.instance_data['color'].tolist() == [[1, 2, 3, 255]]
+
+    # A list without any OpenGL objects, which the check comes before
+    shape_list = ShapeElementList.__new__(ShapeElementList)
+    with pytest.raises(TypeError):
+        shape_list.append(filled)
@@ -2,3 +2,168 @@ def test_rotate_point(mock_window):
     from arcade import rotate_point
     x, y = rotate_point(1, 1, 0, 0, 90)
     assert (-1.0, 1.0) == (x, y)
+
+
+def test_batches_are_drawn_with_the_projection_they_were_added_with(monkeypatch):
+    import numpy as np
+    import pyglet.gl as gl
+    from arcade import draw_commands
+
+    # A renderer without any OpenGL objects, recording what it draws
+    renderer = draw_commands._LineRenderer.__new__(draw_commands._LineRenderer)
+    renderer.batching = True
+    renderer.batches = {}
+    renderer.batch_projection = None
+    rendered = []
+    monkeypatch.setattr(renderer, '_render',
+                        lambda data, mode, line_width, projection=None: rendered.append(projection))
+    monkeypatch.setattr(renderer, '_render_sdf',
+                        lambda instances, projection=None: rendered.append(projection))
+
+    old_projection = np.eye(4)
+    new_projection = np.eye(4) * 2
+    line = np.zeros(2, dtype=draw_commands._line_vertex_type)
+    monkeypatch.setattr(draw_commands, 'get_projection', lambda: old_projection)
+    renderer.draw(line, gl.GL_LINES, 1)
+    renderer.draw_sdf(np.zeros(1))
+
+    # The viewport changes, then something else forces the batch out
+    monkeypatch.setattr(draw_commands, 'get_projection', lambda: new_projection)
+    renderer.flush()
+    assert len(rendered) == 2
+    assert all(projection is old_projection for projection in rendered)
+
+    # Shapes added after the change are drawn with the new projection
+    renderer.draw(line, gl.GL_LINES, 1)
+    renderer.flush()
+    assert rendered[-1] is new_projection
+
+
+def test_start_render_turns_batching_off_again(monkeypatch):
+    import pyglet.gl as gl
+    from arcade import draw_commands, window_commands
+
+    # A renderer without any OpenGL objects for the current context
+    renderer = draw_commands._LineRenderer.__new__(draw_commands._LineRenderer)
+    renderer.context = gl.current_context
+    renderer.batching = False
+    renderer.batches = {}
+    monkeypatch.setattr(draw_commands, '_line_renderer', renderer)
+    monkeypatch.setattr(window_commands.gl, 'glClear', lambda mask: None)
+
+    window_commands.start_render(batch=True)
+    assert draw_commands._get_line_renderer().batching
+
+    window_commands.start_render()
+    assert not draw_commands._get_line_renderer().batching
+
+
+def test_line_renderer_releases_its_programs(monkeypatch):
+    import gc
+    from arcade import draw_commands, shader
+
+    released = []
+    monkeypatch.setattr(shader, 'get_program', lambda vertex_shader, fragment_shader: object())
+    monkeypatch.setattr(shader, 'release_program', released.append)
+    monkeypatch.setattr(draw_commands._LineRenderer, '_create_buffer', lambda self, size: None)
+
+    renderer = draw_commands._LineRenderer()
+    program = renderer.program
+    del renderer
+    gc.collect()
+    assert released == [program]
+
+
+class RecordingRenderer:
+    """ Records what the draw commands send to the renderer. """
+
+    def __init__(self):
+        self.drawn = []
+        self.sdf_drawn = []
+
+    def draw(self, data, mode, line_width):
+        self.drawn.append((mode, line_width))
+
+    def draw_sdf(self, data):
+        self.sdf_drawn.append(data)
+
+
+def test_ellipses_are_drawn_as_sdf_shapes(monkeypatch):
+    import arcade
+    import pyglet.gl as gl
+    from arcade import draw_commands
+
+    renderer = RecordingRenderer()
+    monkeypatch.setattr(draw_commands, '_get_line_renderer', lambda: renderer)
+    monkeypatch.setattr(draw_commands, '_use_sdf_shapes', False)
+
+    # Off by default, unless asked for in the call
+    arcade.draw_ellipse_filled(10, 20, 30, 40, (1, 2, 3), tilt_angle=15)
+    arcade.draw_circle_outline(10, 20, 5, (1, 2, 3), 2, sdf=True)
+    assert renderer.drawn == [(gl.GL_TRIANGLE_FAN, 1)]
+    assert len(renderer.sdf_drawn) == 1
+    outline = renderer.sdf_drawn[0]
+    assert outline['size'].tolist() == [[5, 5]]
+    assert outline['border_width'].tolist() == [2]
+    assert outline['kind'].tolist() == [draw_commands._SDF_ELLIPSE]
+
+    arcade.set_sdf_shapes(True)
+    arcade.draw_ellipse_filled(10, 20, 30, 40, (1, 2, 3, 4), tilt_angle=15)
+    arcade.draw_ellipse_outline(10, 20, 30, 40, (1, 2, 3), 3)
+    arcade.draw_circle_filled(10, 20, 5, (1, 2, 3), sdf=False)
+    assert renderer.drawn == [(gl.GL_TRIANGLE_FAN, 1)] * 2
+    filled, outline = renderer.sdf_drawn[1:]
+    assert filled['center'].tolist() == [[10, 20]]
+    assert filled['size'].tolist() == [[30, 40]]
+    assert filled['angle'].tolist() == [15]
+    assert filled['border_width'].tolist() == [0]
+    assert filled['color'].tolist() == [[1, 2, 3, 4]]
+    assert outline['border_width'].tolist() == [3]
+
+
+def test_strips_and_fans_become_separate_triangles():
+    import pyglet.gl as gl
+    from arcade.draw_commands import _triangle_indexes
+
+    assert _triangle_indexes(5, gl.GL_TRIANGLE_STRIP).tolist() == [0, 1, 2, 1, 2, 3, 2, 3, 4]
+    assert _triangle_indexes(5, gl.GL_TRIANGLE_FAN).tolist() == [0, 1, 2, 0, 2, 3, 0, 3, 4]
+    assert _triangle_indexes(5, gl.GL_POLYGON).tolist() == [0, 1, 2, 0, 2, 3, 0, 3, 4]
+    for count in range(3):
+        assert _triangle_indexes(count, gl.GL_TRIANGLE_FAN).tolist() == []
+
+
+def test_strips_and_loops_become_separate_lines():
+    import pyglet.gl as gl
+    from arcade.draw_commands import _line_indexes
+
+    assert _line_indexes(4, gl.GL_LINE_STRIP).tolist() == [0, 1, 1, 2, 2, 3]
+    assert _line_indexes(4, gl.GL_LINE_LOOP).tolist() == [0, 1, 1, 2, 2, 3, 3, 0]
+    assert _line_indexes(2, gl.GL_LINE_LOOP).tolist() == [0, 1, 1, 0]
+    for count in range(2):
+        assert _line_indexes(count, gl.GL_LINE_STRIP).tolist() == []
+        assert _line_indexes(count, gl.GL_LINE_LOOP).tolist() == []
+
+
+def test_batching_skips_empty_shapes(monkeypatch):
+    import numpy as np
+    import pyglet.gl as gl
+    from arcade import draw_commands
+
+    renderer = draw_commands._LineRenderer.__new__(draw_commands._LineRenderer)
+    renderer.batching = True
+    renderer.batches = {}
+    renderer.batch_projection = None
+    rendered = []
+    monkeypatch.setattr(renderer, '_render',
+                        lambda data, mode, line_width, projection=None: rendered.append(len(data)))
+    monkeypatch.setattr(draw_commands, 'get_projection', lambda: np.eye(4))
+
+    empty = np.zeros(0, dtype=draw_commands._line_vertex_type)
+    renderer.draw(empty, gl.GL_LINE_LOOP, 1)
+    renderer.draw(np.zeros(1, dtype=draw_commands._line_vertex_type), gl.GL_LINE_LOOP, 1)
+    renderer.draw(np.zeros(2, dtype=draw_commands._line_vertex_type), gl.GL_TRIANGLE_FAN, 1)
+    assert renderer.batches == {}
+
+    renderer.batching = False
+    renderer.draw(empty, gl.GL_LINE_LOOP, 1)
+    assert rendered == []
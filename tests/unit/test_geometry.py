@@ -0,0 +1,265 @@
+import random
+
+import numpy as np
+import pytest
+
+import arcade
+
+
+def make_sprite(x, y, width=10, height=10, angle=0):
+    sprite = arcade.Sprite(center_x=x, center_y=y)
+    sprite.width = width
+    sprite.height = height
+    sprite.angle = angle
+    return sprite
+
+
+def make_sprites(count, seed):
+    rng = random.Random(seed)
+    sprites = []
+    for i in range(count):
+        sprite = make_sprite(rng.uniform(0, 300), rng.uniform(0, 300),
+                             rng.uniform(5, 30), rng.uniform(5, 30), rng.uniform(0, 360))
+        if i % 5 == 0:
+            sprite.set_points([(-8, -4), (10, -2), (2, 12)])
+        sprites.append(sprite)
+    return sprites
+
+
+def test_check_for_collision_with_list_matches_pairwise_checks():
+    for use_spatial_hash in (True, False):
+        sprite_list = arcade.SpriteList(use_spatial_hash=use_spatial_hash, spatial_hash_cell_size=32)
+        for sprite in make_sprites(150, 1):
+            sprite_list.append(sprite)
+
+        for player in make_sprites(40, 2) + sprite_list[:10]:
+            expected = [sprite for sprite in sprite_list
+                        if sprite is not player and arcade.check_for_collision(player, sprite)]
+            result = arcade.check_for_collision_with_list(player, sprite_list)
+            assert set(result) == set(expected)
+
+
+def test_get_collision_indices():
+    sprite_list = arcade.SpriteList()
+    for x in (15, 100, 0, 5):
+        sprite_list.append(make_sprite(x, 0))
+    player = make_sprite(0, 0)
+
+    assert arcade.get_collision_indices(player, sprite_list).tolist() == [2, 3]
+
+
+def test_check_for_collision_between_lists_matches_pairwise_checks():
+    for use_hash_a, use_hash_b in ((True, True), (True, False), (False, True), (False, False)):
+        list_a = arcade.SpriteList(use_spatial_hash=use_hash_a, spatial_hash_cell_size=32)
+        list_b = arcade.SpriteList(use_spatial_hash=use_hash_b, spatial_hash_cell_size=32)
+        for sprite in make_sprites(60, 3):
+            list_a.append(sprite)
+        for sprite in make_sprites(90, 4):
+            list_b.append(sprite)
+
+        expected = {(a, b) for a in list_a for b in list_b if arcade.check_for_collision(a, b)}
+        result = arcade.check_for_collision_between_lists(list_a, list_b)
+        assert len(result) == len(expected)
+        assert set(result) == expected
+
+
+def test_are_polygons_intersecting_batch_matches_single_checks():
+    rng = random.Random(5)
+
+    def make_polygon():
+        x, y = rng.uniform(0, 50), rng.uniform(0, 50)
+        return [(x + rng.randint(-10, 10), y + rng.randint(-10, 10)) for _ in range(rng.randint(3, 6))]
+
+    polygons = [make_polygon() for _ in range(300)]
+    for _ in range(20):
+        polygon = make_polygon()
+        expected = [arcade.are_polygons_intersecting(polygon, other) for other in polygons]
+        assert arcade.are_polygons_intersecting_batch(polygon, polygons).tolist() == expected
+
+
+def test_sprite_bounds_follow_changes():
+    sprite = make_sprite(0, 0, 10, 20)
+    assert (sprite.left, sprite.bottom, sprite.right, sprite.top) == (-5, -10, 5, 10)
+
+    sprite.angle = 90
+    assert sprite.get_bounds() == (-10, -5, 10, 5)
+
+    # Moved by its sprite list, without going through the properties
+    sprite_list = arcade.SpriteList()
+    sprite_list.append(sprite)
+    sprite_list.move(100, 0)
+    assert sprite.get_bounds() == (90, -5, 110, 5)
+    points, axes = sprite.get_polygon()
+    assert points.tolist() == [list(point) for point in sprite.points]
+    assert len(axes) == 4
+
+    sprite.set_points([(-8, -4), (10, -2), (2, 12)])
+    assert sprite.get_bounds() == (92, -4, 110, 12)
+
+
+def test_frozen_list_collisions_match_pairwise_checks():
+    walls = arcade.SpriteList()
+    for sprite in make_sprites(200, 6):
+        walls.append(sprite)
+    walls.freeze(cell_size=32)
+    assert walls.is_frozen
+
+    for player in make_sprites(40, 7) + walls[:5]:
+        expected = {wall for wall in walls if wall is not player and arcade.check_for_collision(player, wall)}
+        assert set(arcade.check_for_collision_with_list(player, walls)) == expected
+
+    others = arcade.SpriteList(use_spatial_hash=False)
+    for sprite in make_sprites(50, 8):
+        others.append(sprite)
+    expected = {(a, b) for a in others for b in walls if arcade.check_for_collision(a, b)}
+    assert set(arcade.check_for_collision_between_lists(others, walls)) == expected
+    assert set(arcade.check_for_collision_between_lists(walls, others)) == {(b, a) for a, b in expected}
+
+
+def test_frozen_list_cannot_change():
+    walls = arcade.SpriteList()
+    wall = make_sprite(0, 0)
+    walls.append(wall)
+    walls.freeze()
+
+    with pytest.raises(arcade.FrozenSpriteListException):
+        walls.append(make_sprite(50, 0))
+    with pytest.raises(arcade.FrozenSpriteListException):
+        walls.remove(wall)
+    with pytest.raises(arcade.FrozenSpriteListException):
+        walls.move(5, 0)
+    with pytest.raises(arcade.FrozenSpriteListException):
+        wall.center_x = 10
+    with pytest.raises(arcade.FrozenSpriteListException):
+        wall.velocity = (1, 0)
+    assert wall.center_x == 0 and wall.velocity == (0, 0)
+    assert wall.collision_radius == 10
+
+    walls.unfreeze()
+    wall.center_x = 10
+    walls.move(5, 0)
+    player = make_sprite(15, 0)
+    assert arcade.check_for_collision_with_list(player, walls) == [wall]
+
+
+def test_sprite_shared_with_a_frozen_list_cannot_change():
+    owner = arcade.SpriteList()
+    walls = arcade.SpriteList()
+    wall = make_sprite(0, 0)
+    owner.append(wall)
+    walls.append(wall)
+    walls.freeze()
+
+    # The sprite keeps its state in the unfrozen list, which must not change either
+    with pytest.raises(arcade.FrozenSpriteListException):
+        wall.center_x = 10
+    with pytest.raises(arcade.FrozenSpriteListException):
+        owner.move(10, 0)
+    assert wall.center_x == 0
+    assert arcade.check_for_collision_with_list(make_sprite(0, 0), walls) == [wall]
+
+
+def test_rect_and_point_queries_match_pairwise_checks():
+    rng = random.Random(9)
+    for use_spatial_hash, frozen in ((True, False), (False, False), (True, True)):
+        sprite_list = arcade.SpriteList(use_spatial_hash=use_spatial_hash, spatial_hash_cell_size=32)
+        for sprite in make_sprites(150, 10):
+            sprite_list.append(sprite)
+        if frozen:
+            sprite_list.freeze()
+
+        for _ in range(30):
+            left, bottom = rng.uniform(0, 300), rng.uniform(0, 300)
+            right, top = left + rng.uniform(0, 40), bottom + rng.uniform(0, 40)
+            rect = make_sprite((left + right) / 2, (bottom + top) / 2, right - left, top - bottom)
+            expected = [sprite for sprite in sprite_list if arcade.check_for_collision(rect, sprite)]
+            assert sprite_list.query_rect(left, right, bottom, top) == expected
+
+            x, y = rng.uniform(0, 300), rng.uniform(0, 300)
+            expected = [sprite for sprite in sprite_list
+                        if arcade.are_polygons_intersecting([(x - 0.001, y - 0.001), (x + 0.001, y - 0.001),
+                                                             (x + 0.001, y + 0.001), (x - 0.001, y + 0.001)],
+                                                            sprite.points)]
+            assert sprite_list.sprites_at_point(x, y) == expected
+
+
+def test_collision_check_with_offset_does_not_move_the_sprite():
+    sprite_list = arcade.SpriteList(spatial_hash_cell_size=32)
+    for sprite in make_sprites(150, 11):
+        sprite_list.append(sprite)
+    player_list = arcade.SpriteList()
+    players = make_sprites(30, 12)
+    for player in players:
+        player_list.append(player)
+
+    positions = [player.position for player in players]
+    radii = [player._collision_radius for player in players]
+    results = [arcade.check_for_collision_with_list(player, sprite_list, offset=(7, -3)) for player in players]
+    assert [player.position for player in players] == positions
+    assert [player._collision_radius for player in players] == radii
+    assert not player_list._moved_sprites
+
+    for player, result in zip(players, results):
+        player.center_x += 7
+        player.center_y -= 3
+        assert result == arcade.check_for_collision_with_list(player, sprite_list)
+
+
+def test_cast_ray_finds_the_first_sprite_hit():
+    rng = random.Random(13)
+    lists = [arcade.SpriteList(spatial_hash_cell_size=32), arcade.SpriteList(use_spatial_hash=False),
+             arcade.SpriteList(spatial_hash_cell_size=32), arcade.SpriteList(broadphase=arcade.LooseQuadtree())]
+    for sprite_list in lists:
+        for sprite in make_sprites(60, 14):
+            sprite_list.append(sprite)
+    lists[2].freeze()
+
+    starts = [(rng.uniform(-50, 350), rng.uniform(-50, 350)) for _ in range(40)]
+    ends = [(rng.uniform(-50, 350), rng.uniform(-50, 350)) for _ in range(40)]
+    for sprite_list in lists:
+        for start, end in zip(starts, ends):
+            hit = arcade.cast_ray(start, end, sprite_list)
+            hit_by_line = [sprite for sprite in sprite_list
+                           if arcade.are_polygons_intersecting((start, end), sprite.points)]
+            assert arcade.has_line_of_sight(start, end, sprite_list) == (hit is None)
+            if hit is None:
+                assert hit_by_line == []
+                continue
+
+            # Nothing is hit a little before the hit point, and the sprite is hit a little after
+            length = ((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2) ** 0.5
+            assert hit.sprite in hit_by_line
+            assert abs(hit.distance - ((hit.x - start[0]) ** 2 + (hit.y - start[1]) ** 2) ** 0.5) < 1e-6
+            if hit.distance > 0.02:
+                before = (start[0] + (end[0] - start[0]) * (hit.distance - 0.01) / length,
+                          start[1] + (end[1] - start[1]) * (hit.distance - 0.01) / length)
+                assert not any(arcade.are_polygons_intersecting((start, before), sprite.points)
+                               for sprite in sprite_list)
+            if hit.distance < length - 0.02:
+                after = (start[0] + (end[0] - start[0]) * (hit.distance + 0.01) / length,
+                         start[1] + (end[1] - start[1]) * (hit.distance + 0.01) / length)
+                assert arcade.are_polygons_intersecting((start, after), hit.sprite.points)
+
+        indexes, distances = arcade.cast_rays(np.array(starts), np.array(ends), sprite_list)
+        for start, end, index, distance in zip(starts, ends, indexes, distances):
+            hit = arcade.cast_ray(start, end, sprite_list)
+            if hit is None:
+                assert index == -1 and distance == np.inf
+            else:
+                assert sprite_list[index] is hit.sprite
+                assert abs(distance - hit.distance) < 1e-9
+
+
+def test_indexes_skip_deferred_removals():
+    sprite_list = arcade.SpriteList(defer_removals=True)
+    for x in (0, 100, 200, 300):
+        sprite_list.append(make_sprite(x, 0))
+    target = sprite_list[3]
+    sprite_list.remove(sprite_list[1])
+
+    indexes = arcade.get_collision_indices(make_sprite(300, 0), sprite_list)
+    assert [sprite_list[i] for i in indexes] == [target]
+    indexes, distances = arcade.cast_rays([(250, 0), (50, 0)], [(350, 0), (150, 0)], sprite_list)
+    assert indexes.tolist() == [2, -1]
+    assert sprite_list[int(indexes[0])] is target
+    assert len(sprite_list._pending_removals) == 1
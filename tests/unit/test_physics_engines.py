@@ -0,0 +1,237 @@
+import pytest
+
+import arcade
+
+
+def make_sprite(x, y, width, height):
+    sprite = arcade.Sprite(center_x=x, center_y=y)
+    sprite.width = width
+    sprite.height = height
+    return sprite
+
+
+def make_walls(*walls):
+    wall_list = arcade.SpriteList()
+    for wall in walls:
+        wall_list.append(wall)
+    return wall_list
+
+
+def test_simple_engine_stops_at_walls():
+    wall = make_sprite(100, 0, 20, 200)
+    player = make_sprite(0, 0, 20, 20)
+    player.change_x = 7
+    player.change_y = 1
+    engine = arcade.PhysicsEngineSimple(player, make_walls(wall))
+
+    for _ in range(30):
+        engine.update()
+    assert wall.left - 0.05 < player.right <= wall.left
+    assert player.center_y == 30
+
+
+def test_fast_sprites_do_not_pass_through_walls():
+    wall = make_sprite(100, 0, 4, 200)
+    player = make_sprite(0, 0, 20, 20)
+    player.change_x = 150
+    engine = arcade.PhysicsEngineSimple(player, make_walls(wall))
+
+    engine.update()
+    assert player.right <= wall.left
+
+
+def test_platformer_lands_on_the_floor():
+    floor = make_sprite(0, -10, 400, 20)
+    player = make_sprite(0, 100, 20, 40)
+    engine = arcade.PhysicsEnginePlatformer(player, make_walls(floor), gravity_constant=1)
+
+    assert not engine.can_jump()
+    for _ in range(30):
+        engine.update()
+    assert 0 <= player.bottom < 0.05
+    assert player.change_y == 0
+    assert engine.can_jump()
+
+
+def test_platformer_runs_up_ramps_and_stops_at_walls():
+    floor = make_sprite(0, -10, 1000, 20)
+    # 45 degree ramp going up to the right, from x = 100 to 200
+    ramp = make_sprite(150, 50, 100, 100)
+    ramp.set_points([(-50, -50), (50, -50), (50, 50)])
+    wall = make_sprite(300, 100, 20, 200)
+    platforms = make_walls(floor, ramp, wall)
+    player = make_sprite(0, 20, 20, 40)
+    player.change_x = 4
+    engine = arcade.PhysicsEnginePlatformer(player, platforms)
+
+    for _ in range(40):
+        engine.update()
+    # Halfway up the ramp
+    assert 150 < player.center_x < 200
+    assert abs(player.bottom - (player.right - 100)) < 1
+
+    # Off the top of the ramp, back down to the floor, and into the wall
+    for _ in range(100):
+        engine.update()
+    assert wall.left - 0.05 < player.right <= wall.left
+    assert 0 <= player.bottom < 0.05
+
+
+def test_multi_body_engine_matches_single_body_engines():
+    floor = make_sprite(0, -10, 2000, 20)
+    wall = make_sprite(500, 100, 20, 200)
+    walls = make_walls(floor, wall)
+
+    bodies = arcade.SpriteList()
+    players = []
+    for i in range(10):
+        body = make_sprite(i * 40, 50 + i * 10, 20, 30)
+        body.change_x = 3 + i
+        bodies.append(body)
+        player = make_sprite(i * 40, 50 + i * 10, 20, 30)
+        player.change_x = 3 + i
+        players.append(player)
+    engine = arcade.PhysicsEngineMultiBody(bodies, walls, gravity_constant=1)
+    # Platformer engines without the ramp climbing, as the floor is flat
+    single_engines = [arcade.PhysicsEnginePlatformer(player, walls, gravity_constant=1) for player in players]
+
+    for _ in range(60):
+        engine.update()
+        for single_engine in single_engines:
+            single_engine.update()
+
+    for body, player in zip(bodies, players):
+        assert abs(body.center_x - player.center_x) < 0.05
+        assert abs(body.center_y - player.center_y) < 0.05
+        assert 0 <= body.bottom < 0.05
+        assert body.right <= wall.left
+
+
+def test_multi_body_engine_pushes_bodies_apart():
+    walls = make_walls(make_sprite(0, -10, 2000, 20))
+    bodies = arcade.SpriteList()
+    left = make_sprite(0, 10, 20, 20)
+    left.change_x = 5
+    right = make_sprite(100, 10, 20, 20)
+    right.change_x = -5
+    bodies.append(left)
+    bodies.append(right)
+    engine = arcade.PhysicsEngineMultiBody(bodies, walls, collide_bodies=True)
+
+    for _ in range(30):
+        engine.update()
+    assert left.right <= right.left
+    assert abs(left.center_x + right.center_x - 100) < 0.05
+    assert arcade.check_for_collision_between_lists(bodies, walls) == []
+
+
+def test_only_moving_platforms_are_tracked():
+    tiles = [make_sprite(x, -10, 20, 20) for x in range(0, 400, 20)]
+    platform = make_sprite(100, 50, 60, 10)
+    platforms = make_walls(*tiles, platform)
+    assert platforms.get_kinematic_indexes().tolist() == []
+
+    platform.change_x = 2
+    tiles[3].change_y = 1
+    assert platforms.get_kinematic_indexes().tolist() == [3, len(tiles)]
+
+    tiles[3].change_y = 0
+    platforms.remove(platform)
+    assert platforms.get_kinematic_indexes().tolist() == []
+
+
+def test_platformer_bounces_moving_platforms():
+    floor = make_sprite(0, -10, 1000, 20)
+    sideways = make_sprite(100, 100, 60, 10)
+    sideways.change_x = 3
+    sideways.boundary_left = 50
+    sideways.boundary_right = 200
+    lift = make_sprite(-200, 100, 60, 10)
+    lift.change_y = -4
+    lift.boundary_bottom = 60
+    lift.boundary_top = 150
+    player = make_sprite(400, 20, 20, 40)
+    engine = arcade.PhysicsEnginePlatformer(player, make_walls(floor, sideways, lift))
+
+    lefts = []
+    bottoms = []
+    for _ in range(100):
+        engine.update()
+        lefts.append(sideways.left)
+        bottoms.append(lift.bottom)
+    assert min(lefts) == 50 and max(lefts) == 140
+    assert min(bottoms) == 60 and max(bottoms) == 140
+    assert floor.center_x == 0 and floor.center_y == -10
+
+
+def test_platforms_started_through_velocity_are_tracked():
+    platforms = make_walls(make_sprite(0, -10, 400, 20))
+    platform = make_sprite(100, 50, 60, 10)
+    platforms.append(platform)
+
+    platform.velocity = (2, 0)
+    assert platform.velocity == [2.0, 0.0]
+    assert platforms.get_kinematic_indexes().tolist() == [1]
+    engine = arcade.PhysicsEnginePlatformer(make_sprite(-150, 20, 20, 40), platforms)
+    engine.update()
+    assert platform.center_x == 102
+
+    # Changing one item of the velocity, like a list, is seen too
+    velocity = platform.velocity
+    velocity[0] = 0
+    assert platforms.get_kinematic_indexes().tolist() == []
+    velocity[1] += 3
+    assert platform.change_y == 3 and list(velocity) == [0, 3]
+    assert platforms.get_kinematic_indexes().tolist() == [1]
+
+
+def test_platforms_started_through_the_state_array_are_tracked():
+    from arcade.sprite import _CHANGE_X, _CHANGE_Y
+    platforms = make_walls(make_sprite(0, -10, 400, 20), make_sprite(100, 50, 60, 10),
+                           make_sprite(300, 50, 60, 10))
+    platforms.defer_removals = True
+
+    # Start every platform but the floor in one bulk write
+    platforms._sprite_state[1:3, _CHANGE_X:_CHANGE_Y + 1] = (2, 0)
+    platforms.update_velocities()
+    assert platforms.get_kinematic_indexes().tolist() == [1, 2]
+
+    platforms.remove(platforms[2])
+    assert platforms.get_kinematic_indexes().tolist() == [1]
+    engine = arcade.PhysicsEnginePlatformer(make_sprite(-150, 20, 20, 40), platforms)
+    engine.update()
+    assert platforms[1].center_x == 102
+
+
+def test_moving_platforms_keep_their_index_through_swap_removal():
+    floor = make_sprite(0, -10, 400, 20)
+    wall = make_sprite(300, 20, 20, 40)
+    platform = make_sprite(100, 50, 60, 10)
+    platforms = make_walls(floor, wall, platform)
+    platform.change_x = 2
+    assert platforms.get_kinematic_indexes().tolist() == [2]
+
+    # The platform is moved into the removed floor's slot
+    platforms.remove(floor)
+    assert platforms.sprite_idx[platform] == 0
+    assert platforms.get_kinematic_indexes().tolist() == [0]
+
+    platform.velocity = (0, 0)
+    assert platforms.get_kinematic_indexes().tolist() == []
+
+
+def test_lists_with_moving_platforms_cannot_be_frozen():
+    tile = make_sprite(0, -10, 400, 20)
+    platform = make_sprite(100, 50, 60, 10)
+    platforms = make_walls(tile, platform)
+    platform.change_x = 2
+    with pytest.raises(ValueError):
+        platforms.freeze()
+    assert not platforms.is_frozen
+
+    # Moving platforms kept apart from the frozen tiles still move
+    platforms.remove(platform)
+    platforms.freeze()
+    engine = arcade.PhysicsEnginePlatformer(make_sprite(-150, 20, 20, 40), make_walls(platform))
+    engine.update()
+    assert platform.center_x == 102
@@ -0,0 +1,76 @@
+import pytest
+
+from arcade import shader
+
+
+class FakeProgram:
+    created = 0
+
+    def __init__(self, vertex_shader, fragment_shader):
+        FakeProgram.created += 1
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeContext:
+    pass
+
+
+def test_get_program_shares_programs(monkeypatch):
+    monkeypatch.setattr(shader, 'program', FakeProgram)
+    monkeypatch.setattr(shader.gl, 'current_context', FakeContext())
+    FakeProgram.created = 0
+
+    first = shader.get_program("vertex a", "fragment")
+    second = shader.get_program("vertex a", "fragment")
+    other = shader.get_program("vertex b", "fragment")
+
+    assert first is second
+    assert other is not first
+    assert FakeProgram.created == 2
+
+    shader.release_program(other)
+    shader.release_program(first)
+    shader.release_program(second)
+
+
+def test_release_program_deletes_when_unused(monkeypatch):
+    monkeypatch.setattr(shader, 'program', FakeProgram)
+    monkeypatch.setattr(shader.gl, 'current_context', FakeContext())
+
+    first = shader.get_program("vertex c", "fragment")
+    shader.get_program("vertex c", "fragment")
+
+    shader.release_program(first)
+    assert not first.released
+    shader.release_program(first)
+    assert first.released
+
+    # Asking again compiles a new program
+    assert shader.get_program("vertex c", "fragment") is not first
+
+
+def test_get_program_without_context(monkeypatch):
+    monkeypatch.setattr(shader, 'program', FakeProgram)
+    monkeypatch.setattr(shader.gl, 'current_context', None)
+
+    with pytest.raises(shader.ShaderException):
+        shader.get_program("vertex d", "fragment")
+
+
+def test_render_starts_at_first_index(monkeypatch):
+    calls = []
+    monkeypatch.setattr(shader, 'glDrawElementsInstanced',
+                        lambda mode, count, index_type, offset, instances:
+                        calls.append((count, offset.value, instances)))
+
+    vao = shader.VertexArray.__new__(shader.VertexArray)
+    vao.ibo = shader.Buffer.__new__(shader.Buffer)
+    vao.ibo.size = 10 * 4
+
+    vao.render(shader.GL_TRIANGLES, first=3)
+    vao.render(shader.GL_TRIANGLES, instances=2, first=3, vertices=6)
+
+    assert calls == [(7, 12, 1), (6, 12, 2)]
@@ -0,0 +1,96 @@
+import random
+
+import arcade
+from arcade.sprite_list import SpatialHash
+
+
+def make_sprite(x, y, size=10):
+    sprite = arcade.Sprite(center_x=x, center_y=y)
+    sprite.width = size
+    sprite.height = size
+    return sprite
+
+
+def check_hash(spatial_hash, sprites):
+    """
+    Every sprite is in the cells it covers, and the cells match the ranges
+    the hash remembers. No cell is empty.
+    """
+    expected = {}
+    assert set(spatial_hash.object_cells) == set(sprites)
+    for sprite in sprites:
+        cells = spatial_hash.object_cells[sprite]
+        covered = spatial_hash._get_cells(sprite)
+        assert cells[0] <= covered[0] and cells[1] <= covered[1]
+        assert cells[2] >= covered[2] and cells[3] >= covered[3]
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                expected.setdefault((i, j), set()).add(sprite)
+    assert spatial_hash.contents == expected
+
+
+def test_spatial_hash_follows_moving_sprites():
+    rng = random.Random(3)
+    sprite_list = arcade.SpriteList(spatial_hash_cell_size=16)
+    sprites = [make_sprite(rng.uniform(0, 200), rng.uniform(0, 200), rng.uniform(4, 40))
+               for _ in range(50)]
+    for sprite in sprites:
+        sprite_list.append(sprite)
+
+    for step in range(20):
+        for sprite in sprites[::3]:
+            sprite.center_x += rng.uniform(-10, 10)
+            sprite.angle += 15
+        if step % 5 == 0:
+            sprite_list.move(7, -3)
+        sprite_list.remove(sprites.pop())
+        check_hash(sprite_list.spatial_hash, sprites)
+
+
+def test_queries_do_not_change_the_hash():
+    spatial_hash = SpatialHash(cell_size=10)
+    sprite = make_sprite(5, 5)
+    spatial_hash.insert_object_for_box(sprite)
+    contents = {key: set(bucket) for key, bucket in spatial_hash.contents.items()}
+
+    assert spatial_hash.get_objects_for_box(make_sprite(500, 500)) == []
+    assert spatial_hash.get_objects_for_box(make_sprite(8, 8, 30)) == [sprite]
+    assert spatial_hash.contents == contents
+
+    spatial_hash.remove_object(sprite)
+    spatial_hash.remove_object(sprite)
+    assert spatial_hash.contents == {}
+
+
+class CountingSpatialHash(SpatialHash):
+    def __init__(self, cell_size):
+        super().__init__(cell_size)
+        self.updates = 0
+
+    def update_object_for_box(self, moved_object):
+        self.updates += 1
+        super().update_object_for_box(moved_object)
+
+
+def test_moves_are_applied_once_on_the_next_query():
+    spatial_hash = CountingSpatialHash(cell_size=16)
+    sprite_list = arcade.SpriteList(broadphase=spatial_hash)
+    sprite = make_sprite(0, 0)
+    sprite_list.append(sprite)
+
+    for step in range(20):
+        sprite.center_x += 4
+        sprite.center_y += 1
+        sprite.angle += 10
+    assert spatial_hash.updates == 0
+
+    player = make_sprite(sprite.center_x, sprite.center_y)
+    assert arcade.check_for_collision_with_list(player, sprite_list) == [sprite]
+    assert spatial_hash.updates == 1
+    check_hash(spatial_hash, [sprite])
+
+    # Removed sprites are not moved afterwards
+    sprite.center_x += 100
+    sprite_list.remove(sprite)
+    check_hash(sprite_list.spatial_hash, [])
+    assert spatial_hash.updates == 1
@@ -0,0 +1,211 @@
+import pytest
+
+import arcade
+from arcade import shader
+from arcade import sprite_list as sprite_list_module
+from arcade.sprite import _X
+from arcade.sprite_list import _SPRITE_DATA_TYPE, _DIRTY_RANGE_GAP
+
+
+class FakeBuffer:
+    """ Stands in for a graphics card buffer, and records what is written to it. """
+
+    def __init__(self, data, usage='static'):
+        self.size = len(data)
+        self.writes = []
+        self.orphaned = 0
+
+    def write(self, data, offset=0):
+        self.writes.append((offset, len(data)))
+
+    def orphan(self):
+        self.orphaned += 1
+
+
+@pytest.fixture
+def fake_gpu(monkeypatch):
+    """ Let sprite lists make their buffers and vertex arrays without a window. """
+    calls = {'buffers': 0, 'vertex_arrays': 0}
+
+    def buffer(data, usage='static'):
+        calls['buffers'] += 1
+        return FakeBuffer(data, usage)
+
+    def vertex_array(program, content, index_buffer=None):
+        calls['vertex_arrays'] += 1
+        return object()
+
+    monkeypatch.setattr(shader, 'buffer', buffer)
+    monkeypatch.setattr(shader, 'vertex_array', vertex_array)
+    monkeypatch.setattr(shader, 'get_program', lambda vertex_shader, fragment_shader: object())
+    monkeypatch.setattr(shader, 'release_program', lambda program: None)
+    monkeypatch.setattr(sprite_list_module.SpriteList, '_get_sub_tex_coords',
+                        lambda self, texture: ((0, 0, 1, 1), 0))
+    return calls
+
+
+def make_list(count):
+    sprite_list = arcade.SpriteList()
+    for i in range(count):
+        sprite = arcade.Sprite(center_x=i * 10)
+        sprite.width, sprite.height = 8, 8
+        sprite_list.append(sprite)
+    return sprite_list
+
+
+ITEM_SIZE = _SPRITE_DATA_TYPE.itemsize
+
+
+def test_dirty_sprites_are_uploaded_in_runs(fake_gpu):
+    sprite_list = make_list(100)
+    sprite_list.calculate_sprite_buffer()
+    buf = sprite_list.sprite_data_buf
+
+    for i in (3, 4, 5, 5 + _DIRTY_RANGE_GAP + 1):
+        sprite_list[i].center_y = 50
+    sprite_list._upload_dirty_sprites()
+
+    far = 5 + _DIRTY_RANGE_GAP + 1
+    assert buf.writes == [(3 * ITEM_SIZE, 3 * ITEM_SIZE), (far * ITEM_SIZE, ITEM_SIZE)]
+    assert buf.orphaned == 0
+
+
+def test_many_dirty_sprites_are_uploaded_in_one_write(fake_gpu):
+    sprite_list = make_list(100)
+    sprite_list.calculate_sprite_buffer()
+    buf = sprite_list.sprite_data_buf
+
+    for i in range(0, 100, 3):
+        sprite_list[i].angle = 45
+    sprite_list._upload_dirty_sprites()
+
+    assert buf.writes == [(0, 100 * ITEM_SIZE)]
+    assert buf.orphaned == 1
+
+
+def test_clean_frame_uploads_nothing(fake_gpu):
+    sprite_list = make_list(10)
+    sprite_list.calculate_sprite_buffer()
+    buf = sprite_list.sprite_data_buf
+    sprite_list._upload_dirty_sprites()
+    assert buf.writes == []
+
+    sprite_list[2].center_x = 500
+    sprite_list._upload_dirty_sprites()
+    sprite_list._upload_dirty_sprites()
+    assert buf.writes == [(2 * ITEM_SIZE, ITEM_SIZE)]
+
+
+def test_append_writes_into_the_existing_buffer(fake_gpu):
+    sprite_list = make_list(10)
+    sprite_list.calculate_sprite_buffer()
+    buf = sprite_list.sprite_data_buf
+    vao = sprite_list.vao
+
+    sprite = arcade.Sprite(center_x=123)
+    sprite_list.append(sprite)
+    assert fake_gpu['buffers'] == 2
+    assert sprite_list.sprite_data_buf is buf
+    assert sprite_list.vao is vao
+    assert sprite_list.sprite_data[10]['position'].tolist() == [123, 0]
+
+    sprite_list._upload_dirty_sprites()
+    assert buf.writes == [(10 * ITEM_SIZE, ITEM_SIZE)]
+
+
+def test_growing_doubles_capacity_and_moves_sprite_state(fake_gpu):
+    sprite_list = make_list(16)
+    assert len(sprite_list._sprite_state) == 16
+    sprite_list.append(arcade.Sprite())
+    assert len(sprite_list._sprite_state) == 32
+
+    for i, sprite in enumerate(sprite_list):
+        sprite.center_x = 1000 + i
+    assert sprite_list._sprite_state[:17, _X].tolist() == [1000 + i for i in range(17)]
+
+
+def test_vertex_array_is_rebuilt_only_when_growing(fake_gpu):
+    sprite_list = make_list(4)
+    sprite_list.calculate_sprite_buffer()
+    assert fake_gpu['vertex_arrays'] == 1
+
+    for _ in range(12):
+        sprite_list.append(arcade.Sprite())
+    assert fake_gpu['vertex_arrays'] == 1
+
+    sprite_list.append(arcade.Sprite())
+    assert fake_gpu['vertex_arrays'] == 2
+    assert len(sprite_list.sprite_data) == 32
+    assert sprite_list.sprite_data_buf.size == 32 * ITEM_SIZE
+
+
+def test_remove_moves_the_last_sprite_into_the_slot():
+    sprite_list = make_list(5)
+    first, last = sprite_list[1], sprite_list[4]
+    sprite_list.remove(first)
+
+    assert len(sprite_list) == 4
+    assert sprite_list[1] is last
+    assert sprite_list.sprite_idx[last] == 1
+    assert first not in sprite_list.sprite_idx
+    assert sprite_list._sprite_state[1, _X] == last.center_x == 40
+
+    # The moved sprite still writes through to its new row
+    last.center_x = 99
+    assert sprite_list._sprite_state[1, _X] == 99
+
+
+def test_deferred_removals_are_hidden_until_flushed():
+    sprite_list = make_list(5)
+    sprite_list.defer_removals = True
+    removed = [sprite_list[0], sprite_list[3]]
+    for sprite in removed:
+        sprite_list.remove(sprite)
+
+    assert all(sprite not in sprite_list for sprite in removed)
+    assert len(sprite_list) == 3
+    assert [sprite.center_x for sprite in sprite_list] == [10, 20, 40]
+    assert [sprite_list[i].center_x for i in range(3)] == [10, 20, 40]
+    assert sprite_list[-1].center_x == 40
+    assert len(sprite_list._pending_removals) == 2
+
+    sprite_list.flush_removals()
+    assert not sprite_list._pending_removals
+    assert len(sprite_list) == 3
+    assert sorted(sprite.center_x for sprite in sprite_list) == [10, 20, 40]
+    for sprite in sprite_list:
+        assert sprite_list[sprite_list.sprite_idx[sprite]] is sprite
+
+
+def test_sprites_can_be_removed_while_looping_over_the_list():
+    sprite_list = make_list(6)
+    sprite_list.defer_removals = True
+    visited = []
+    for sprite in sprite_list:
+        visited.append(sprite.center_x)
+        if sprite.center_x in (0, 20, 30):
+            sprite_list.remove(sprite)
+        assert len(sprite_list) == 6 - len(sprite_list._pending_removals)
+        assert all(other in sprite_list for other in sprite_list)
+
+    assert visited == [0, 10, 20, 30, 40, 50]
+    assert len(sprite_list) == 3
+    sprite_list.update()
+    assert sorted(sprite.center_x for sprite in sprite_list) == [10, 40, 50]
+
+
+def test_reappending_a_sprite_waiting_for_removal():
+    sprite_list = make_list(4)
+    sprite_list.defer_removals = True
+    sprite = sprite_list[1]
+    sprite_list.remove(sprite)
+    sprite.center_x = 77
+    sprite_list.append(sprite)
+
+    assert len(sprite_list) == 4
+    assert list(sprite_list).count(sprite) == 1
+    i = sprite_list.sprite_idx[sprite]
+    assert sprite_list._sprite_state[i, _X] == 77
+    sprite.center_x = 88
+    assert sprite_list._sprite_state[i, _X] == 88
+    assert sorted(sprite.center_x for sprite in sprite_list) == [0, 20, 30, 88]
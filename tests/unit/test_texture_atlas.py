@@ -0,0 +1,50 @@
+import PIL.Image
+import pytest
+
+from arcade.draw_commands import Texture
+from arcade.texture_atlas import TextureAtlas
+
+
+def make_texture(name, width, height):
+    return Texture(name, PIL.Image.new("RGBA", (width, height)))
+
+
+def test_add_returns_same_region_for_same_name():
+    atlas = TextureAtlas(initial_page_size=64, max_page_size=64)
+    region = atlas.add(make_texture("a", 10, 10))
+    assert atlas.add(make_texture("a", 10, 10)) is region
+    assert "a" in atlas
+    assert len(atlas) == 1
+
+
+def test_regions_do_not_overlap():
+    atlas = TextureAtlas(initial_page_size=32, max_page_size=128)
+    regions = [atlas.add(make_texture(str(i), 10 + i % 7, 5 + i % 11)) for i in range(60)]
+
+    for i, a in enumerate(regions):
+        assert a.x + a.width <= atlas.page_size
+        assert a.y + a.height <= atlas.page_size
+        for b in regions[i + 1:]:
+            if a.page != b.page:
+                continue
+            overlap_x = a.x < b.x + b.width and b.x < a.x + a.width
+            overlap_y = a.y < b.y + b.height and b.y < a.y + a.height
+            assert not (overlap_x and overlap_y)
+
+
+def test_page_grows_before_adding_pages():
+    atlas = TextureAtlas(initial_page_size=16, max_page_size=64)
+    atlas.add(make_texture("a", 30, 30))
+    assert atlas.page_size == 32
+    assert atlas.page_count == 1
+
+    for i in range(4):
+        atlas.add(make_texture(f"b{i}", 30, 30))
+    assert atlas.page_size == 64
+    assert atlas.page_count == 2
+
+
+def test_texture_too_large():
+    atlas = TextureAtlas(initial_page_size=16, max_page_size=32)
+    with pytest.raises(ValueError):
+        atlas.add(make_texture("big", 40, 10))